@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark building a samples x taxa abundance table from many Kraken2 reports.
+Compares AbundanceMatrix (streamed CSR, saved as .npz) with reading every report
+through pandas and pivoting, and checks both agree.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.abundance_matrix import AbundanceMatrix
+
+
+def write_reports(directory: Path, samples: int, taxa: int, per_sample: int, start: int = 0, seed: int = 0):
+    """Flat reports of ``per_sample`` random species from a pool of ``taxa``."""
+    rng = np.random.default_rng(seed)
+    pool = np.arange(100_000, 100_000 + taxa)
+    paths = []
+    for i in range(start, start + samples):
+        taxids = np.sort(rng.choice(pool, per_sample, replace=False))
+        counts = rng.integers(1, 5000, per_sample)
+        total = int(counts.sum()) + 1000
+        lines = [f"{1000 / total * 100:6.2f}\t1000\t1000\tU\t0\tunclassified",
+                 f"{(total - 1000) / total * 100:6.2f}\t{total - 1000}\t0\tR\t1\troot"]
+        lines += [f"{c / total * 100:6.2f}\t{c}\t{c}\tS\t{t}\t  species {t}"
+                  for t, c in zip(taxids.tolist(), counts.tolist())]
+        path = directory / f"SRR{i:07d}_report.txt"
+        path.write_text('\n'.join(lines) + '\n')
+        paths.append(path)
+    return paths
+
+
+def pandas_pivot(paths):
+    """The per-file approach: read each report into a frame, then pivot to samples x taxa."""
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, sep='\t', header=None,
+                         names=['percent', 'clade_reads', 'direct_reads', 'rank', 'taxid', 'name'])
+        df['sample'] = path.name[:-len('_report.txt')]
+        frames.append(df.loc[df['direct_reads'] > 0, ['sample', 'taxid', 'direct_reads']])
+    long = pd.concat(frames, ignore_index=True)
+    return long.pivot_table(index='sample', columns='taxid', values='direct_reads',
+                            aggfunc='sum', fill_value=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=2000, help='Kraken2 reports')
+    parser.add_argument('--taxa', type=int, default=20000, help='Distinct species across the cohort')
+    parser.add_argument('--per-sample', type=int, default=500, help='Species per report')
+    parser.add_argument('--workers', type=int, default=None, help='Processes for AbundanceMatrix.update')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = write_reports(tmp, args.samples, args.taxa, args.per_sample)
+        npz = tmp / 'abundance.npz'
+
+        print(f"{'step':<36} {'seconds':>8}")
+        start = time.perf_counter()
+        expected = pandas_pivot(paths)
+        print(f"{'pandas read_csv + pivot':<36} {time.perf_counter() - start:>8.2f}")
+
+        start = time.perf_counter()
+        abundance = AbundanceMatrix()
+        abundance.update(paths, args.workers)
+        abundance.save(npz)
+        print(f"{'AbundanceMatrix build + save':<36} {time.perf_counter() - start:>8.2f}")
+
+        start = time.perf_counter()
+        loaded = AbundanceMatrix.load(npz)
+        matrix = loaded.matrix
+        print(f"{'AbundanceMatrix load':<36} {time.perf_counter() - start:>8.2f}")
+
+        extra = write_reports(tmp, 10, args.taxa, args.per_sample, start=args.samples, seed=1)
+        start = time.perf_counter()
+        loaded.update(paths + extra, args.workers)
+        loaded.save(npz)
+        print(f"{'update with 10 new reports':<36} {time.perf_counter() - start:>8.2f}")
+
+        dense_mb = expected.memory_usage(deep=True).sum() / 1e6
+        sparse_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1e6
+        print(f"memory: pivot {dense_mb:.0f} MB, CSR {sparse_mb:.1f} MB; "
+              f".npz on disk {npz.stat().st_size / 1e6:.1f} MB")
+
+    result = abundance.to_dataframe()
+    result = result.loc[expected.index, expected.columns]
+    assert (result.to_numpy() == expected.to_numpy()).all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark a typical EDA query against sample_qc_summary.csv and the columnar store.
+Query: fungal_percent of the samples with qc_status == PASS. Checks both agree.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bench_qc_summary import make_stats
+from src.analyze_eda_results import EDAAnalyzer
+from src.eda_store import read_table, write_table
+
+
+def best_of(repeats: int, func):
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000, help='Samples in the cohort')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per method (fastest is kept)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        analyzer = EDAAnalyzer(tmp)
+        qc_summary = analyzer.create_qc_summary(make_stats(args.rows))
+        csv_path = tmp / 'sample_qc_summary.csv'
+
+        write_csv, _ = best_of(1, lambda: qc_summary.to_csv(csv_path, index=False))
+        write_store, _ = best_of(1, lambda: write_table(qc_summary, tmp / 'store', 'qc_summary'))
+
+        def query_csv():
+            df = pd.read_csv(csv_path)
+            return df.loc[df['qc_status'] == 'PASS', ['sample_id', 'fungal_percent']]
+
+        def query_store():
+            return read_table(tmp / 'store', 'qc_summary', columns=['sample_id', 'fungal_percent'],
+                              filters=[('qc_status', '==', 'PASS')])
+
+        read_csv, expected = best_of(args.repeats, query_csv)
+        read_store, result = best_of(args.repeats, query_store)
+
+    print(f"{'format':>8} {'write s':>8} {'query s':>8}   ({len(result):,} of {args.rows:,} samples pass)")
+    print(f"{'csv':>8} {write_csv:>8.3f} {read_csv:>8.3f}")
+    print(f"{'store':>8} {write_store:>8.3f} {read_store:>8.3f}")
+
+    pd.testing.assert_frame_equal(
+        result.sort_values('sample_id', ignore_index=True),
+        expected.sort_values('sample_id', ignore_index=True), check_dtype=False)
+    print(f"query speedup: {read_csv / read_store:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
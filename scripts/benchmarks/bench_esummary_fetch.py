@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent esummary fetching against a local stub eutils server.
+Reports batches/s and records/s as DataHarvester.max_concurrency increases.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data_harvester import DataHarvester
+
+
+def make_handler(latency: float):
+    class StubEutilsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            uids = query.get('id', [''])[0].split(',')
+            time.sleep(latency)
+            result = {'uids': uids}
+            for uid in uids:
+                result[uid] = {'accession': f"SRR{uid}", 'spots': 1000, 'size_MB': 10}
+            body = json.dumps({'result': result}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubEutilsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ids', type=int, default=2000, help='Number of SRA UIDs to fetch')
+    parser.add_argument('--latency', type=float, default=0.1, help='Stub response latency (s)')
+    parser.add_argument('--rps', type=float, default=1000, help='Token bucket requests/s')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    config = {
+        'data_selection': {}, 'qc_parameters': {},
+        'databases': {'sra': {'query_terms': [], 'requests_per_second': args.rps}},
+    }
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(config, f)
+
+    harvester = DataHarvester(Path(f.name))
+    harvester.sra_api = f"http://127.0.0.1:{server.server_address[1]}"
+    ids = [str(i) for i in range(args.ids)]
+    batches = -(-len(ids) // harvester.summary_batch_size)
+
+    print(f"{'concurrency':>11} {'seconds':>8} {'batches/s':>10} {'records/s':>10}")
+    for concurrency in args.concurrency:
+        harvester.max_concurrency = concurrency
+        start = time.perf_counter()
+        records = harvester.fetch_summaries(ids)
+        elapsed = time.perf_counter() - start
+        assert [r['accession'] for r in records] == [f"SRR{i}" for i in ids]
+        print(f"{concurrency:>11} {elapsed:>8.2f} {batches / elapsed:>10.1f} "
+              f"{len(records) / elapsed:>10.0f}")
+
+    server.shutdown()
+    Path(f.name).unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark FastQC ingestion over many synthetic ``_fastqc.zip`` files.
+Compares the former extract-and-rescan call-site code with FastQCReport, serially
+and through summarize_fastqc's process pool.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.fastqc_parser import FastQCReport, summarize_fastqc
+
+
+def fastqc_data(sample: str, length: int, rng: random.Random) -> str:
+    lines = ["##FastQC\t0.12.1", ">>Basic Statistics\tpass", "#Measure\tValue",
+             f"Filename\t{sample}.fastq.gz", "Encoding\tSanger / Illumina 1.9",
+             f"Total Sequences\t{rng.randint(10**6, 10**7)}", f"Sequence length\t35-{length}",
+             f"%GC\t{rng.randint(35, 60)}", ">>END_MODULE",
+             ">>Per base sequence quality\tpass",
+             "#Base\tMean\tMedian\tLower Quartile\tUpper Quartile\t10th Percentile\t90th Percentile"]
+    lines += [f"{i}\t{rng.uniform(20, 38):.2f}\t33.0\t31.0\t35.0\t28.0\t37.0" for i in range(1, length + 1)]
+    lines += [">>END_MODULE", ">>Per sequence GC content\tpass", "#GC Content\tCount"]
+    lines += [f"{i}\t{rng.uniform(0, 5000):.1f}" for i in range(101)]
+    lines += [">>END_MODULE", ">>Sequence Duplication Levels\tpass",
+              "#Total Deduplicated Percentage\t84.1",
+              "#Duplication Level\tPercentage of deduplicated\tPercentage of total"]
+    lines += [f"{level}\t{rng.uniform(0, 90):.2f}\t{rng.uniform(0, 90):.2f}"
+              for level in list(range(1, 10)) + ['>10', '>50', '>100', '>500', '>1k', '>5k', '>10k']]
+    lines += [">>END_MODULE", ">>Adapter Content\tpass",
+              "#Position\tIllumina Universal Adapter\tNextera Transposase Sequence\tPolyA\tPolyG"]
+    lines += [f"{i}\t{i / 1000:.4f}\t0.0\t0.0\t0.0" for i in range(1, length + 1)]
+    lines += [">>END_MODULE"]
+    return '\n'.join(lines) + '\n'
+
+
+def parse_legacy(path: Path) -> dict:
+    """The former call-site approach: read the whole member, rescan lines, regex the text."""
+    sample = path.name[:-len('_fastqc.zip')]
+    with zipfile.ZipFile(path) as zf:
+        content = zf.read(f"{sample}_fastqc/fastqc_data.txt").decode('utf-8')
+    data = content.split('\n')
+    gc = float(re.search(r'%GC\s+(\d+)', content).group(1))
+    total = int(re.search(r'Total Sequences\s+(\d+)', content).group(1))
+    scores, in_quality = [], False
+    for line in data:
+        if line.startswith('>>Per base sequence quality'):
+            in_quality = True
+        elif line.startswith('>>END_MODULE') and in_quality:
+            break
+        elif in_quality and line and not line.startswith('#'):
+            scores.append(float(line.split()[1]))
+    return {'total_sequences': total, 'gc_percent': gc, 'mean_quality': sum(scores) / len(scores)}
+
+
+def parse_report(path: Path) -> dict:
+    report = FastQCReport.from_zip(path)
+    return {'total_sequences': report.total_sequences, 'gc_percent': report.gc_percent,
+            'mean_quality': report.mean_quality}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--zips', type=int, default=2000, help='Number of FastQC zips')
+    parser.add_argument('--length', type=int, default=151, help='Read length (rows per base module)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes for summarize_fastqc')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.zips):
+            sample = f"SRR{i:07d}"
+            path = Path(tmp) / f"{sample}_fastqc.zip"
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr(f"{sample}_fastqc/fastqc_data.txt", fastqc_data(sample, args.length, rng))
+            paths.append(path)
+
+        print(f"{'method':>22} {'seconds':>8} {'zips/s':>8}")
+        timings = {}
+        for label, run in [('legacy rescan', lambda: [parse_legacy(p) for p in paths]),
+                           ('FastQCReport', lambda: [parse_report(p) for p in paths]),
+                           (f"summarize x{args.workers}", lambda: summarize_fastqc(paths, args.workers))]:
+            start = time.perf_counter()
+            result = run()
+            timings[label] = time.perf_counter() - start
+            print(f"{label:>22} {timings[label]:>8.2f} {len(paths) / timings[label]:>8.0f}")
+            if label == 'legacy rescan':
+                expected = result
+            elif label == 'FastQCReport':
+                for got, want in zip(result, expected):
+                    assert got['total_sequences'] == want['total_sequences']
+                    assert abs(got['mean_quality'] - want['mean_quality']) < 1e-9
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark Kraken2 report parsing over many synthetic reports.
+Compares KrakenReport with the former pandas read_csv + name-scan approach.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.kraken_report import KrakenReport
+
+RANKS = ['D', 'P', 'C', 'O', 'F', 'G', 'S']
+
+
+def write_report(path: Path, rows: int, rng: random.Random) -> None:
+    lines = [" 10.00\t1000\t1000\tU\t0\tunclassified", " 90.00\t9000\t0\tR\t1\troot",
+             " 40.00\t4000\t0\tK\t4751\t  Fungi", "  1.00\t100\t100\tS\t9606\t  Homo sapiens"]
+    for i in range(rows):
+        depth = 1 + i % len(RANKS)
+        reads = rng.randint(0, 5000)
+        lines.append(f"{reads / 100:6.2f}\t{reads}\t{reads // 2}\t{RANKS[depth - 1]}\t"
+                     f"{100000 + i}\t{'  ' * (depth + 1)}Taxon {i}")
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def parse_with_pandas(path: Path) -> dict:
+    """The per-call-site approach KrakenReport replaced, kept here as the baseline."""
+    df = pd.read_csv(path, sep='\t', header=None,
+                     names=['percent', 'clade_reads', 'direct_reads', 'rank', 'taxid', 'name'])
+    classified = df[df['name'] == 'root']['clade_reads'].iloc[0]
+    unclassified = df[df['name'] == 'unclassified']['clade_reads'].iloc[0]
+    fungi = df[df['name'].str.strip() == 'Fungi']['clade_reads']
+    human = df[df['name'].str.strip() == 'Homo sapiens']['clade_reads']
+    df[df['rank'] == 'S'].sort_values('clade_reads', ascending=False).head(10)
+    return {'total_reads': classified + unclassified,
+            'fungal_reads': fungi.iloc[0] if not fungi.empty else 0,
+            'human_reads': human.iloc[0] if not human.empty else 0}
+
+
+def parse_with_kraken_report(path: Path) -> dict:
+    report = KrakenReport.from_file(path)
+    report.top('S', 10)
+    summary = report.summary()
+    return {key: summary[key] for key in ('total_reads', 'fungal_reads', 'human_reads')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, default=2000, help='Number of reports')
+    parser.add_argument('--rows', type=int, default=1500, help='Taxon rows per report')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"S{i}_report.txt" for i in range(args.reports)]
+        for path in paths:
+            write_report(path, args.rows, rng)
+
+        print(f"{'parser':>14} {'seconds':>8} {'reports/s':>10}")
+        timings = {}
+        for label, parse in [('pandas', parse_with_pandas), ('KrakenReport', parse_with_kraken_report)]:
+            start = time.perf_counter()
+            results = [parse(path) for path in paths]
+            timings[label] = time.perf_counter() - start
+            print(f"{label:>14} {timings[label]:>8.2f} {len(paths) / timings[label]:>10.0f}")
+            if label == 'pandas':
+                expected = results
+        assert results == expected
+
+    print(f"speedup: {timings['pandas'] / timings['KrakenReport']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
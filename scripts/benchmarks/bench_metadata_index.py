@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark metadata completeness scoring on a synthetic cohort.
+Compares reading one metadata.json per sample (the validator's per-file path,
+optionally with a per-file latency to mimic a network filesystem) with one
+MetadataIndex.completeness pass, and checks both agree.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.metadata_index import MetadataIndex, score_completeness
+
+REQUIRED_FIELDS = ['collection_date', 'geo_loc_name', 'host', 'isolation_source', 'env_broad_scale',
+                   'env_local_scale', 'env_medium', 'sequencing_method', 'investigation_type', 'target_gene']
+
+
+def write_cohort(storage: Path, samples: int, seed: int = 0):
+    """Metadata for ``samples`` accessions with extra fields, some values invalid and some files missing."""
+    rng = np.random.default_rng(seed)
+    accessions = [f"SRR{i:08d}" for i in range(samples)]
+    for accession in accessions:
+        if rng.random() < 0.05:
+            continue
+        metadata = {field: rng.choice(['value', 'value', 'value', 'Unknown', '', None])
+                    for field in REQUIRED_FIELDS + [f"attribute_{i}" for i in range(20)]}
+        (storage / accession).mkdir()
+        (storage / accession / 'metadata.json').write_text(json.dumps(metadata))
+    return accessions
+
+
+def score_per_file(storage: Path, accessions, latency: float):
+    """One open and JSON parse per sample, as SampleValidator does without an index."""
+    scores = {}
+    for accession in accessions:
+        time.sleep(latency)
+        path = storage / accession / 'metadata.json'
+        if not path.exists():
+            scores[accession] = 0.0
+            continue
+        with open(path) as f:
+            metadata = json.load(f)
+        valid_values = sum(metadata.get(field) not in [None, 'Unknown', ''] for field in REQUIRED_FIELDS)
+        scores[accession] = float(score_completeness(valid_values, len(REQUIRED_FIELDS)))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=20_000, help='Accessions to score')
+    parser.add_argument('--latency-ms', type=float, default=0.5, help='Delay added to each metadata.json read')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        storage = tmp / 'cache'
+        storage.mkdir()
+        accessions = write_cohort(storage, args.samples)
+
+        print(f"{args.samples:,} samples, {args.latency_ms:g} ms per file read")
+        print(f"{'step':<34} {'seconds':>8}")
+        start = time.perf_counter()
+        expected = score_per_file(storage, accessions, args.latency_ms / 1000)
+        print(f"{'per-file metadata.json scoring':<34} {time.perf_counter() - start:>8.2f}")
+
+        index = MetadataIndex(tmp / 'metadata_index.sqlite')
+        start = time.perf_counter()
+        index.import_directory(storage)
+        print(f"{'one-off import into the index':<34} {time.perf_counter() - start:>8.2f}")
+        start = time.perf_counter()
+        index.import_directory(storage)
+        print(f"{'re-import, nothing changed':<34} {time.perf_counter() - start:>8.2f}")
+
+        start = time.perf_counter()
+        scores = index.completeness(accessions, REQUIRED_FIELDS)
+        print(f"{'index completeness pass':<34} {time.perf_counter() - start:>8.2f}")
+        index.close()
+
+    assert scores['metadata_completeness'].to_dict() == expected
+
+
+if __name__ == '__main__':
+    main()
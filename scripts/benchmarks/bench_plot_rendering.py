@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-sample QC panel rendering with EDAAnalyzer.create_sample_plots.
+Times a cold render at several worker counts and a re-run with unchanged inputs.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_fastqc_parser import fastqc_data
+from src.analyze_eda_results import EDAAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=200, help='Samples to plot')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, os.cpu_count() or 1}), help='Worker counts to time')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = EDAAnalyzer(Path(tmp))
+        sample_ids = [f"SRR{i:07d}" for i in range(args.samples)]
+        for sample_id in sample_ids:
+            with zipfile.ZipFile(analyzer.fastqc_dir / f"{sample_id}_fastqc.zip", 'w') as zf:
+                zf.writestr(f"{sample_id}_fastqc/fastqc_data.txt", fastqc_data(sample_id, 151, rng))
+
+        plot_dir = analyzer.eda_dir / 'plots'
+        print(f"{'run':>16} {'seconds':>8} {'plots/s':>8}")
+        for workers in args.workers:
+            shutil.rmtree(plot_dir, ignore_errors=True)
+            analyzer.max_workers = workers
+            start = time.perf_counter()
+            status = analyzer.create_sample_plots(sample_ids)
+            elapsed = time.perf_counter() - start
+            assert set(status.values()) == {'rendered'}
+            print(f"{f'cold x{workers}':>16} {elapsed:>8.2f} {args.samples / elapsed:>8.1f}")
+
+        start = time.perf_counter()
+        status = analyzer.create_sample_plots(sample_ids)
+        elapsed = time.perf_counter() - start
+        assert set(status.values()) == {'skipped'}
+        print(f"{'unchanged':>16} {elapsed:>8.2f} {args.samples / elapsed:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark EDAAnalyzer.generate_read_stats over a synthetic EDA directory.
+Times the same directory at increasing worker counts to show process-pool scaling,
+then a cached re-run after a few new samples land.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.analyze_eda_results import EDAAnalyzer
+
+FASTQC_DATA = (
+    "##FastQC\t0.12.1\n"
+    ">>Basic Statistics\tpass\n"
+    "#Measure\tValue\n"
+    "Filename\t{sample}.fastq.gz\n"
+    "Encoding\tSanger / Illumina 1.9\n"
+    "Total Sequences\t{reads}\n"
+    "Sequence length\t150\n"
+    "%GC\t{gc}\n"
+    ">>END_MODULE\n"
+)
+
+
+def write_sample(eda_dir: Path, sample_id: str, rows: int, rng: random.Random) -> None:
+    (eda_dir / f"{sample_id}.fastq.gz").touch()
+    lines = [" 10.00\t1000\t1000\tU\t0\tunclassified", " 90.00\t9000\t0\tR\t1\troot",
+             " 40.00\t4000\t0\tK\t4751\t  Fungi", "  1.00\t100\t100\tS\t9606\t  Homo sapiens"]
+    lines += [f"  0.01\t{rng.randint(0, 50)}\t0\tS\t{100000 + i}\t      Taxon {i}" for i in range(rows)]
+    (eda_dir / 'kraken2' / f"{sample_id}_report.txt").write_text('\n'.join(lines) + '\n')
+    fastqc_dir = eda_dir / 'fastqc' / f"{sample_id}_fastqc"
+    fastqc_dir.mkdir()
+    (fastqc_dir / 'fastqc_data.txt').write_text(
+        FASTQC_DATA.format(sample=sample_id, reads=rng.randint(10**6, 10**7), gc=rng.randint(35, 60))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=2000, help='Number of samples')
+    parser.add_argument('--rows', type=int, default=1500, help='Taxon rows per Kraken2 report')
+    parser.add_argument('--new-samples', type=int, default=5,
+                        help='Samples added before the incremental re-run')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help='Worker counts to time')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = EDAAnalyzer(Path(tmp), use_cache=False)
+        for i in range(args.samples):
+            write_sample(analyzer.eda_dir, f"SRR{i:07d}", args.rows, rng)
+
+        print(f"{'workers':>8} {'seconds':>8} {'samples/s':>10} {'speedup':>8}")
+        baseline = expected = None
+        for workers in args.workers:
+            analyzer.max_workers = workers
+            start = time.perf_counter()
+            stats = analyzer.generate_read_stats()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {args.samples / elapsed:>10.0f} "
+                  f"{baseline / elapsed:>7.1f}x")
+            if expected is None:
+                expected = stats
+            assert stats.equals(expected)
+
+        # Incremental: a full cached run, then a re-run after a few samples are added
+        cached = EDAAnalyzer(Path(tmp), use_cache=True)
+        start = time.perf_counter()
+        cached.generate_read_stats()
+        cold = time.perf_counter() - start
+        for i in range(args.new_samples):
+            write_sample(analyzer.eda_dir, f"ERR{i:07d}", args.rows, rng)
+        start = time.perf_counter()
+        stats = cached.generate_read_stats()
+        warm = time.perf_counter() - start
+        assert len(stats) == args.samples + args.new_samples
+        print(f"cache: cold {cold:.2f}s, +{args.new_samples} samples {warm:.2f}s "
+              f"({cold / warm:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
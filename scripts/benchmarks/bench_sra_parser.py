@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark SRA esummary parsing on synthetic expxml/runs payloads.
+Reports summaries/s and runs/s for parse_summary and the typed DataFrame build.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.sra_parser import iter_run_records, parse_biosample_attributes, records_to_frame
+
+FIXTURE = Path(__file__).resolve().parents[2] / 'tests' / 'data' / 'sra_esummary.json'
+
+
+def make_entries(count: int, template: dict):
+    """Copies of the fixture summary with unique run accessions."""
+    return [
+        {**template, 'uid': str(i),
+         'runs': template['runs'].replace('SRR1"', f'SRR{2 * i}"').replace('SRR2"', f'SRR{2 * i + 1}"')}
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--summaries', type=int, default=20000, help='Synthetic esummary documents')
+    args = parser.parse_args()
+
+    with open(FIXTURE) as f:
+        fixture = json.load(f)
+    entries = make_entries(args.summaries, fixture['sra'])
+
+    start = time.perf_counter()
+    records = list(iter_run_records(entries))
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.summaries):
+        parse_biosample_attributes(fixture['biosample']['sampledata'])
+    biosample_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame = records_to_frame(records)
+    frame_seconds = time.perf_counter() - start
+
+    assert len(frame) == 2 * args.summaries
+    print(f"{'stage':>18} {'seconds':>8} {'items/s':>10}")
+    print(f"{'parse_summary':>18} {parse_seconds:>8.2f} {args.summaries / parse_seconds:>10.0f}")
+    print(f"{'biosample attrs':>18} {biosample_seconds:>8.2f} "
+          f"{args.summaries / biosample_seconds:>10.0f}")
+    print(f"{'records_to_frame':>18} {frame_seconds:>8.2f} {len(records) / frame_seconds:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import cost of every FungiMap command-line entry point.
+Runs each script's module body (not its main) under ``python -X importtime`` and
+fails if the import time or the set of heavy libraries loaded at startup regresses
+against startup_baseline.json.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BASELINE = Path(__file__).resolve().parent / 'startup_baseline.json'
+
+ENTRY_POINT_DIRS = ['src', 'workflow/scripts', 'scripts']
+
+# Libraries that entry points should only load on first use
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'scipy', 'sklearn', 'torch',
+                 'transformers', 'h5py', 'Bio', 'tqdm', 'pyarrow', 'rich']
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+RUN_MODULE = "import runpy, sys; sys.argv = [{path!r}]; runpy.run_path({path!r}, run_name='__startup__')"
+
+
+def entry_points():
+    """Every script with a ``__main__`` block, relative to the project root."""
+    paths = []
+    for directory in ENTRY_POINT_DIRS:
+        for path in sorted((PROJECT_ROOT / directory).glob('*.py')):
+            if "if __name__ ==" in path.read_text():
+                paths.append(str(path.relative_to(PROJECT_ROOT)))
+    return paths
+
+
+def measure(entry_point: str, cwd: str) -> dict:
+    """Import time (ms) and heavy libraries of one entry point's module body."""
+    path = str(PROJECT_ROOT / entry_point)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', RUN_MODULE.format(path=path)],
+                          cwd=cwd, capture_output=True, text=True)
+    total_us, started, loaded = 0, False, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        # Everything imported after runpy belongs to the entry point
+        if not started:
+            started = name == 'runpy' and len(indent) == 1
+            continue
+        loaded.add(name.split('.')[0])
+        if len(indent) == 1:
+            total_us += int(cumulative)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+        return {'error': error}
+    return {'import_ms': total_us / 1000,
+            'heavy_modules': sorted(m for m in HEAVY_MODULES if m in loaded)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per entry point (fastest is kept)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown against the baseline')
+    parser.add_argument('--slack-ms', type=float, default=25.0,
+                        help='Allowed absolute slowdown, for noise on fast entry points')
+    parser.add_argument('--update', action='store_true', help='Record the results as the new baseline')
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    results, regressions = {}, []
+
+    print(f"{'entry point':<46} {'import ms':>10} {'baseline':>9}  heavy modules at startup")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Round-robin over the entry points, so a burst of load on the machine
+        # slows one run of each rather than every run of one
+        points = entry_points()
+        runs_by_point = {entry_point: [] for entry_point in points}
+        for _ in range(args.repeats):
+            for entry_point in points:
+                runs_by_point[entry_point].append(measure(entry_point, tmp))
+
+        for entry_point in points:
+            runs = runs_by_point[entry_point]
+            if 'error' in runs[0]:
+                print(f"{entry_point:<46} {'-':>10} {'-':>9}  not importable here: {runs[0]['error']}")
+                continue
+            result = {'import_ms': round(min(run['import_ms'] for run in runs), 1),
+                      'heavy_modules': runs[0]['heavy_modules']}
+            results[entry_point] = result
+
+            expected = baseline.get(entry_point)
+            reference = f"{expected['import_ms']:.1f}" if expected else '-'
+            print(f"{entry_point:<46} {result['import_ms']:>10.1f} {reference:>9}  "
+                  f"{', '.join(result['heavy_modules']) or '-'}")
+            if expected and not args.update:
+                budget = expected['import_ms'] * (1 + args.tolerance) + args.slack_ms
+                if result['import_ms'] > budget:
+                    regressions.append(f"{entry_point}: {result['import_ms']:.1f} ms > {budget:.1f} ms budget")
+                new_heavy = set(result['heavy_modules']) - set(expected['heavy_modules'])
+                if new_heavy:
+                    regressions.append(f"{entry_point}: now imports {', '.join(sorted(new_heavy))} at startup")
+
+    if args.update:
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + '\n')
+        print(f"Baseline written to {BASELINE}")
+        return
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark TaxonomyIndex on a synthetic NCBI-sized taxonomy.
+Times the one-off build and the per-query cost of ancestor tests, rank roll-ups and
+lineages against walking a parent dictionary, and checks both agree.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.taxonomy_index import LINEAGE_RANKS, TaxonomyIndex
+
+LEVEL_SHARES = [0.000002, 0.00001, 0.0001, 0.001, 0.01, 0.06, 0.25, 0.68]
+
+
+def write_taxonomy(directory: Path, taxa: int, seed: int = 0):
+    """A random tree with one level per lineage rank; returns the parent dictionary."""
+    rng = np.random.default_rng(seed)
+    sizes = [max(2, int(taxa * share)) for share in LEVEL_SHARES]
+    parents = {1: 1}
+    previous = np.array([1])
+    next_taxid = 2
+    with open(directory / 'nodes.dmp', 'w') as nodes, open(directory / 'names.dmp', 'w') as names:
+        nodes.write("1\t|\t1\t|\tno rank\t|\n")
+        names.write("1\t|\troot\t|\t\t|\tscientific name\t|\n")
+        for rank, size in zip(LINEAGE_RANKS, sizes):
+            level = np.arange(next_taxid, next_taxid + size)
+            level_parents = rng.choice(previous, size)
+            for taxid, parent in zip(level.tolist(), level_parents.tolist()):
+                parents[taxid] = parent
+                nodes.write(f"{taxid}\t|\t{parent}\t|\t{rank}\t|\n")
+                names.write(f"{taxid}\t|\t{rank} {taxid}\t|\t\t|\tscientific name\t|\n")
+            previous, next_taxid = level, next_taxid + size
+    return parents
+
+
+def walk_is_ancestor(parents, ancestor, taxid):
+    while True:
+        if taxid == ancestor:
+            return True
+        parent = parents.get(taxid, taxid)
+        if parent == taxid:
+            return False
+        taxid = parent
+
+
+def walk_ancestor_at(parents, ranks, taxid, rank):
+    while True:
+        if ranks.get(taxid) == rank:
+            return taxid
+        parent = parents.get(taxid, taxid)
+        if parent == taxid:
+            return 0
+        taxid = parent
+
+
+def timed(label, queries, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:>8.3f} {elapsed / queries * 1e6:>10.3f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--taxa', type=int, default=2_500_000, help='Taxa in the synthetic taxonomy')
+    parser.add_argument('--queries', type=int, default=200_000, help='Query taxids per method')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        parents = write_taxonomy(tmp, args.taxa)
+        start = time.perf_counter()
+        index = TaxonomyIndex.from_taxonomy_dir(tmp)
+        print(f"built index of {len(index):,} taxa in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        index = TaxonomyIndex.from_taxonomy_dir(tmp)
+        print(f"reopened (memory-mapped) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        rng = np.random.default_rng(1)
+        taxids = rng.integers(2, len(parents) + 1, args.queries)
+        clade = int(rng.choice([t for t, p in parents.items() if index.rank(t) == 'phylum']))
+        ranks = {t: index.rank(t) for t in parents}
+        queries = taxids.tolist()
+
+        print(f"{'method':<34} {'seconds':>8} {'us/query':>10}")
+        walked = timed('parent walk: ancestor test', args.queries,
+                       lambda: [walk_is_ancestor(parents, clade, t) for t in queries])
+        scalar = timed('index: is_ancestor', args.queries,
+                       lambda: [index.is_ancestor(clade, t) for t in queries])
+        vector = timed('index: descendant_mask', args.queries,
+                       lambda: index.descendant_mask(taxids, clade))
+        walked_rank = timed('parent walk: ancestor at phylum', args.queries,
+                            lambda: [walk_ancestor_at(parents, ranks, t, 'phylum') for t in queries])
+        vector_rank = timed('index: ancestors_at phylum', args.queries,
+                            lambda: index.ancestors_at(taxids, 'phylum'))
+        timed('index: lineage', args.queries, lambda: [index.lineage(t) for t in queries])
+
+    assert walked == scalar == vector.tolist()
+    assert walked_rank == vector_rank.tolist()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SampleValidator result cache on a synthetic cohort with metadata,
+FastQC and Kraken2 outputs. Times an uncached run, a run that fills the cache, a
+fully cached re-run, and a re-run after changing one criterion, and checks the
+cached results match.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from workflow.scripts.sample_validator_fixed import SampleValidator
+
+FASTQC_DATA = Path(__file__).resolve().parents[2] / 'tests' / 'data' / 'fastqc_data.txt'
+REQUIRED_FIELDS = ['collection_date', 'geo_loc_name', 'host', 'isolation_source', 'env_medium']
+
+
+def write_cohort(storage: Path, eda_dir: Path, samples: int, seed: int = 0):
+    """Every sample has metadata and FastQC results; ``with_kraken`` of them also have Kraken2 reports."""
+    rng = np.random.default_rng(seed)
+    for sub in ('fastqc', 'kraken2'):
+        (eda_dir / sub).mkdir(parents=True)
+    accessions = [f"SRR{i:08d}" for i in range(samples)]
+    fastqc_data = FASTQC_DATA.read_bytes()
+    for i, accession in enumerate(accessions):
+        (storage / accession).mkdir(parents=True)
+        (storage / accession / 'metadata.json').write_text(json.dumps(
+            {field: ('Unknown' if rng.random() < 0.1 else 'value') for field in REQUIRED_FIELDS}))
+        with zipfile.ZipFile(eda_dir / 'fastqc' / f"{accession}_fastqc.zip", 'w') as zf:
+            zf.writestr(f"{accession}_fastqc/fastqc_data.txt", fastqc_data)
+        if i % 2:
+            continue
+        fungal = int(rng.integers(0, 1000))
+        lines = [f" 10.00\t100\t100\tU\t0\tunclassified", f" 90.00\t{fungal + 800}\t0\tR\t1\troot",
+                 f"  0.00\t{fungal}\t0\tK\t4751\t  Fungi",
+                 f"  0.00\t{fungal}\t{fungal}\tS\t5062\t    Aspergillus oryzae"]
+        lines += [f"  0.00\t1\t1\tS\t{100000 + j}\t  species {j}" for j in range(800)]
+        (eda_dir / 'kraken2' / f"{accession}_report.txt").write_text('\n'.join(lines) + '\n')
+    return accessions
+
+
+def run(label, config_path, accessions):
+    validator = SampleValidator(config_path, batch_size=32, max_workers=4)
+    validator.logger.setLevel(logging.WARNING)
+    start = time.perf_counter()
+    results = asyncio.run(validator.validate_sample_batch(accessions))
+    elapsed = time.perf_counter() - start
+    stats = validator.result_cache.summary() if validator.result_cache is not None else ''
+    print(f"{label:<32} {elapsed:>8.2f}  {stats}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=5000, help='Accessions to validate')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        storage, eda_dir = tmp / 'cache', tmp / 'eda'
+        accessions = write_cohort(storage, eda_dir, args.samples)
+        config = {'validation': {'required_metadata_fields': REQUIRED_FIELDS,
+                                 'criteria': {'min_read_pairs': 5000, 'min_fungal_signal': 10.0}},
+                  'storage': {'local_path': str(storage), 'eda_dir': str(eda_dir)}}
+        uncached_config = tmp / 'uncached.json'
+        uncached_config.write_text(json.dumps(config))
+        config['storage']['validation_cache'] = str(tmp / 'validation_cache.sqlite')
+        config_path = tmp / 'config.json'
+        config_path.write_text(json.dumps(config))
+
+        print(f"{args.samples:,} samples ({args.samples // 2:,} with Kraken2 reports)")
+        print(f"{'run':<32} {'seconds':>8}  cache")
+        expected = run('no cache', uncached_config, accessions)
+        run('cold cache (fills it)', config_path, accessions)
+        cached = run('warm cache', config_path, accessions)
+
+        config['validation']['criteria']['min_fungal_signal'] = 20.0
+        config_path.write_text(json.dumps(config))
+        run('min_fungal_signal changed', config_path, accessions)
+
+    assert all(cached[acc].passes_all == expected[acc].passes_all
+               and cached[acc].warnings == expected[acc].warnings for acc in accessions)
+
+
+if __name__ == '__main__':
+    main()
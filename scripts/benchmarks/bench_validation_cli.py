@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sample validator CLI on a synthetic cohort.
+Compares one interpreter per sample followed by re-reading and concatenating
+the per-sample CSVs (the former validate_samples + combine_validation_reports
+rules) with a single batch invocation over the manifest, and checks both agree.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+VALIDATOR = Path(__file__).resolve().parents[2] / 'workflow' / 'scripts' / 'sample_validator_fixed.py'
+REQUIRED_FIELDS = ['collection_date', 'geo_loc_name', 'host', 'isolation_source', 'env_medium']
+
+
+def write_cohort(storage: Path, samples: int, seed: int = 0):
+    """Metadata for ``samples`` accessions, some incomplete."""
+    rng = np.random.default_rng(seed)
+    accessions = [f"SRR{i:08d}" for i in range(samples)]
+    for accession in accessions:
+        (storage / accession).mkdir(parents=True)
+        (storage / accession / 'metadata.json').write_text(json.dumps(
+            {field: ('Unknown' if rng.random() < 0.1 else 'value') for field in REQUIRED_FIELDS}))
+    return accessions
+
+
+def per_sample(config_path: Path, accessions, out_dir: Path) -> pd.DataFrame:
+    reports = []
+    for accession in accessions:
+        report = out_dir / f"{accession}_report.csv"
+        subprocess.run([sys.executable, str(VALIDATOR), f"{accession}.fastq.gz", str(config_path), str(report)],
+                       check=True, stderr=subprocess.DEVNULL)
+        reports.append(report)
+    return pd.concat([pd.read_csv(report) for report in reports], ignore_index=True)
+
+
+def batch(config_path: Path, manifest: Path, out_dir: Path) -> pd.DataFrame:
+    combined = out_dir / 'combined_report.csv'
+    subprocess.run([sys.executable, str(VALIDATOR), str(config_path), '--manifest', str(manifest),
+                    '--output', str(combined)], check=True, stderr=subprocess.DEVNULL)
+    return pd.read_csv(combined)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=100, help='Accessions to validate')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        accessions = write_cohort(tmp / 'cache', args.samples)
+        config_path = tmp / 'config.json'
+        config_path.write_text(json.dumps({'validation': {'required_metadata_fields': REQUIRED_FIELDS},
+                                           'storage': {'local_path': str(tmp / 'cache')}}))
+        manifest = tmp / 'manifest.csv'
+        pd.DataFrame({'accession': accessions, 'use_type': 'pilot'}).to_csv(manifest, index=False)
+        for sub in ('per_sample', 'batch'):
+            (tmp / sub).mkdir()
+
+        print(f"{args.samples:,} samples")
+        print(f"{'invocation':<34} {'seconds':>8}")
+        start = time.perf_counter()
+        expected = per_sample(config_path, accessions, tmp / 'per_sample')
+        print(f"{'one process per sample + combine':<34} {time.perf_counter() - start:>8.2f}")
+        start = time.perf_counter()
+        combined = batch(config_path, manifest, tmp / 'batch')
+        print(f"{'one batch process':<34} {time.perf_counter() - start:>8.2f}")
+
+    columns = ['Accession', 'Status', 'metadata_completeness', 'warnings_count']
+    assert combined[columns].equals(expected[columns])
+
+
+if __name__ == '__main__':
+    main()
@@ -5,57 +5,28 @@ Generate EDA summary for M1 Mac pilot run
 
 import pandas as pd
 import json
-import zipfile
-import re
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.eda_store import STORE_DIR, write_table
+from src.fastqc_parser import FastQCReport
+
 def parse_fastqc_data(fastqc_zip_path):
     """Extract data from FastQC zip file"""
     data = {}
     
     try:
-        with zipfile.ZipFile(fastqc_zip_path, 'r') as zf:
-            # Read the summary.txt file
-            summary_file = None
-            for name in zf.namelist():
-                if name.endswith('summary.txt'):
-                    summary_file = name
-                    break
-            
-            if summary_file:
-                summary_content = zf.read(summary_file).decode('utf-8')
-                lines = summary_content.strip().split('\n')
-                
-                for line in lines:
-                    parts = line.split('\t')
-                    if len(parts) >= 3:
-                        status, module, filename = parts[0], parts[1], parts[2]
-                        data[module] = status
-            
-            # Read fastqc_data.txt for detailed stats
-            data_file = None
-            for name in zf.namelist():
-                if name.endswith('fastqc_data.txt'):
-                    data_file = name
-                    break
-            
-            if data_file:
-                fastqc_content = zf.read(data_file).decode('utf-8')
-                
-                # Extract total sequences
-                total_match = re.search(r'Total Sequences\s+(\d+)', fastqc_content)
-                if total_match:
-                    data['total_sequences'] = int(total_match.group(1))
-                
-                # Extract GC content
-                gc_match = re.search(r'%GC\s+(\d+)', fastqc_content)
-                if gc_match:
-                    data['gc_content'] = int(gc_match.group(1))
-                
-                # Extract sequence length
-                length_match = re.search(r'Sequence length\s+(\d+(?:-\d+)?)', fastqc_content)
-                if length_match:
-                    data['sequence_length'] = length_match.group(1)
+        report = FastQCReport.from_zip(fastqc_zip_path)
+        
+        # Module statuses, as listed in summary.txt
+        data.update(report.statuses)
+        
+        # Detailed stats from the same single pass over fastqc_data.txt
+        data['total_sequences'] = report.total_sequences
+        data['gc_content'] = int(report.gc_percent)
+        data['sequence_length'] = report.sequence_length
     
     except Exception as e:
         print(f"Error parsing FastQC data from {fastqc_zip_path}: {e}")
@@ -107,6 +78,7 @@ def generate_eda_summary():
     df = pd.DataFrame(summary_data)
     output_file = "results/demo/eda_summary.csv"
     df.to_csv(output_file, index=False)
+    write_table(df, Path(output_file).parent / STORE_DIR, "eda_summary")
     
     print(f"✅ EDA summary saved to {output_file}")
     print(f"📊 Processed {len(df)} samples")
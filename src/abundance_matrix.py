@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Cross-sample taxonomic abundance matrix for FungiMap.
+Streams Kraken2 reports and Bracken outputs into a samples x taxa scipy.sparse CSR
+matrix over a persistent taxid vocabulary, saved as one compressed ``.npz``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Make the project root importable when run as `python src/abundance_matrix.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.checksums import source_stamp
+from src.kraken_report import KrakenReport
+from src.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Per-sample output suffixes; the sample id is the file name without them
+KRAKEN_SUFFIX = '_report.txt'
+BRACKEN_SUFFIX = '_bracken.txt'
+
+BRACKEN_COLUMNS = ('name', 'taxonomy_id', 'taxonomy_lvl', 'new_est_reads')
+
+
+class AbundanceMatrix:
+    """Read counts of every sample (rows) for every taxon seen so far (columns).
+
+    Columns are only ever appended, so a taxid keeps its column as samples are
+    added. Rows are stored as CSR arrays that grow by concatenation; ``matrix``
+    assembles them on first use after a change. ``sources`` records each row's
+    input file stamp, so ``update`` only re-parses new or changed outputs.
+    """
+
+    def __init__(self):
+        self.samples: List[str] = []
+        self.sources: List[str] = []
+        self.taxids: List[int] = []
+        self.names: List[str] = []
+        self.ranks: List[str] = []
+        self._columns: Dict[int, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._indptr = [0]
+        self._indices: List[np.ndarray] = []
+        self._data: List[np.ndarray] = []
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __contains__(self, sample_id: str) -> bool:
+        return sample_id in self._rows
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.samples), len(self.taxids)
+
+    @property
+    def matrix(self):
+        """The ``scipy.sparse.csr_matrix`` of read counts (int64)."""
+        if self._matrix is None:
+            from scipy import sparse
+
+            indices = np.concatenate(self._indices) if self._indices else np.zeros(0, dtype=np.int32)
+            data = np.concatenate(self._data) if self._data else np.zeros(0, dtype=np.int64)
+            if len(self._indices) > 1:
+                # Keep one chunk so later appends do not re-concatenate every row
+                self._indices, self._data = [indices], [data]
+            self._matrix = sparse.csr_matrix(
+                (data, indices, np.asarray(self._indptr, dtype=np.int64)), shape=self.shape)
+        return self._matrix
+
+    def column(self, taxid: int) -> Optional[int]:
+        return self._columns.get(taxid)
+
+    def append(self, sample_id: str, taxids: Iterable[int], counts: Iterable[int],
+               names: Optional[Iterable[str]] = None, ranks: Optional[Iterable[str]] = None,
+               source: str = '') -> None:
+        """Add one sample's counts; taxa not yet in the vocabulary get new columns.
+
+        Zero counts are not stored and repeated taxids are summed.
+        """
+        if sample_id in self._rows:
+            raise ValueError(f"Sample {sample_id} is already in the matrix")
+        taxids = np.asarray(taxids if isinstance(taxids, np.ndarray) else list(taxids), dtype=np.int64)
+        counts = np.asarray(counts if isinstance(counts, np.ndarray) else list(counts), dtype=np.int64)
+        names = list(names) if names is not None else [''] * len(taxids)
+        ranks = list(ranks) if ranks is not None else [''] * len(taxids)
+
+        columns = np.empty(len(taxids), dtype=np.int32)
+        for i, taxid in enumerate(taxids.tolist()):
+            column = self._columns.get(taxid)
+            if column is None:
+                column = self._columns[taxid] = len(self.taxids)
+                self.taxids.append(taxid)
+                self.names.append(names[i])
+                self.ranks.append(ranks[i])
+            columns[i] = column
+
+        keep = counts != 0
+        order = np.argsort(columns[keep], kind='stable')
+        columns, counts = columns[keep][order], counts[keep][order]
+        unique, starts = np.unique(columns, return_index=True)
+        summed = np.add.reduceat(counts, starts) if len(counts) else counts
+
+        self._rows[sample_id] = len(self.samples)
+        self.samples.append(sample_id)
+        self.sources.append(source)
+        self._indices.append(unique.astype(np.int32))
+        self._data.append(summed)
+        self._indptr.append(self._indptr[-1] + len(unique))
+        self._matrix = None
+
+    def drop(self, sample_ids: Iterable[str]) -> None:
+        """Remove samples (e.g. before re-adding changed outputs); taxid columns are kept."""
+        drop = {self._rows[sample_id] for sample_id in sample_ids if sample_id in self._rows}
+        if not drop:
+            return
+        keep = np.array([row not in drop for row in range(len(self.samples))], dtype=bool)
+        matrix = self.matrix[keep]
+        self.samples = [s for s, k in zip(self.samples, keep) if k]
+        self.sources = [s for s, k in zip(self.sources, keep) if k]
+        self._rows = {sample_id: row for row, sample_id in enumerate(self.samples)}
+        self._set_arrays(matrix.indptr, matrix.indices, matrix.data)
+
+    def _set_arrays(self, indptr, indices, data) -> None:
+        self._indptr = np.asarray(indptr, dtype=np.int64).tolist()
+        self._indices = [np.asarray(indices, dtype=np.int32)]
+        self._data = [np.asarray(data, dtype=np.int64)]
+        self._matrix = None
+
+    def add_kraken_report(self, path: Path, sample_id: Optional[str] = None) -> None:
+        """Add a Kraken2 report's direct (not clade) counts, so rows sum to the sample's reads."""
+        path = Path(path)
+        self.append(sample_id or sample_id_from_path(path), *read_kraken_counts(path),
+                    source=source_stamp(path))
+
+    def add_bracken(self, path: Path, sample_id: Optional[str] = None) -> None:
+        """Add Bracken's re-estimated read counts (``new_est_reads``)."""
+        path = Path(path)
+        self.append(sample_id or sample_id_from_path(path), *read_bracken_counts(path),
+                    source=source_stamp(path))
+
+    def update(self, paths: Iterable[Path], max_workers: Optional[int] = None) -> Dict[str, str]:
+        """Add new outputs and replace changed ones; return each sample's status.
+
+        The status is ``added``, ``updated``, ``unchanged`` or ``failed``. Files
+        ending in ``_bracken.txt`` are read as Bracken output, anything else as a
+        Kraken2 report. When several files map to one sample, its Bracken output is
+        used (else the last file given) and the others are reported under their
+        path as ``skipped``. Parsing runs across processes; new and changed rows are
+        appended in input order, and a changed sample that fails to parse is removed.
+        """
+        status, pending, chosen = {}, [], {}
+        for path in dict.fromkeys(map(Path, paths)):
+            sample_id = sample_id_from_path(path)
+            previous = chosen.get(sample_id)
+            if previous is not None:
+                if previous.name.endswith(BRACKEN_SUFFIX) and not path.name.endswith(BRACKEN_SUFFIX):
+                    previous, path = path, previous
+                logger.warning(f"Skipping {previous}: {path} is also an output for sample {sample_id}")
+                status[str(previous)] = 'skipped'
+            chosen[sample_id] = path
+
+        for sample_id, path in chosen.items():
+            row = self._rows.get(sample_id)
+            if row is not None and path.exists() and self.sources[row] == source_stamp(path):
+                status[sample_id] = 'unchanged'
+            else:
+                pending.append((sample_id, path))
+                status[sample_id] = 'updated' if row is not None else 'added'
+
+        self.drop([sample_id for sample_id, _ in pending if status[sample_id] == 'updated'])
+        workers = min(max_workers or os.cpu_count() or 1, len(pending))
+        paths = [path for _, path in pending]
+        if workers > 1:
+            chunksize = max(1, len(paths) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_read_counts_task, paths, chunksize=chunksize))
+        else:
+            results = [_read_counts_task(path) for path in paths]
+
+        for (sample_id, path), (counts, source, error) in zip(pending, results):
+            if error is not None:
+                logger.error(f"Error reading abundances from {path}: {error}")
+                status[sample_id] = 'failed'
+                continue
+            self.append(sample_id, *counts, source=source)
+        return status
+
+    def relative(self):
+        """Rows scaled to fractions of each sample's total (float64 CSR)."""
+        matrix = self.matrix.astype(np.float64)
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+        scale = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        return matrix.multiply(scale[:, None]).tocsr()
+
+    def to_dataframe(self, relative: bool = False, min_samples: int = 1) -> pd.DataFrame:
+        """Dense DataFrame (samples x taxids) of the taxa found in at least ``min_samples`` samples.
+
+        Meant for model features and reports; cohort-wide work should use ``matrix``.
+        """
+        matrix = self.relative() if relative else self.matrix
+        prevalence = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        columns = np.flatnonzero(prevalence >= min_samples)
+        return pd.DataFrame(matrix[:, columns].toarray(), index=pd.Index(self.samples, name='sample'),
+                            columns=pd.Index(np.asarray(self.taxids, dtype=np.int64)[columns], name='taxid'))
+
+    def save(self, path: Path) -> None:
+        """Write a compressed ``.npz`` (atomically, via a temporary file)."""
+        path = Path(path)
+        matrix = self.matrix
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f, version=np.array(FORMAT_VERSION), indptr=matrix.indptr, indices=matrix.indices,
+                data=matrix.data, samples=np.array(self.samples, dtype=str),
+                sources=np.array(self.sources, dtype=str), taxids=np.array(self.taxids, dtype=np.int64),
+                names=np.array(self.names, dtype=str), ranks=np.array(self.ranks, dtype=str))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'AbundanceMatrix':
+        with np.load(path, allow_pickle=False) as f:
+            if int(f['version']) != FORMAT_VERSION:
+                raise ValueError(f"{path}: abundance matrix format {int(f['version'])}, "
+                                 f"expected {FORMAT_VERSION}")
+            abundance = cls()
+            abundance.samples = f['samples'].tolist()
+            abundance.sources = f['sources'].tolist()
+            abundance.taxids = f['taxids'].tolist()
+            abundance.names = f['names'].tolist()
+            abundance.ranks = f['ranks'].tolist()
+            abundance._set_arrays(f['indptr'], f['indices'], f['data'])
+        abundance._rows = {sample_id: row for row, sample_id in enumerate(abundance.samples)}
+        abundance._columns = {taxid: column for column, taxid in enumerate(abundance.taxids)}
+        return abundance
+
+    @classmethod
+    def open(cls, path: Path) -> 'AbundanceMatrix':
+        """Load ``path`` if it exists, else start an empty matrix to be saved there."""
+        return cls.load(path) if Path(path).exists() else cls()
+
+
+def sample_id_from_path(path: Path) -> str:
+    name = Path(path).name
+    for suffix in (BRACKEN_SUFFIX, KRAKEN_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+
+def read_kraken_counts(path: Path) -> Tuple[np.ndarray, np.ndarray, List[str], List[str]]:
+    report = KrakenReport.from_file(path)
+    return report.taxids, report.direct_counts, report.names, report.ranks.tolist()
+
+
+def read_bracken_counts(path: Path) -> Tuple[np.ndarray, np.ndarray, List[str], List[str]]:
+    """Taxids, estimated reads, names and levels of a Bracken output (read in one pass)."""
+    with open(path) as f:
+        header = f.readline().rstrip('\n').split('\t')
+        try:
+            positions = [header.index(column) for column in BRACKEN_COLUMNS]
+        except ValueError:
+            raise ValueError(f"{path}: not a Bracken output (header {header})") from None
+        rows = [line.rstrip('\n').split('\t') for line in f if line.strip()]
+    name, taxid, level, reads = ([row[i] for row in rows] for i in positions)
+    return (np.array(taxid, dtype=np.int64), np.array(reads, dtype=np.int64), name, level)
+
+
+def _read_counts_task(path: Path):
+    try:
+        reader = read_bracken_counts if path.name.endswith(BRACKEN_SUFFIX) else read_kraken_counts
+        source = source_stamp(path)
+        return reader(path), source, None
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {str(e)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update a samples x taxa abundance matrix")
+    parser.add_argument('paths', nargs='+', type=Path,
+                        help='Kraken2 reports (*_report.txt) or Bracken outputs (*_bracken.txt)')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='Matrix .npz to create or update')
+    parser.add_argument('--workers', type=int, help='Processes to parse with (default: CPU count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    abundance = AbundanceMatrix.open(args.output)
+    status = abundance.update(args.paths, args.workers)
+    abundance.save(args.output)
+    counts = {state: sum(1 for s in status.values() if s == state)
+              for state in ('added', 'updated', 'unchanged', 'skipped', 'failed')}
+    logger.info(f"{args.output}: {abundance.shape[0]} samples x {abundance.shape[1]} taxa "
+                f"({counts['added']} added, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged, {counts['skipped']} skipped, {counts['failed']} failed)")
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
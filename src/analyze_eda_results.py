@@ -4,17 +4,38 @@ Enhanced EDA Analysis Script for FungiMap
 This script analyzes FastQC, Kraken2, and MultiQC outputs to generate comprehensive QC reports.
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 import json
 
+# Make the project root importable when run as `python src/analyze_eda_results.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.abundance_matrix import AbundanceMatrix
+from src.checksums import BUFFER_SIZE, hash_file
+from src.eda_store import STORE_DIR, write_table
+from src.fastqc_parser import PER_BASE_QUALITY, PER_SEQUENCE_GC, FastQCReport
+from src.kraken_report import FUNGI_TAXID, KrakenReport
+from src.lazy_import import lazy_import
+from src.plot_renderer import PlotJob, render_plots, reusable_figure
+from src.taxonomy_index import TaxonomyIndex
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Plotting libraries are only loaded when a figure is rendered
+sns = lazy_import('seaborn')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,13 +47,117 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parsed per-sample rows, reused while a sample's inputs are unchanged. Bump the
+# version when parsing changes what a row contains so stale rows are not reused.
+READ_STATS_CACHE = 'read_stats_cache.v1.parquet'
+
+# Samples x taxa read counts from the Kraken2 reports, updated in place each run
+ABUNDANCE_MATRIX = 'abundance_matrix.npz'
+
+# Inputs fingerprinted in the cache, by column prefix (see EDAAnalyzer.sample_inputs)
+CACHE_INPUTS = ('kraken', 'fastqc')
+FINGERPRINT_COLUMNS = [f"{name}_{field}" for name in CACHE_INPUTS
+                       for field in ('size', 'mtime_ns', 'sha256')]
+
+# Per-sample QC thresholds: the column each one checks and the note of a failing sample.
+# Other ``min_<column>``/``max_<column>`` thresholds apply to that column when present.
+QC_RULES = {
+    'min_reads': ('total_reads', 'Insufficient reads ({:,})'),
+    'min_fungal_percent': ('fungal_percent', 'Low fungal content ({:.2f}%)'),
+    'max_human_percent': ('human_percent', 'High human contamination ({:.2f}%)')
+}
+
+def render_fungal_content_dist(path: Path, fungal_percent: np.ndarray) -> None:
+    from matplotlib.figure import Figure
+    
+    figure = Figure(figsize=(10, 6))
+    ax = figure.subplots()
+    sns.histplot(x=fungal_percent, bins=20, ax=ax)
+    ax.set_title('Distribution of Fungal Content')
+    ax.set_xlabel('Fungal Content (%)')
+    ax.set_ylabel('Count')
+    figure.savefig(path)
+
+def render_qc_status_dist(path: Path, qc_counts: pd.Series) -> None:
+    from matplotlib.figure import Figure
+    
+    figure = Figure(figsize=(8, 6))
+    ax = figure.subplots()
+    ax.pie(qc_counts, labels=qc_counts.index, autopct='%1.1f%%')
+    ax.set_title('Sample QC Status Distribution')
+    figure.savefig(path)
+
+def _setup_sample_qc_panel(figure: Figure) -> None:
+    quality_ax, gc_ax = figure.subplots(1, 2)
+    quality_ax.plot([], [])
+    quality_ax.axhline(20, color='grey', linestyle='--', linewidth=0.8)
+    quality_ax.set_title('Per-base mean quality')
+    quality_ax.set_xlabel('Position (base or base group)')
+    quality_ax.set_ylabel('Phred score')
+    gc_ax.plot([], [])
+    gc_ax.set_xlabel('GC (%)')
+    gc_ax.set_ylabel('Reads')
+    figure.suptitle('')
+
+def render_sample_qc_panel(path: Path, sample_id: str, fastqc_path: Path) -> None:
+    """Per-base mean quality and per-sequence GC distribution of one sample.
+    
+    The figure is built once per worker; each sample only swaps in its data.
+    """
+    report = FastQCReport.from_path(fastqc_path)
+    figure = reusable_figure(render_sample_qc_panel, (10, 4), _setup_sample_qc_panel)
+    quality_ax, gc_ax = figure.axes
+    
+    means = report[PER_BASE_QUALITY]['Mean'] if PER_BASE_QUALITY in report else np.empty(0)
+    quality_ax.lines[0].set_data(np.arange(1, len(means) + 1), means)
+    
+    if PER_SEQUENCE_GC in report:
+        gc = report[PER_SEQUENCE_GC]
+        gc_ax.lines[0].set_data(gc['GC Content'], gc['Count'])
+    else:
+        gc_ax.lines[0].set_data([], [])
+    gc_ax.set_title(f"GC distribution (mean {report.gc_percent:.0f}%)")
+    
+    for ax in (quality_ax, gc_ax):
+        ax.relim()
+        ax.autoscale_view()
+    figure.suptitle(sample_id)
+    figure.savefig(path, dpi=80)
+
+def _sample_stats_task(task: Tuple['EDAAnalyzer', str]) -> Tuple[Optional[Dict], Optional[str]]:
+    """Process-pool entry point: parse one sample and return ``(stats, error)``."""
+    analyzer, sample_id = task
+    try:
+        # Fingerprint before parsing so a file changed mid-parse is re-parsed next run
+        fingerprint = analyzer.sample_fingerprint(sample_id, content_hash=analyzer.use_cache)
+        return {**analyzer.sample_stats(sample_id), **fingerprint}, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {str(e)}"
+
 class EDAAnalyzer:
-    def __init__(self, base_dir: Path):
-        """Initialize EDA analyzer with improved error checking."""
+    def __init__(self, base_dir: Path, max_workers: Optional[int] = None,
+                 use_cache: bool = True, thresholds: Optional[Dict] = None,
+                 sample_plots: bool = False, taxonomy_dir: Optional[Path] = None):
+        """Initialize EDA analyzer with improved error checking.
+
+        ``max_workers`` sets the processes used to parse samples (default: CPU count;
+        1 parses in this process). ``use_cache`` keeps parsed samples in
+        ``results/eda/read_stats_cache.v1.parquet`` so later runs only parse new or
+        changed samples. ``thresholds`` overrides or extends the QC thresholds.
+        ``sample_plots`` adds a per-sample GC/quality panel to each run.
+        ``taxonomy_dir`` (a Kraken2 database or a directory with ``nodes.dmp`` and
+        ``names.dmp``) adds lineages and fungal phylum roll-ups to parsed reports.
+        """
         self.base_dir = Path(base_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.sample_plots = sample_plots
+        self.failed_samples: Dict[str, str] = {}
         self.eda_dir = self.base_dir / 'results' / 'eda'
         self.kraken_dir = self.eda_dir / 'kraken2'
         self.fastqc_dir = self.eda_dir / 'fastqc'
+        self.store_dir = self.eda_dir / STORE_DIR
+        self.taxonomy = TaxonomyIndex.from_taxonomy_dir(taxonomy_dir) if taxonomy_dir else None
         
         # Validate directory structure
         self._validate_directories()
@@ -44,6 +169,7 @@ class EDAAnalyzer:
             'max_human_percent': 5.0,
             'min_qc_pass_rate': 0.8
         }
+        self.thresholds.update(thresholds or {})
 
     def calculate_metadata_completeness(self, data: pd.DataFrame) -> pd.Series:
         """Calculate metadata completeness for each sample."""
@@ -109,135 +235,235 @@ class EDAAnalyzer:
     def parse_kraken_report(self, report_path: Path) -> Dict:
         """Parse Kraken2 report with enhanced taxonomic analysis."""
         try:
-            df = pd.read_csv(report_path, sep='\t', header=None,
-                           names=['percent', 'clade_reads', 'direct_reads', 
-                                'rank', 'taxid', 'name'])
+            report = KrakenReport.from_file(report_path)
+            if report.total_reads == 0:
+                raise ValueError("report has no classified or unclassified reads")
             
-            # Extract key metrics
-            total_classified = df[df['name'] == 'root']['clade_reads'].iloc[0]
-            unclassified = df[df['name'] == 'unclassified']['clade_reads'].iloc[0]
-            total_reads = total_classified + unclassified
+            # Totals and clade fractions are taxid lookups: root, Fungi, Homo sapiens
+            summary = report.summary()
             
-            # Get fungal reads
-            fungi_row = df[df['name'] == 'Fungi']
-            fungal_reads = fungi_row['clade_reads'].iloc[0] if not fungi_row.empty else 0
-            
-            # Get human reads
-            human_row = df[df['name'] == 'Homo sapiens']
-            human_reads = human_row['clade_reads'].iloc[0] if not human_row.empty else 0
+            stats = {
+                'total_reads': summary['total_reads'],
+                'classified_reads': summary['classified_reads'],
+                'classified_percent': summary['classified_percent'],
+                'fungal_reads': summary['fungal_reads'],
+                'fungal_percent': summary['fungal_percent'],
+                'human_reads': summary['human_reads'],
+                'human_percent': summary['human_percent'],
+                'top_species': report.top('S', 10)
+            }
             
-            # Get top 10 species
-            species_df = df[df['rank'] == 'S'].sort_values('clade_reads', ascending=False).head(10)
+            if self.taxonomy is not None:
+                # Lineages and phylum roll-ups come from the full taxonomy, not the report's nesting
+                for species in stats['top_species']:
+                    species['lineage'] = self.taxonomy.lineage(species['taxid'])
+                phyla = self.taxonomy.rollup(report.taxids, report.direct_counts, 'phylum',
+                                             within=FUNGI_TAXID)
+                stats['fungal_phyla'] = {self.taxonomy.name(taxid): reads
+                                         for taxid, reads in sorted(phyla.items(), key=lambda x: -x[1])}
             
-            return {
-                'total_reads': total_reads,
-                'classified_reads': total_classified,
-                'classified_percent': (total_classified / total_reads) * 100,
-                'fungal_reads': fungal_reads,
-                'fungal_percent': (fungal_reads / total_reads) * 100,
-                'human_reads': human_reads,
-                'human_percent': (human_reads / total_reads) * 100,
-                'top_species': species_df.to_dict('records')
-            }
+            return stats
             
         except Exception as e:
             logger.error(f"Error parsing Kraken report {report_path}: {str(e)}")
             raise
     
     def analyze_fastqc(self, fastqc_path: Path) -> Dict:
-        """Parse FastQC results with enhanced quality metrics."""
+        """Parse FastQC results (``_fastqc.zip`` or extracted directory) with enhanced quality metrics."""
         try:
-            # Parse FastQC data file
-            with open(fastqc_path / 'fastqc_data.txt') as f:
-                content = f.read()
-            
-            # Extract key metrics
-            sections = content.split('>>END_MODULE')
-            basic_stats = {}
-            
-            for section in sections:
-                if 'Basic Statistics' in section:
-                    lines = section.strip().split('\n')[2:]
-                    for line in lines:
-                        if '\t' in line:
-                            key, value = line.split('\t')
-                            basic_stats[key] = value
+            report = FastQCReport.from_path(fastqc_path)
             
             return {
-                'total_sequences': int(basic_stats.get('Total Sequences', 0)),
-                'sequence_length': basic_stats.get('Sequence length', ''),
-                'gc_percent': float(basic_stats.get('%GC', 0)),
-                'quality_encoding': basic_stats.get('Encoding', '')
+                'total_sequences': report.total_sequences,
+                'sequence_length': report.sequence_length,
+                'gc_percent': report.gc_percent,
+                'quality_encoding': report.encoding
             }
             
         except Exception as e:
             logger.error(f"Error analyzing FastQC results from {fastqc_path}: {str(e)}")
             raise
     
-    def generate_read_stats(self) -> pd.DataFrame:
-        """Generate enhanced read statistics with quality metrics."""
-        stats_list = []
+    def fastqc_path(self, sample_id: str) -> Path:
+        """The sample's extracted ``_fastqc`` directory if present, else its ``_fastqc.zip``."""
+        extracted = self.fastqc_dir / f"{sample_id}_fastqc"
+        return extracted if extracted.is_dir() else extracted.with_name(extracted.name + '.zip')
+    
+    def sample_stats(self, sample_id: str) -> Dict:
+        """Combine the Kraken2 and FastQC statistics of one sample."""
+        kraken_stats = self.parse_kraken_report(self.kraken_dir / f"{sample_id}_report.txt")
+        fastqc_stats = self.analyze_fastqc(self.fastqc_path(sample_id))
         
-        for fastq in self.eda_dir.glob('*.fastq.gz'):
-            sample_id = fastq.stem.split('.')[0]
-            kraken_report = self.kraken_dir / f"{sample_id}_report.txt"
-            fastqc_path = self.fastqc_dir / f"{sample_id}_fastqc"
-            
+        return {
+            'sample_id': sample_id,
+            'total_reads': kraken_stats['total_reads'],
+            'classified_percent': kraken_stats['classified_percent'],
+            'fungal_percent': kraken_stats['fungal_percent'],
+            'human_percent': kraken_stats['human_percent'],
+            'gc_percent': fastqc_stats['gc_percent'],
+            'avg_length': fastqc_stats['sequence_length']
+        }
+    
+    def sample_inputs(self, sample_id: str) -> Dict[str, Path]:
+        """The files parsed for a sample, keyed by their parse-cache column prefix."""
+        fastqc_path = self.fastqc_path(sample_id)
+        return {
+            'kraken': self.kraken_dir / f"{sample_id}_report.txt",
+            'fastqc': fastqc_path / 'fastqc_data.txt' if fastqc_path.is_dir() else fastqc_path
+        }
+    
+    def sample_fingerprint(self, sample_id: str, content_hash: bool = False) -> Dict:
+        """Size and mtime (and optionally SHA-256) of each input; -1 for missing files."""
+        fingerprint = {}
+        for name, path in self.sample_inputs(sample_id).items():
             try:
-                # Get Kraken stats
-                kraken_stats = self.parse_kraken_report(kraken_report)
-                
-                # Get FastQC stats
-                fastqc_stats = self.analyze_fastqc(fastqc_path)
-                
-                # Combine stats
-                stats = {
-                    'sample_id': sample_id,
-                    'total_reads': kraken_stats['total_reads'],
-                    'classified_percent': kraken_stats['classified_percent'],
-                    'fungal_percent': kraken_stats['fungal_percent'],
-                    'human_percent': kraken_stats['human_percent'],
-                    'gc_percent': fastqc_stats['gc_percent'],
-                    'avg_length': fastqc_stats['sequence_length']
-                }
-                
-                stats_list.append(stats)
-                
-            except Exception as e:
-                logger.error(f"Error processing sample {sample_id}: {str(e)}")
+                stat = path.stat()
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            except OSError:
+                size = mtime_ns = -1
+            fingerprint[f"{name}_size"] = size
+            fingerprint[f"{name}_mtime_ns"] = mtime_ns
+            if content_hash:
+                # Reports are far smaller than hash_file's 8 MB default buffer
+                buffer_size = min(size + 1, BUFFER_SIZE)
+                fingerprint[f"{name}_sha256"] = (hash_file(path, buffer_size=buffer_size)['sha256']
+                                                 if size >= 0 else '')
+        return fingerprint
+    
+    def _current_cached_row(self, sample_id: str, row: Dict) -> Optional[Dict]:
+        """The cached row if it still matches the sample's inputs (with refreshed mtimes), else None."""
+        current = self.sample_fingerprint(sample_id)
+        if all(row.get(key) == value for key, value in current.items()):
+            return row
+        
+        # A touched or re-copied file keeps its size; compare content before re-parsing
+        if any(row.get(f"{name}_size") != current[f"{name}_size"] for name in CACHE_INPUTS):
+            return None
+        hashed = self.sample_fingerprint(sample_id, content_hash=True)
+        if all(row.get(f"{name}_sha256") == hashed[f"{name}_sha256"] for name in CACHE_INPUTS):
+            return {**row, **hashed}
+        return None
+    
+    def _load_stats_cache(self) -> Dict[str, Dict]:
+        """Cached rows by sample ID; an unreadable cache is ignored and rebuilt."""
+        cache_path = self.eda_dir / READ_STATS_CACHE
+        if not cache_path.exists():
+            return {}
+        try:
+            cached = pd.read_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parse cache {cache_path}: {str(e)}")
+            return {}
+        return {row['sample_id']: row for row in cached.to_dict('records')}
+    
+    def _save_stats_cache(self, rows: List[Dict]) -> None:
+        cache_path = self.eda_dir / READ_STATS_CACHE
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            pd.DataFrame(rows).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write parse cache {cache_path}: {str(e)}")
+    
+    def generate_read_stats(self) -> pd.DataFrame:
+        """Generate enhanced read statistics with quality metrics.
+        
+        Samples whose inputs match the parse cache reuse their cached row; the others
+        are parsed across ``max_workers`` processes. Rows are returned in sample
+        order. A sample that fails is logged, recorded in ``failed_samples`` and left
+        out (and uncached) without stopping the others.
+        """
+        sample_ids = sorted(fastq.stem.split('.')[0] for fastq in self.eda_dir.glob('*.fastq.gz'))
+        
+        cached = self._load_stats_cache() if self.use_cache else {}
+        rows = {}
+        refreshed = 0
+        for sample_id in sample_ids:
+            row = cached.get(sample_id)
+            current = self._current_cached_row(sample_id, row) if row is not None else None
+            if current is not None:
+                rows[sample_id] = current
+                refreshed += current is not row
+        stale = [sample_id for sample_id in sample_ids if sample_id not in rows]
+        if cached:
+            logger.info(f"Reusing {len(rows)} cached samples, parsing {len(stale)}")
+        
+        tasks = [(self, sample_id) for sample_id in stale]
+        workers = min(self.max_workers, len(tasks))
+        if workers > 1:
+            # Several samples per task keep pickling overhead small for large directories
+            chunksize = max(1, len(tasks) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_sample_stats_task, tasks, chunksize=chunksize))
+        else:
+            results = [_sample_stats_task(task) for task in tasks]
+        
+        self.failed_samples = {}
+        for sample_id, (stats, error) in zip(stale, results):
+            if error is not None:
+                logger.error(f"Error processing sample {sample_id}: {error}")
+                self.failed_samples[sample_id] = error
                 continue
+            rows[sample_id] = stats
         
-        return pd.DataFrame(stats_list)
+        if self.failed_samples:
+            logger.warning(f"{len(self.failed_samples)} of {len(sample_ids)} samples failed")
+        
+        ordered = [rows[sample_id] for sample_id in sample_ids if sample_id in rows]
+        if self.use_cache and (stale or refreshed or len(cached) != len(ordered)):
+            self._save_stats_cache(ordered)
+        
+        return pd.DataFrame(ordered).drop(columns=FINGERPRINT_COLUMNS, errors='ignore')
+    
+    def qc_rules(self, columns) -> List[Tuple[str, str, float, str]]:
+        """``(column, 'min'|'max', threshold, note)`` for every threshold that applies to ``columns``."""
+        rules = []
+        for key, threshold in self.thresholds.items():
+            bound, _, name = key.partition('_')
+            if key in QC_RULES:
+                column, note = QC_RULES[key]
+            elif bound in ('min', 'max'):
+                column = name
+                note = f"{column} {'below' if bound == 'min' else 'above'} {threshold} ({{}})"
+            else:
+                continue
+            if column in columns:
+                rules.append((column, bound, threshold, note))
+        return rules
     
     def create_qc_summary(self, stats_df: pd.DataFrame) -> pd.DataFrame:
-        """Generate enhanced QC summary with pass/fail criteria."""
-        summary_list = []
+        """Generate enhanced QC summary with pass/fail criteria.
         
-        for _, row in stats_df.iterrows():
-            # Apply QC criteria
-            qc_status = 'PASS'
-            notes = []
-            
-            if row['total_reads'] < self.thresholds['min_reads']:
-                qc_status = 'EXCLUDE'
-                notes.append(f"Insufficient reads ({row['total_reads']:,})")
-            
-            if row['fungal_percent'] < self.thresholds['min_fungal_percent']:
-                qc_status = 'EXCLUDE'
-                notes.append(f"Low fungal content ({row['fungal_percent']:.2f}%)")
-            
-            if row['human_percent'] > self.thresholds['max_human_percent']:
-                qc_status = 'EXCLUDE'
-                notes.append(f"High human contamination ({row['human_percent']:.2f}%)")
+        Each threshold is evaluated as a boolean mask over the whole frame. Notes are
+        formatted only for the failing values and joined column-wise in rule order.
+        """
+        if stats_df.empty:
+            return pd.DataFrame()
+        
+        stats_df = stats_df.reset_index(drop=True)
+        excluded = np.zeros(len(stats_df), dtype=bool)
+        notes = np.full(len(stats_df), '', dtype=object)
+        
+        for column, bound, threshold, note in self.qc_rules(stats_df.columns):
+            values = stats_df[column]
+            failed = (values < threshold if bound == 'min' else values > threshold).to_numpy()
+            if not failed.any():
+                continue
+            excluded |= failed
             
-            summary_list.append({
-                'sample_id': row['sample_id'],
-                'qc_status': qc_status,
-                'notes': '; '.join(notes) if notes else 'Passed all criteria',
-                **row.to_dict()
-            })
+            rows = np.flatnonzero(failed)
+            messages = np.array(list(map(note.format, values.to_numpy()[rows])), dtype=object)
+            previous = notes[rows]
+            notes[rows] = np.where(previous == '', messages, previous + '; ' + messages)
         
-        return pd.DataFrame(summary_list)
+        notes[notes == ''] = 'Passed all criteria'
+        summary = pd.DataFrame({
+            'sample_id': stats_df['sample_id'],
+            'qc_status': np.where(excluded, 'EXCLUDE', 'PASS'),
+            'notes': notes
+        })
+        other = stats_df.drop(columns=['sample_id', 'qc_status', 'notes'], errors='ignore')
+        return pd.concat([summary, other], axis=1)
     
     def run_analysis(self):
         """Run complete EDA analysis pipeline."""
@@ -254,37 +480,71 @@ class EDAAnalyzer:
             qc_summary.to_csv(self.eda_dir / 'sample_qc_summary.csv', index=False)
             logger.info("Generated QC summary")
             
+            if not stats_df.empty:
+                abundance = self.update_abundance_matrix(stats_df['sample_id'])
+                logger.info(f"Abundance matrix: {abundance.shape[0]} samples x {abundance.shape[1]} taxa")
+            
+            # Columnar copies for readers that only need some columns or samples
+            write_table(stats_df, self.store_dir, 'read_stats')
+            write_table(qc_summary, self.store_dir, 'qc_summary')
+            logger.info(f"Updated EDA store in {self.store_dir}")
+            
             # Create summary visualizations
             self.create_summary_plots(stats_df, qc_summary)
             logger.info("Generated summary plots")
             
+            if self.sample_plots and not stats_df.empty:
+                self.create_sample_plots(stats_df['sample_id'])
+                logger.info("Generated per-sample plots")
+            
             logger.info("EDA analysis completed successfully")
             
         except Exception as e:
             logger.error(f"Error in analysis pipeline: {str(e)}")
             raise
     
-    def create_summary_plots(self, stats_df: pd.DataFrame, qc_df: pd.DataFrame):
-        """Generate enhanced summary visualizations."""
-        plot_dir = self.eda_dir / 'plots'
-        plot_dir.mkdir(exist_ok=True)
+    def create_summary_plots(self, stats_df: pd.DataFrame, qc_df: pd.DataFrame) -> Dict[str, str]:
+        """Generate enhanced summary visualizations.
         
-        # Fungal content distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(data=stats_df, x='fungal_percent', bins=20)
-        plt.title('Distribution of Fungal Content')
-        plt.xlabel('Fungal Content (%)')
-        plt.ylabel('Count')
-        plt.savefig(plot_dir / 'fungal_content_dist.png')
-        plt.close()
+        Figures render headless in worker processes; a figure whose input data is
+        unchanged since its last render is kept as is.
+        """
+        jobs = [
+            # Fungal content distribution
+            PlotJob('fungal_content_dist.png', render_fungal_content_dist,
+                    {'fungal_percent': stats_df['fungal_percent'].to_numpy()}),
+            # QC status summary
+            PlotJob('qc_status_dist.png', render_qc_status_dist,
+                    {'qc_counts': qc_df['qc_status'].value_counts()})
+        ]
+        return render_plots(jobs, self.eda_dir / 'plots', self.max_workers)
+    
+    def create_sample_plots(self, sample_ids: Iterable[str]) -> Dict[str, str]:
+        """Render a GC/quality panel per sample into ``plots/samples``.
+        
+        Each job only carries the FastQC path, fingerprinted by size and mtime, so
+        unchanged samples are skipped and workers read their own inputs.
+        """
+        jobs = []
+        for sample_id in sample_ids:
+            fastqc_path = self.fastqc_path(sample_id)
+            if fastqc_path.exists():
+                jobs.append(PlotJob(f"{sample_id}_qc.png", render_sample_qc_panel,
+                                    {'sample_id': sample_id, 'fastqc_path': fastqc_path}))
+        return render_plots(jobs, self.eda_dir / 'plots' / 'samples', self.max_workers)
+    
+    def update_abundance_matrix(self, sample_ids: Iterable[str]) -> AbundanceMatrix:
+        """Add the samples' Kraken2 direct counts to ``abundance_matrix.npz`` and save it.
         
-        # QC status summary
-        plt.figure(figsize=(8, 6))
-        qc_counts = qc_df['qc_status'].value_counts()
-        plt.pie(qc_counts, labels=qc_counts.index, autopct='%1.1f%%')
-        plt.title('Sample QC Status Distribution')
-        plt.savefig(plot_dir / 'qc_status_dist.png')
-        plt.close()
+        Reports already in the matrix and unchanged since are not re-read.
+        """
+        path = self.eda_dir / ABUNDANCE_MATRIX
+        abundance = AbundanceMatrix.open(path)
+        reports = [self.kraken_dir / f"{sample_id}_report.txt" for sample_id in sample_ids]
+        status = abundance.update([report for report in reports if report.exists()], self.max_workers)
+        if any(state != 'unchanged' for state in status.values()) or not path.exists():
+            abundance.save(path)
+        return abundance
 
 def main():
     """Main execution function with error handling."""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Persistent candidate store for FungiMap harvesting.
+Keeps scored candidates in SQLite keyed by accession, together with the
+high-water mark of every query so repeated harvests only fetch newer runs.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns of the rows produced by DataHarvester.iter_candidates, in schema order
+CANDIDATE_COLUMNS = [
+    'accession', 'habitat', 'raw_read_pairs', 'estimated_size_gb',
+    'metadata_completeness', 'metadata_url', 'passes_criteria'
+]
+
+
+class CandidateStore:
+    """SQLite table of candidates with one row per accession.
+
+    ``upsert`` inserts new accessions and refreshes existing ones in place, so a
+    run reported by several harvests (or by overlapping delta windows) is stored
+    once. ``first_seen`` keeps the time the accession was first harvested.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                accession TEXT PRIMARY KEY,
+                habitat TEXT,
+                raw_read_pairs INTEGER,
+                estimated_size_gb REAL,
+                metadata_completeness REAL,
+                metadata_url TEXT,
+                passes_criteria INTEGER,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                query_key TEXT PRIMARY KEY,
+                database TEXT NOT NULL,
+                query TEXT NOT NULL,
+                high_water TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def query_key(database: str, query: str) -> str:
+        return hashlib.sha256(f"{database}\n{query}".encode()).hexdigest()
+
+    def get_watermark(self, database: str, query: str) -> Optional[str]:
+        """Return the high-water mark recorded for ``query``, or None if never harvested."""
+        row = self._conn.execute(
+            "SELECT high_water FROM watermarks WHERE query_key = ?",
+            (self.query_key(database, query),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, database: str, query: str, high_water: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+            (self.query_key(database, query), database, query, high_water,
+             datetime.now().isoformat())
+        )
+        self._conn.commit()
+
+    def upsert(self, candidates: Iterable[Dict], batch_size: int = 5000) -> int:
+        """Merge candidates into the store; return how many accessions were new."""
+        before = len(self)
+        now = datetime.now().isoformat()
+        candidates = iter(candidates)
+        while True:
+            batch = list(islice(candidates, batch_size))
+            if not batch:
+                break
+            self._conn.executemany(
+                f"""
+                INSERT INTO candidates ({', '.join(CANDIDATE_COLUMNS)}, first_seen, last_seen)
+                VALUES ({', '.join('?' * len(CANDIDATE_COLUMNS))}, ?, ?)
+                ON CONFLICT(accession) DO UPDATE SET
+                    {', '.join(f'{c} = excluded.{c}' for c in CANDIDATE_COLUMNS[1:])},
+                    last_seen = excluded.last_seen
+                """,
+                [(*(_to_sql(c.get(column)) for column in CANDIDATE_COLUMNS), now, now)
+                 for c in batch if c.get('accession')]
+            )
+            self._conn.commit()
+        return len(self) - before
+
+    def iter_candidates(self) -> Iterator[Dict]:
+        """Yield every stored candidate in accession order."""
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(CANDIDATE_COLUMNS)} FROM candidates ORDER BY accession"
+        )
+        for row in cursor:
+            candidate = dict(zip(CANDIDATE_COLUMNS, row))
+            if candidate['passes_criteria'] is not None:
+                candidate['passes_criteria'] = bool(candidate['passes_criteria'])
+            yield candidate
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _to_sql(value):
+    """Convert numpy scalars and NaN from the scoring frame into SQLite values."""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
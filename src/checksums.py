@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Checksum helpers for FungiMap downloads and release manifests.
+Hashes files with large-buffer reads and verifies ``sha256sum``/``md5sum``
+style checksum files across a thread pool.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# hashlib releases the GIL while digesting large blocks, so threads hash in parallel
+BUFFER_SIZE = 8 * 1024 * 1024
+
+# Hex digest length identifies the algorithm of a checksum line
+ALGORITHMS_BY_LENGTH = {32: 'md5', 40: 'sha1', 64: 'sha256', 128: 'sha512'}
+
+CHECKSUM_LINE = re.compile(r'^([0-9a-fA-F]{32,128}) [ *](.+)$')
+
+
+class MultiHasher:
+    """Feed the same bytes to several hash algorithms at once."""
+
+    def __init__(self, algorithms: Iterable[str] = ('md5', 'sha256')):
+        self._hashers = {name: hashlib.new(name) for name in algorithms}
+
+    def update(self, data) -> None:
+        for hasher in self._hashers.values():
+            hasher.update(data)
+
+    def hexdigests(self) -> Dict[str, str]:
+        return {name: hasher.hexdigest() for name, hasher in self._hashers.items()}
+
+
+def hash_range(fd: int, start: int, end: int, hasher: MultiHasher,
+               buffer_size: int = BUFFER_SIZE) -> None:
+    """Feed bytes ``start`` up to (not including) ``end`` of an open file to ``hasher``."""
+    offset = start
+    while offset < end:
+        block = os.pread(fd, min(buffer_size, end - offset), offset)
+        if not block:
+            raise IOError(f"File ended at byte {offset}, expected {end}")
+        hasher.update(block)
+        offset += len(block)
+
+
+def hash_file(path: Path, algorithms: Iterable[str] = ('sha256',),
+              buffer_size: int = BUFFER_SIZE) -> Dict[str, str]:
+    """Hash a file in one pass with a reused buffer; return hex digests by algorithm."""
+    hasher = MultiHasher(algorithms)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigests()
+
+
+def source_stamp(path: Path) -> str:
+    """Size and mtime of a file, to tell whether it changed without reading it."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def parse_checksum_file(path: Path) -> List[Tuple[str, str, str]]:
+    """Return ``(algorithm, digest, filename)`` for every checksum line in ``path``.
+
+    Lines that are not checksums (headers, blank lines) are skipped.
+    """
+    entries = []
+    with open(path) as f:
+        for line in f:
+            match = CHECKSUM_LINE.match(line.rstrip('\n'))
+            if not match:
+                continue
+            digest, filename = match.groups()
+            algorithm = ALGORITHMS_BY_LENGTH.get(len(digest))
+            if algorithm:
+                entries.append((algorithm, digest.lower(), filename))
+    return entries
+
+
+def write_sidecars(path: Path, digests: Dict[str, str]) -> None:
+    """Write ``<file>.<algorithm>`` files in ``sha256sum`` format next to ``path``."""
+    path = Path(path)
+    for algorithm, digest in digests.items():
+        with open(path.with_name(f"{path.name}.{algorithm}"), 'w') as f:
+            f.write(f"{digest}  {path.name}\n")
+
+
+def read_sidecars(path: Path, algorithms: Iterable[str] = ('md5', 'sha256')) -> Dict[str, str]:
+    """Return the digests recorded by ``write_sidecars`` for ``path``, if any."""
+    path = Path(path)
+    digests = {}
+    for algorithm in algorithms:
+        sidecar = path.with_name(f"{path.name}.{algorithm}")
+        if sidecar.exists():
+            for entry_algorithm, digest, _ in parse_checksum_file(sidecar):
+                if entry_algorithm == algorithm:
+                    digests[algorithm] = digest
+    return digests
+
+
+def verify_entries(entries: Iterable[Tuple[str, str, Path]],
+                   max_workers: Optional[int] = None) -> List[Dict]:
+    """Check ``(algorithm, digest, path)`` entries concurrently; results keep input order."""
+    def verify(entry: Tuple[str, str, Path]) -> Dict:
+        algorithm, expected, path = entry
+        result = {'path': str(path), 'algorithm': algorithm, 'expected': expected}
+        if not Path(path).is_file():
+            return {**result, 'actual': None, 'status': 'missing'}
+        try:
+            actual = hash_file(path, [algorithm])[algorithm]
+        except OSError as e:
+            logger.error(f"Error hashing {path}: {str(e)}")
+            return {**result, 'actual': None, 'status': 'error'}
+        return {**result, 'actual': actual, 'status': 'ok' if actual == expected else 'mismatch'}
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 4) as executor:
+        return list(executor.map(verify, entries))
+
+
+def verify_checksum_file(path: Path, base_dir: Optional[Path] = None,
+                         max_workers: Optional[int] = None) -> List[Dict]:
+    """Verify every file listed in a checksum file, relative to ``base_dir``.
+
+    ``base_dir`` defaults to the checksum file's directory.
+    """
+    base_dir = Path(base_dir) if base_dir else Path(path).parent
+    entries = [(algorithm, digest, base_dir / filename)
+               for algorithm, digest, filename in parse_checksum_file(path)]
+    return verify_entries(entries, max_workers)
+
+
+def verify_sidecars(directory: Path, max_workers: Optional[int] = None) -> List[Dict]:
+    """Verify every ``*.sha256``/``*.md5`` sidecar below ``directory``."""
+    entries = []
+    for suffix in ('sha256', 'md5'):
+        for sidecar in sorted(Path(directory).rglob(f"*.{suffix}")):
+            entries.extend((algorithm, digest, sidecar.parent / filename)
+                           for algorithm, digest, filename in parse_checksum_file(sidecar))
+    return verify_entries(entries, max_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify checksum files in parallel")
+    parser.add_argument('checksum_files', nargs='*', type=Path,
+                        help='sha256sum/md5sum style files to verify')
+    parser.add_argument('--base-dir', type=Path,
+                        help='Directory listed paths are relative to (default: next to each file)')
+    parser.add_argument('--sidecars', type=Path,
+                        help='Also verify download sidecars (e.g. data/sra-cache)')
+    parser.add_argument('--workers', type=int, help='Files hashed at once (default: CPU count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if not args.checksum_files and not args.sidecars:
+        parser.error("nothing to verify")
+
+    results = []
+    for checksum_file in args.checksum_files:
+        results += verify_checksum_file(checksum_file, args.base_dir, args.workers)
+    if args.sidecars:
+        results += verify_sidecars(args.sidecars, args.workers)
+
+    failures = [r for r in results if r['status'] != 'ok']
+    for failure in failures:
+        logger.error(f"{failure['path']}: {failure['status'].upper()}")
+    logger.info(f"Verified {len(results) - len(failures)}/{len(results)} files")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,17 +4,37 @@ Enhanced Data Harvesting Script for FungiMap
 Handles querying and initial processing of metagenome datasets from SRA/ENA/MGnify.
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
-import hashlib
+import math
 import logging
 import requests
-import pandas as pd
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
-from tqdm import tqdm
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Make the project root importable when run as `python src/data_harvester.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.candidate_store import CandidateStore
+from src.lazy_import import lazy_import
+from src.mgnify_crawler import MGnifyCrawler
+from src.rate_limiter import TokenBucket
+from src.response_cache import ResponseCache
+from src.sra_parser import (apply_biosample_attributes, parse_biosample_attributes,
+                            parse_summary, records_to_frame)
+
+# pandas is only loaded once results are tabulated
+pd = lazy_import('pandas')
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +47,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Largest idlist esearch returns per request
+ESEARCH_MAX_IDS = 10000
+
 class DataHarvester:
     def __init__(self, config_path: Path):
         """Initialize with enhanced error handling and validation."""
@@ -35,9 +58,33 @@ class DataHarvester:
         self.mgnify_api = "https://www.ebi.ac.uk/metagenomics/api/v1"
         self.manifest = []
         self.candidates = []
+        self.term_stats = []
         
         # Validate configuration
         self._validate_config()
+        
+        # Concurrency and NCBI rate limits (3 req/s anonymous, 10 req/s with an API key)
+        sra_config = self.config['databases'].get('sra', {})
+        self.api_key = sra_config.get('api_key') or os.environ.get('NCBI_API_KEY')
+        self.max_concurrency = int(sra_config.get('max_concurrency', 4))
+        self.summary_batch_size = int(sra_config.get('summary_batch_size', 50))
+        self.fetch_biosample_attributes = sra_config.get('fetch_biosample_attributes', True)
+        requests_per_second = sra_config.get('requests_per_second', 10 if self.api_key else 3)
+        self.rate_limiter = TokenBucket(requests_per_second, capacity=1)
+        
+        mgnify_config = self.config['databases'].get('mgnify', {})
+        self.mgnify_concurrency = int(mgnify_config.get('max_concurrency', 4))
+        self.mgnify_limiter = TokenBucket(mgnify_config.get('requests_per_second', 10))
+        
+        # Optional persistent response cache shared by eutils and MGnify requests
+        self.cache = self._init_cache(self.config.get('http_cache', {}))
+        
+        # Accession-keyed store that delta harvests merge into
+        self.candidate_store_path = Path(
+            self.config.get('harvest', {}).get('candidate_store', 'data/candidate_store.sqlite')
+        )
+        if not self.candidate_store_path.is_absolute():
+            self.candidate_store_path = PROJECT_ROOT / self.candidate_store_path
     
     def _load_config(self, config_path: Path) -> Dict:
         """Load and validate configuration file."""
@@ -50,6 +97,24 @@ class DataHarvester:
             logger.error(f"Error loading configuration: {str(e)}")
             raise
     
+    def _init_cache(self, cache_config: Dict) -> Optional[ResponseCache]:
+        """Open the on-disk response cache if enabled in the configuration."""
+        if not cache_config.get('enabled', False):
+            return None
+        
+        cache_path = Path(cache_config.get('path', 'data/http_cache.sqlite'))
+        if not cache_path.is_absolute():
+            cache_path = PROJECT_ROOT / cache_path
+        
+        cache = ResponseCache(
+            cache_path,
+            max_bytes=int(cache_config.get('max_size_mb', 512)) * 1024 * 1024,
+            default_ttl=cache_config.get('default_ttl_seconds', 86400),
+            ttls=cache_config.get('ttl_seconds', {})
+        )
+        logger.info(f"Using HTTP response cache at {cache.path}")
+        return cache
+    
     def _validate_config(self) -> None:
         """Validate configuration parameters."""
         required_sections = ['data_selection', 'databases', 'qc_parameters']
@@ -57,13 +122,45 @@ class DataHarvester:
             if section not in self.config:
                 raise ValueError(f"Missing required configuration section: {section}")
     
+    def _build_sra_query(self, query_terms: Optional[List[str]] = None) -> str:
+        """Build the esearch term from ``query_terms`` (default: all configured terms)."""
+        if query_terms is None:
+            query_terms = self.config['databases']['sra']['query_terms']
+        query = " OR ".join([f'"{term}"[All Fields]' for term in query_terms])
+        query += ' AND ("metagenome"[Source] OR "metatranscriptome"[Source])'
+        return query
+    
+    def _summaries_to_records(self, entries: Iterable[Dict]) -> List[Dict]:
+        """Parse esummary documents into run records enriched with BioSample attributes."""
+        records = [record for entry in entries for record in parse_summary(entry)]
+        if self.fetch_biosample_attributes:
+            self._attach_biosample_attributes(records)
+        return records
+    
+    def _attach_biosample_attributes(self, records: List[Dict]) -> None:
+        """Fetch the BioSamples referenced by ``records`` in batches and merge their attributes."""
+        accessions = list(dict.fromkeys(r['biosample'] for r in records if r.get('biosample')))
+        size = self.summary_batch_size
+        attributes = {}
+        for i in range(0, len(accessions), size):
+            details = self._eutils_get('esummary.fcgi', {
+                'db': 'biosample',
+                'id': ','.join(accessions[i:i+size]),
+                'retmode': 'json'
+            })
+            for doc in details['result'].values():
+                if isinstance(doc, dict) and doc.get('accession'):
+                    attributes[doc['accession']] = parse_biosample_attributes(doc.get('sampledata'))
+        
+        for record in records:
+            if record.get('biosample') in attributes:
+                apply_biosample_attributes(record, attributes[record['biosample']])
+    
     def query_sra(self, max_results: Optional[int] = None) -> pd.DataFrame:
         """Query SRA with enhanced filtering and metadata extraction using eutils."""
         try:
             # Build query
-            query_terms = self.config['databases']['sra']['query_terms']
-            query = " OR ".join([f'"{term}"[All Fields]' for term in query_terms])
-            query += ' AND ("metagenome"[Source] OR "metatranscriptome"[Source])'
+            query = self._build_sra_query()
             
             logger.info(f"Querying SRA with: {query}")
             
@@ -75,41 +172,13 @@ class DataHarvester:
                 'retmode': 'json'
             }
             
-            response = requests.get(
-                f"{self.sra_api}/esearch.fcgi",
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = self._eutils_get('esearch.fcgi', params)
             
             # Get details for each ID
             ids = data['esearchresult']['idlist']
-            results = []
+            results = self._summaries_to_records(self.fetch_summaries(ids))
             
-            for id_batch in [ids[i:i+50] for i in range(0, len(ids), 50)]:
-                details_params = {
-                    'db': 'sra',
-                    'id': ','.join(id_batch),
-                    'retmode': 'json'
-                }
-                details = requests.get(
-                    f"{self.sra_api}/esummary.fcgi",
-                    params=details_params,
-                    timeout=30
-                ).json()
-                
-                for entry in details['result'].values():
-                    if isinstance(entry, dict):
-                        results.append({
-                            'run_accession': entry.get('accession', ''),
-                            'spots': entry.get('spots', 0),
-                            'bases': entry.get('bases', 0),
-                            'size_MB': entry.get('size_MB', 0),
-                            'sample_attribute': entry.get('attributes', '')
-                        })
-            
-            results_df = pd.DataFrame(results)
+            results_df = records_to_frame(results)
             
             # Log query
             self.manifest.append({
@@ -125,6 +194,237 @@ class DataHarvester:
             logger.error(f"Error querying SRA: {str(e)}")
             raise
     
+    def _esearch_ids(self, query: str, max_results: Optional[int] = None) -> List[str]:
+        """Collect every SRA UID matching ``query``, paging esearch by ``ESEARCH_MAX_IDS``."""
+        ids = []
+        while True:
+            retmax = ESEARCH_MAX_IDS
+            if max_results is not None:
+                retmax = min(retmax, max_results - len(ids))
+            result = self._eutils_get('esearch.fcgi', {
+                'db': 'sra',
+                'term': query,
+                'retstart': len(ids),
+                'retmax': retmax,
+                'retmode': 'json'
+            })['esearchresult']
+            ids.extend(result['idlist'])
+            
+            total = int(result.get('count', len(ids)))
+            if not result['idlist'] or len(ids) >= total or len(ids) == max_results:
+                return ids
+    
+    def query_sra_fan_out(self, max_results_per_term: Optional[int] = None) -> pd.DataFrame:
+        """Query SRA with one concurrent esearch per configured term.
+        
+        Wall time is bounded by the slowest term rather than the sum of all terms.
+        UIDs are deduplicated across terms before esummary, so a run matched by several
+        terms is fetched once. Per-term hit and overlap counts go to ``term_stats`` and
+        one manifest entry per term. ``max_results_per_term`` caps each esearch; None
+        pages through every hit.
+        """
+        try:
+            terms = self.config['databases']['sra']['query_terms']
+            queries = {term: self._build_sra_query([term]) for term in terms}
+            logger.info(f"Fanning out {len(terms)} SRA query terms")
+            
+            workers = max(1, min(self.max_concurrency, len(terms)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                id_lists = executor.map(
+                    lambda term: self._esearch_ids(queries[term], max_results_per_term), terms
+                )
+                hits = dict(zip(terms, id_lists))
+            
+            unique_ids = list(dict.fromkeys(uid for ids in hits.values() for uid in ids))
+            results = self._summaries_to_records(self.fetch_summaries(unique_ids))
+            results_df = records_to_frame(results)
+            if 'run_accession' in results_df.columns:
+                results_df = results_df.drop_duplicates('run_accession', ignore_index=True)
+            
+            self._record_term_stats('SRA', hits, queries)
+            logger.info(f"{sum(len(ids) for ids in hits.values())} SRA hits across terms, "
+                        f"{len(unique_ids)} distinct, {len(results_df)} runs")
+            return results_df
+            
+        except Exception as e:
+            logger.error(f"Error in SRA fan-out query: {str(e)}")
+            raise
+    
+    def _record_term_stats(self, database: str, hits: Dict[str, List[str]],
+                           queries: Dict[str, object]) -> None:
+        """Add per-term overlap statistics to ``term_stats`` and the manifest."""
+        timestamp = datetime.now().isoformat()
+        for stats in term_overlap_stats(hits):
+            self.term_stats.append({'database': database, **stats})
+            self.manifest.append({
+                'timestamp': timestamp,
+                'database': database,
+                'query': queries[stats['term']],
+                'results_count': stats['hits'],
+                'unique_count': stats['unique_hits'],
+                'overlap_count': stats['overlap_hits']
+            })
+            logger.info(f"{database} term {stats['term']!r}: {stats['hits']} hits, "
+                        f"{stats['unique_hits']} unique, {stats['overlap_hits']} shared")
+    
+    def iter_sra(self, max_results: Optional[int] = None,
+                 page_size: int = 500, since: Optional[str] = None) -> Iterator[Dict]:
+        """Stream every matching SRA run record using the esearch history server.
+        
+        esearch stores the full result set under a WebEnv/query_key pair and esummary
+        pages through it with retstart, so result sets of any size are walked without
+        the 100-ID cap of ``query_sra``. Pages are fetched with ``max_concurrency`` in
+        flight and records are yielded in page order as they arrive, keeping memory
+        bounded by ``max_concurrency * page_size`` records.
+        
+        ``since`` (``YYYY/MM/DD``) restricts the search to runs modified on or after
+        that date.
+        """
+        query = self._build_sra_query()
+        date_range = {}
+        if since is not None:
+            date_range = {'datetype': 'mdat', 'mindate': since, 'maxdate': '3000'}
+        yielded = 0
+        complete = False
+        try:
+            logger.info(f"Streaming SRA results for: {query}")
+            
+            search = self._eutils_get('esearch.fcgi', {
+                'db': 'sra',
+                'term': query,
+                'usehistory': 'y',
+                'retmax': 0,
+                'retmode': 'json',
+                **date_range
+            })['esearchresult']
+            
+            total = int(search['count'])
+            if max_results is not None:
+                total = min(total, max_results)
+            history = {'WebEnv': search['webenv'], 'query_key': search['querykey']}
+            logger.info(f"SRA history holds {search['count']} IDs; streaming {total}")
+            
+            def fetch_page(retstart: int) -> List[Dict]:
+                details = self._eutils_get('esummary.fcgi', {
+                    'db': 'sra',
+                    'retstart': retstart,
+                    'retmax': min(page_size, total - retstart),
+                    'retmode': 'json',
+                    **history
+                })
+                entries = [entry for entry in details['result'].values() if isinstance(entry, dict)]
+                return self._summaries_to_records(entries)
+            
+            for page in self._ordered_map(fetch_page, range(0, total, page_size)):
+                for record in page:
+                    yielded += 1
+                    yield record
+            complete = True
+            
+        except Exception as e:
+            logger.error(f"Error streaming SRA results: {str(e)}")
+            raise
+        
+        finally:
+            # Also runs when the caller stops early or the stream fails part way
+            self.manifest.append({
+                'timestamp': datetime.now().isoformat(),
+                'database': 'SRA',
+                'query': query,
+                'since': since,
+                'results_count': yielded,
+                'complete': complete
+            })
+    
+    def harvest_sra_delta(self, store: Optional[CandidateStore] = None,
+                          page_size: int = 500) -> int:
+        """Fetch SRA runs modified since the last harvest and merge them into the store.
+        
+        The first harvest of a query fetches everything. Afterwards only runs modified
+        on or after the stored high-water mark are fetched; the mark is the date the
+        previous harvest started, so nothing modified during a harvest is missed and
+        the one-day overlap is deduplicated by accession. The mark only advances when
+        the stream completes. Returns the number of new accessions, which is also
+        recorded as ``rows_added`` in the manifest.
+        """
+        own_store = store is None
+        if own_store:
+            store = CandidateStore(self.candidate_store_path)
+        
+        try:
+            query = self._build_sra_query()
+            since = store.get_watermark('SRA', query)
+            started = datetime.now().strftime('%Y/%m/%d')
+            logger.info(f"Delta harvest of SRA since {since or 'the beginning'}")
+            
+            added = store.upsert(self.iter_candidates(self.iter_sra(page_size=page_size, since=since)))
+            
+            # iter_sra has appended its entry by the time the stream is exhausted
+            self.manifest[-1]['rows_added'] = added
+            store.set_watermark('SRA', query, started)
+            logger.info(f"Delta harvest added {added} candidates ({len(store)} stored)")
+            return added
+            
+        except Exception as e:
+            logger.error(f"Error in delta harvest: {str(e)}")
+            raise
+        
+        finally:
+            if own_store:
+                store.close()
+    
+    def _get_json(self, url: str, params: Dict,
+                  limiter: Optional[TokenBucket] = None) -> Dict:
+        """GET a JSON document, through the response cache when one is configured."""
+        if self.cache is not None:
+            return self.cache.get_json(url, params, timeout=30, limiter=limiter)
+        
+        if limiter is not None:
+            limiter.acquire()
+        response = requests.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
+    def _eutils_get(self, endpoint: str, params: Dict) -> Dict:
+        """Issue a rate-limited eutils request and return the decoded JSON."""
+        if self.api_key:
+            params = {**params, 'api_key': self.api_key}
+        
+        return self._get_json(f"{self.sra_api}/{endpoint}", params, limiter=self.rate_limiter)
+    
+    def _fetch_summary_batch(self, id_batch: List[str]) -> List[Dict]:
+        """Fetch esummary records for one batch of SRA UIDs."""
+        details = self._eutils_get('esummary.fcgi', {
+            'db': 'sra',
+            'id': ','.join(id_batch),
+            'retmode': 'json'
+        })
+        return [entry for entry in details['result'].values() if isinstance(entry, dict)]
+    
+    def _ordered_map(self, func: Callable, items: Iterable) -> Iterator:
+        """Yield ``func(item)`` in input order with at most ``max_concurrency`` calls in flight."""
+        items = iter(items)
+        workers = max(1, self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque(executor.submit(func, item) for item in islice(items, workers))
+            while pending:
+                future = pending.popleft()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(func, item))
+                yield future.result()
+    
+    def fetch_summaries(self, ids: List[str]) -> List[Dict]:
+        """Fetch esummary records for all IDs with several batches in flight.
+        
+        Batches run on a bounded thread pool and share the eutils token bucket, so
+        throughput scales with concurrency without exceeding the NCBI request rate.
+        Records come back in batch submission order regardless of completion order.
+        """
+        size = self.summary_batch_size
+        batches = [ids[i:i+size] for i in range(0, len(ids), size)]
+        pages = self._ordered_map(self._fetch_summary_batch, batches)
+        return [entry for page in pages for entry in page]
+    
     def query_mgnify(self) -> Dict:
         """Query MGnify with enhanced error handling."""
         try:
@@ -134,13 +434,7 @@ class DataHarvester:
                 'biome': ','.join(filters['biome'])
             }
             
-            response = requests.get(
-                f"{self.mgnify_api}/studies",
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(f"{self.mgnify_api}/studies", params)
             
             # Log query
             self.manifest.append({
@@ -156,15 +450,100 @@ class DataHarvester:
             logger.error(f"Error querying MGnify: {str(e)}")
             raise
     
+    def query_mgnify_fan_out(self) -> List[Dict]:
+        """Query MGnify studies with one concurrent crawl per configured biome.
+        
+        Each biome's study pages are followed to the end; studies found under several
+        biomes are merged by accession. Per-biome overlap counts go to ``term_stats``.
+        """
+        try:
+            filters = self.config['databases']['mgnify']['filters']
+            biomes = filters['biome']
+            queries = {biome: {'experiment_type': filters['experiment_type'], 'biome': biome}
+                       for biome in biomes}
+            
+            def studies_for(biome: str) -> List[Dict]:
+                url, params, studies = f"{self.mgnify_api}/studies", queries[biome], []
+                while url:
+                    page = self._get_json(url, params, limiter=self.mgnify_limiter)
+                    studies.extend(page.get('data', []))
+                    # Cursor URLs carry the query string themselves
+                    url, params = (page.get('links') or {}).get('next'), {}
+                return studies
+            
+            workers = max(1, min(self.mgnify_concurrency, len(biomes)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                per_biome = dict(zip(biomes, executor.map(studies_for, biomes)))
+            
+            studies = {}
+            for biome_studies in per_biome.values():
+                for study in biome_studies:
+                    studies.setdefault(study['id'], study)
+            
+            self._record_term_stats(
+                'MGnify', {biome: [s['id'] for s in found] for biome, found in per_biome.items()},
+                queries
+            )
+            return list(studies.values())
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error in MGnify fan-out query: {str(e)}")
+            raise
+    
+    def crawl_mgnify(self, checkpoint_dir: Path, replay: bool = True) -> Iterator[Dict]:
+        """Stream every MGnify run matching the configured filters.
+        
+        Follows ``links.next`` cursors through studies, samples and runs with
+        ``max_concurrency`` studies in flight. Progress is checkpointed under
+        ``checkpoint_dir`` so an interrupted crawl resumes where it stopped; with
+        ``replay=False`` runs already yielded by the interrupted call are skipped.
+        Records use the same schema as ``query_sra`` and can be fed to
+        ``iter_candidates``.
+        """
+        filters = self.config['databases']['mgnify']['filters']
+        params = {
+            'experiment_type': filters['experiment_type'],
+            'biome': ','.join(filters['biome'])
+        }
+        crawler = MGnifyCrawler(
+            get_json=lambda url, query: self._get_json(url, query, limiter=self.mgnify_limiter),
+            api_url=self.mgnify_api,
+            checkpoint_dir=checkpoint_dir,
+            params=params,
+            metadata_fields=self.config.get('output_formats', {}).get('metadata', []),
+            max_concurrency=self.mgnify_concurrency
+        )
+        
+        try:
+            count = 0
+            for record in crawler.crawl(replay=replay):
+                count += 1
+                yield record
+            
+            self.manifest.append({
+                'timestamp': datetime.now().isoformat(),
+                'database': 'MGnify',
+                'query_params': params,
+                'results_count': count
+            })
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error crawling MGnify (resume from {checkpoint_dir}): {str(e)}")
+            raise
+    
+    def _required_metadata_fields(self) -> List[str]:
+        required_fields = self.config.get('output_formats', {}).get('metadata')
+        if not required_fields:
+            raise ValueError("No required metadata fields specified in config")
+        return required_fields
+    
     def check_metadata_completeness(self, metadata: Dict) -> float:
         """Calculate metadata completeness score with validation."""
         try:
-            required_fields = self.config['output_formats']['metadata']
-            if not required_fields:
-                raise ValueError("No required metadata fields specified in config")
+            required_fields = self._required_metadata_fields()
             
-            present_fields = sum(1 for field in required_fields 
-                               if field in metadata and metadata[field])
+            present_fields = sum(1 for field in required_fields
+                               if self._present_value(metadata.get(field)))
             
             return (present_fields / len(required_fields)) * 100
             
@@ -172,54 +551,134 @@ class DataHarvester:
             logger.error(f"Error checking metadata completeness: {str(e)}")
             raise
     
-    def process_candidates(self, results: pd.DataFrame) -> List[Dict]:
+    @staticmethod
+    def _present_value(value) -> bool:
+        """``bool(value)`` with a float NaN counted as absent, as ``_present`` does per column."""
+        return bool(value) and not (isinstance(value, float) and math.isnan(value))
+    
+    @staticmethod
+    def _present(column: pd.Series) -> pd.Series:
+        """Column-wise equivalent of ``bool(value)`` with missing values counted as absent."""
+        mask = column.notna()
+        if pd.api.types.is_bool_dtype(column):
+            return mask & column.fillna(False).astype(bool)
+        if pd.api.types.is_numeric_dtype(column):
+            return mask & column.ne(0)
+        return mask & ~column.isin(['', 0])
+    
+    def score_candidates(self, results: pd.DataFrame) -> pd.DataFrame:
+        """Score a table of raw records against the data selection thresholds.
+        
+        Completeness, read-pair thresholds, size conversion, habitat extraction and
+        ``passes_criteria`` are computed as whole-column operations. Rows whose read
+        count is missing or non-numeric (e.g. MGnify runs unknown to ENA) are left
+        unscored with ``raw_read_pairs`` and ``passes_criteria`` set to None.
+        """
+        required_fields = self._required_metadata_fields()
+        selection = self.config['data_selection']
+        n = len(results)
+        
+        def column(name, default=None) -> pd.Series:
+            if name in results.columns:
+                return results[name]
+            return pd.Series([default] * n, index=results.index, dtype=object)
+        
+        present = np.zeros(n, dtype=np.int64)
+        for field in required_fields:
+            if field in results.columns:
+                present += self._present(results[field]).to_numpy(dtype=bool)
+        completeness = present / len(required_fields) * 100
+        
+        spots = pd.to_numeric(column('spots', 0), errors='coerce')
+        scored = spots.notna().to_numpy()
+        read_pairs = spots.fillna(0).to_numpy(dtype=np.int64)
+        passes = (
+            (read_pairs >= selection['min_raw_read_pairs'])
+            & (completeness >= selection['min_metadata_completeness'])
+        )
+        
+        size_gb = pd.to_numeric(column('size_MB', 0), errors='coerce') / 1024
+        
+        attributes = column('sample_attribute', '').fillna('').astype(str)
+        habitat = attributes.str.partition(';')[0]
+        if 'habitat' in results.columns:
+            explicit = results['habitat']
+            habitat = explicit.where(self._present(explicit), habitat)
+        
+        accession = column('run_accession')
+        return pd.DataFrame({
+            'accession': accession,
+            'habitat': habitat,
+            'raw_read_pairs': pd.Series(read_pairs.tolist(), index=results.index, dtype=object).where(scored, None),
+            'estimated_size_gb': size_gb.astype(object).where(size_gb.notna(), None),
+            'metadata_completeness': completeness,
+            'metadata_url': 'https://www.ncbi.nlm.nih.gov/sra/' + accession.astype(str),
+            'passes_criteria': pd.Series(passes.tolist(), index=results.index, dtype=object).where(scored, None)
+        }, index=results.index)
+    
+    def iter_candidates(self, results: Union[pd.DataFrame, Iterable[Dict]],
+                        chunk_size: int = 50000) -> Iterator[Dict]:
+        """Lazily score candidates from a DataFrame or a record stream such as ``iter_sra``.
+        
+        Streams are scored ``chunk_size`` records at a time through ``score_candidates``.
+        """
+        if isinstance(results, pd.DataFrame):
+            chunks = (results.iloc[i:i+chunk_size] for i in range(0, len(results), chunk_size))
+            total = len(results)
+        else:
+            chunks = (pd.DataFrame(chunk) for chunk in _chunked(results, chunk_size))
+            total = None
+        
+        from tqdm import tqdm
+        
+        with tqdm(total=total) as progress:
+            for chunk in chunks:
+                yield from self.score_candidates(chunk).to_dict('records')
+                progress.update(len(chunk))
+    
+    def process_candidates(self, results: Union[pd.DataFrame, Iterable[Dict]]) -> List[Dict]:
         """Process candidates with enhanced validation and filtering."""
-        processed = []
-        
-        for record in tqdm(results.itertuples(), total=len(results)):
-            try:
-                metadata = record._asdict()
-                
-                # Calculate metadata completeness
-                completeness = self.check_metadata_completeness(metadata)
-                
-                # Validate against thresholds
-                read_pairs = int(metadata.get('spots', 0))
-                meets_criteria = (
-                    read_pairs >= self.config['data_selection']['min_raw_read_pairs'],
-                    completeness >= self.config['data_selection']['min_metadata_completeness']
-                )
-                
-                candidate = {
-                    'accession': metadata.get('run_accession'),
-                    'habitat': metadata.get('sample_attribute', '').split(';')[0],
-                    'raw_read_pairs': read_pairs,
-                    'estimated_size_gb': float(metadata.get('size_MB', 0)) / 1024,
-                    'metadata_completeness': completeness,
-                    'metadata_url': f"https://www.ncbi.nlm.nih.gov/sra/{metadata.get('run_accession')}",
-                    'passes_criteria': all(meets_criteria)
-                }
-                
-                processed.append(candidate)
-                
-            except Exception as e:
-                logger.error(f"Error processing record {getattr(record, 'run_accession', 'unknown')}: {str(e)}")
-                continue
-        
-        return processed
-    
-    def save_results(self, output_dir: Path) -> None:
-        """Save results with error handling and validation."""
+        if isinstance(results, pd.DataFrame):
+            return self.score_candidates(results).to_dict('records')
+        return list(self.iter_candidates(results))
+    
+    def save_results(self, output_dir: Path,
+                     candidates: Optional[Iterable[Dict]] = None,
+                     chunk_size: int = 50000) -> None:
+        """Save results with error handling and validation.
+        
+        When ``candidates`` is a stream (e.g. ``iter_candidates(iter_sra())``) it is
+        written to ``candidates.parquet`` in row groups of ``chunk_size`` without
+        materialising it; otherwise ``self.candidates`` is written to CSV.
+        """
         try:
             output_dir = Path(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
             
+            # Streams record their manifest entry once consumed, so write them first
+            if candidates is not None:
+                candidates_path = output_dir / 'candidates.parquet'
+                count = write_parquet_chunks(candidates, candidates_path, chunk_size,
+                                             schema=candidate_schema())
+                logger.info(f"Streamed {count} candidates to {candidates_path}")
+            
             # Save manifest
             manifest_df = pd.DataFrame(self.manifest)
             manifest_path = output_dir / 'manifest.csv'
             manifest_df.to_csv(manifest_path, index=False)
             logger.info(f"Saved manifest to {manifest_path}")
             
+            if self.term_stats:
+                term_stats_path = output_dir / 'term_stats.csv'
+                pd.DataFrame(self.term_stats).to_csv(term_stats_path, index=False)
+                logger.info(f"Saved per-term query statistics to {term_stats_path}")
+            
+            if self.cache is not None:
+                logger.info(f"HTTP cache stats: {self.cache.stats}")
+            
+            if candidates is not None:
+                return
+            
             # Save candidates
             if not self.candidates:
                 logger.warning("No candidates to save")
@@ -234,6 +693,73 @@ class DataHarvester:
             logger.error(f"Error saving results: {str(e)}")
             raise
 
+def term_overlap_stats(hits: Dict[str, List[str]]) -> List[Dict]:
+    """Per-term hit counts and how many of each term's hits no other term found."""
+    hit_sets = {term: set(ids) for term, ids in hits.items()}
+    seen_by = Counter(uid for ids in hit_sets.values() for uid in ids)
+    stats = []
+    for term, ids in hit_sets.items():
+        unique = sum(1 for uid in ids if seen_by[uid] == 1)
+        stats.append({'term': term, 'hits': len(ids), 'unique_hits': unique,
+                      'overlap_hits': len(ids) - unique})
+    return stats
+
+def _chunked(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Split a record stream into lists of at most ``size`` records."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+def candidate_schema():
+    """Arrow schema of the rows produced by ``DataHarvester.iter_candidates``."""
+    import pyarrow as pa
+    
+    return pa.schema([
+        ('accession', pa.string()),
+        ('habitat', pa.string()),
+        ('raw_read_pairs', pa.int64()),
+        ('estimated_size_gb', pa.float64()),
+        ('metadata_completeness', pa.float64()),
+        ('metadata_url', pa.string()),
+        ('passes_criteria', pa.bool_()),
+    ])
+
+def write_parquet_chunks(records: Iterable[Dict], path: Path, chunk_size: int = 50000,
+                         schema=None) -> int:
+    """Write a record stream to Parquet one row group at a time; return the row count.
+    
+    Pass an explicit ``schema`` for fixed record layouts: otherwise it is inferred
+    from the first chunk, and a column that is all None there is typed ``null``.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Streaming output requires pyarrow (conda install pyarrow)") from e
+    
+    writer = None
+    count = 0
+    try:
+        for chunk in _chunked(records, chunk_size):
+            table = pa.Table.from_pylist(chunk, schema=schema)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+                schema = table.schema
+            writer.write_table(table)
+            count += len(chunk)
+        
+        if writer is None and schema is not None:
+            # Keep an empty stream readable as an empty table
+            writer = pq.ParquetWriter(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return count
+
 def main():
     """Main execution function with error handling."""
     try:
@@ -241,9 +767,15 @@ def main():
         config_path = Path('/Users/rohannorden/My Code/mycology-project/config/eda_config.json')
         harvester = DataHarvester(config_path)
         
-        # Query databases
-        sra_results = harvester.query_sra()
-        harvester.query_mgnify()
+        # Query databases, one concurrent query per term/biome when fan-out is enabled
+        harvest_config = harvester.config.get('harvest', {})
+        if harvest_config.get('fan_out_terms', False):
+            # Capped like query_sra's single search; null pages through every hit
+            sra_results = harvester.query_sra_fan_out(harvest_config.get('max_results_per_term', 100))
+            harvester.query_mgnify_fan_out()
+        else:
+            sra_results = harvester.query_sra()
+            harvester.query_mgnify()
         
         # Process candidates
         harvester.candidates = harvester.process_candidates(sra_results)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Columnar store for FungiMap EDA results.
+Each result table is a Hive-partitioned Parquet dataset with a fixed schema, so
+readers load only the columns and partitions a query needs.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Store location below an EDA results directory (results/eda/store/<table>/)
+STORE_DIR = 'store'
+
+# Rows per Parquet row group; tables are sorted by their key first, so row-group
+# statistics let key predicates skip most of a large table
+ROW_GROUP_SIZE = 64 * 1024
+
+READ_STATS_COLUMNS = [
+    ('sample_id', 'string'),
+    ('total_reads', 'int64'),
+    ('classified_percent', 'double'),
+    ('fungal_percent', 'double'),
+    ('human_percent', 'double'),
+    ('gc_percent', 'double'),
+    ('avg_length', 'string'),
+]
+
+
+class TableSpec(NamedTuple):
+    """Columns (name, Arrow type alias), Hive partition columns and sort key of a table."""
+
+    columns: List[Tuple[str, str]]
+    partition_by: List[str]
+    sort_by: str
+
+
+TABLES: Dict[str, TableSpec] = {
+    # results/eda/read_stats.txt
+    'read_stats': TableSpec(READ_STATS_COLUMNS, [], 'sample_id'),
+    # results/eda/sample_qc_summary.csv
+    'qc_summary': TableSpec([('sample_id', 'string'), ('qc_status', 'string'), ('notes', 'string')]
+                            + READ_STATS_COLUMNS[1:], ['qc_status'], 'sample_id'),
+    # results/eda/validation/combined_report.csv
+    'validation': TableSpec([
+        ('Accession', 'string'),
+        ('Status', 'string'),
+        ('metadata_completeness', 'double'),
+        ('fungal_signal', 'double'),
+        ('read_pairs', 'int64'),
+        ('host_contamination', 'double'),
+        ('warnings_count', 'int64'),
+        ('validation_time', 'double'),
+    ], ['Status'], 'Accession'),
+    # eda_summary.csv of the demo workflow and scripts/generate_eda_summary.py
+    'eda_summary': TableSpec([
+        ('sample', 'string'),
+        ('pipeline_stage', 'string'),
+        ('status', 'string'),
+        ('total_reads', 'int64'),
+        ('raw_reads', 'int64'),
+        ('clean_reads', 'int64'),
+        ('raw_bases', 'int64'),
+        ('clean_bases', 'int64'),
+        ('gc_content', 'double'),
+        ('q30_rate', 'double'),
+        ('sequence_length', 'string'),
+        ('per_base_quality', 'string'),
+        ('per_sequence_quality', 'string'),
+        ('adapter_content', 'string'),
+        ('fungi_percent', 'double'),
+        ('classified_percent', 'double'),
+        ('unclassified_percent', 'double'),
+        ('demo_subsample', 'string'),
+        ('fungal_signal', 'string'),
+    ], [], 'sample'),
+}
+
+
+def schema(name: str):
+    """Arrow schema of table ``name``."""
+    import pyarrow as pa
+
+    return pa.schema([(column, pa.type_for_alias(alias)) for column, alias in TABLES[name].columns])
+
+
+def table_path(store_dir: Path, name: str) -> Path:
+    if name not in TABLES:
+        raise KeyError(f"Unknown EDA table '{name}' (expected one of {', '.join(TABLES)})")
+    return Path(store_dir) / name
+
+
+def write_table(df: pd.DataFrame, store_dir: Path, name: str) -> Path:
+    """Replace table ``name`` with ``df``; return the table directory.
+
+    Columns are cast to the table schema: missing columns are written as nulls and
+    columns outside the schema are dropped with a warning. The new dataset is
+    written next to the old one and swapped in, so readers never see a partial table.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    spec = TABLES[name]
+    target = table_path(store_dir, name)
+    table_schema = schema(name)
+
+    extra = [column for column in df.columns if column not in table_schema.names]
+    if extra:
+        logger.warning(f"Dropping columns outside the '{name}' schema: {', '.join(map(str, extra))}")
+    df = df.sort_values(spec.sort_by, kind='stable') if spec.sort_by in df.columns else df
+    arrays = [pa.array(df[field.name], type=field.type, from_pandas=True)
+              if field.name in df.columns else pa.nulls(len(df), type=field.type)
+              for field in table_schema]
+    table = pa.Table.from_arrays(arrays, schema=table_schema)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f".{name}.tmp")
+    previous = target.with_name(f".{name}.old")
+    for path in (staging, previous):
+        shutil.rmtree(path, ignore_errors=True)
+
+    partitioning = (ds.partitioning(pa.schema([table_schema.field(c) for c in spec.partition_by]),
+                                    flavor='hive') if spec.partition_by else None)
+    ds.write_dataset(table, staging, format='parquet', partitioning=partitioning,
+                     basename_template='part-{i}.parquet', max_rows_per_group=ROW_GROUP_SIZE,
+                     max_rows_per_file=ROW_GROUP_SIZE * 16)
+    staging.mkdir(exist_ok=True)  # an empty table is an empty directory
+
+    if target.exists():
+        os.replace(target, previous)
+    os.replace(staging, target)
+    shutil.rmtree(previous, ignore_errors=True)
+    return target
+
+
+def read_table(store_dir: Path, name: str, columns: Optional[Sequence[str]] = None,
+               filters: Optional[List[Tuple]] = None) -> pd.DataFrame:
+    """Load table ``name``, projected to ``columns`` and restricted by ``filters``.
+
+    ``filters`` takes pandas ``read_parquet`` style tuples, e.g.
+    ``[('qc_status', '==', 'PASS')]``. Filters on partition columns skip whole
+    partitions; others are checked against row-group statistics before any rows
+    are read.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    path = table_path(store_dir, name)
+    if not path.is_dir():
+        raise FileNotFoundError(f"No EDA table '{name}' in {store_dir}")
+    dataset = ds.dataset(path, schema=schema(name), format='parquet', partitioning='hive')
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=list(columns) if columns is not None else None,
+                             filter=expression)
+    return table.to_pandas()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Parallel FASTQ download engine for FungiMap.
+Resolves ENA fastq_ftp URLs in bulk and downloads several runs at once, splitting
+large files into concurrent byte ranges that resume after an interruption.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+# Make the project root importable when run as `python src/fastq_downloader.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.checksums import MultiHasher, hash_range, read_sidecars, write_sidecars
+from src.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class FastqDownloader:
+    """Download run FASTQ files with bounded concurrency at two levels.
+
+    Up to ``max_concurrency`` files download at once. Files larger than
+    ``part_size`` on servers that accept byte ranges are split into parts
+    fetched by a shared pool of ``range_workers`` threads and written in place
+    into ``<file>.part``; finished parts are recorded in ``<file>.part.json`` so a
+    restarted download only fetches the missing ones. Other files stream into
+    ``<file>.part`` and resume with a ``Range`` request from its current size.
+    All transfers draw from one token bucket, so ``max_bytes_per_second`` caps the
+    combined bandwidth.
+
+    MD5 and SHA-256 are computed while the data arrives, checked against the MD5
+    ENA publishes and written to ``<file>.md5``/``<file>.sha256`` sidecars.
+    """
+
+    ENA_SEARCH = 'https://www.ebi.ac.uk/ena/portal/api/search'
+    RESOLVE_BATCH_SIZE = 100
+
+    def __init__(self, output_dir: Path, max_concurrency: int = 4, range_workers: int = 4,
+                 part_size: int = 64 * MB, max_bytes_per_second: Optional[float] = None,
+                 retries: int = 3, chunk_size: int = MB, timeout: float = 60,
+                 ena_url: Optional[str] = None, scheme: str = 'https'):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.max_concurrency = max(1, max_concurrency)
+        self.part_size = part_size
+        self.retries = retries
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.ena_url = ena_url or self.ENA_SEARCH
+        self.scheme = scheme
+        self.limiter = (TokenBucket(max_bytes_per_second, capacity=chunk_size)
+                        if max_bytes_per_second else None)
+        self._part_pool = ThreadPoolExecutor(max_workers=max(1, range_workers))
+        self._state_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._part_pool.shutdown(wait=True)
+
+    def resolve_urls(self, accessions: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Look up the FASTQ files of many runs with batched ENA portal searches."""
+        accessions = list(dict.fromkeys(accessions))
+        files = {}
+        for i in range(0, len(accessions), self.RESOLVE_BATCH_SIZE):
+            batch = accessions[i:i+self.RESOLVE_BATCH_SIZE]
+            response = requests.post(self.ena_url, data={
+                'result': 'read_run',
+                'query': ' OR '.join(f'run_accession="{a}"' for a in batch),
+                'fields': 'run_accession,fastq_ftp,fastq_bytes,fastq_md5',
+                'format': 'json',
+                'limit': 0
+            }, timeout=self.timeout)
+            response.raise_for_status()
+
+            for row in response.json():
+                paths = _split(row.get('fastq_ftp'))
+                sizes = _split(row.get('fastq_bytes'))
+                md5s = _split(row.get('fastq_md5'))
+                files[row['run_accession']] = [
+                    {
+                        'url': path if '://' in path else f"{self.scheme}://{path}",
+                        'bytes': int(sizes[j]) if j < len(sizes) else None,
+                        'md5': md5s[j] if j < len(md5s) else None
+                    }
+                    for j, path in enumerate(paths)
+                ]
+        logger.info(f"Resolved FASTQ files for {len(files)}/{len(accessions)} runs")
+        return files
+
+    def download_runs(self, accessions: Iterable[str]) -> List[Dict]:
+        """Download every FASTQ file of ``accessions``; one failed file does not stop the rest.
+
+        Returns one result per file, and one per run without files, in input order.
+        """
+        accessions = list(dict.fromkeys(accessions))
+        files = self.resolve_urls(accessions)
+
+        jobs = []
+        for accession in accessions:
+            entries = files.get(accession) or [None]
+            jobs.extend((accession, entry) for entry in entries)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = list(executor.map(lambda job: self._download_job(*job), jobs))
+
+        failed = sum(1 for r in results if r['status'] == 'failed')
+        logger.info(f"Downloaded {len(results) - failed}/{len(results)} FASTQ files")
+        return results
+
+    def _download_job(self, accession: str, entry: Optional[Dict]) -> Dict:
+        if entry is None:
+            logger.error(f"ENA lists no FASTQ files for {accession}")
+            return {'accession': accession, 'status': 'failed', 'error': 'no fastq files in ENA'}
+
+        dest = self.output_dir / entry['url'].rsplit('/', 1)[-1]
+        result = {'accession': accession, 'url': entry['url'], 'path': str(dest),
+                  'expected_md5': entry.get('md5')}
+        start = time.perf_counter()
+        try:
+            result.update(self.download_file(entry['url'], dest, entry.get('bytes'),
+                                             entry.get('md5')))
+            result['bytes'] = dest.stat().st_size
+        except Exception as e:
+            logger.error(f"Error downloading {entry['url']}: {str(e)}")
+            result.update(status='failed', error=str(e))
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def download_file(self, url: str, dest: Path, size: Optional[int] = None,
+                      md5: Optional[str] = None) -> Dict:
+        """Download ``url`` to ``dest`` and return its status and checksums.
+
+        ``status`` is ``'downloaded'`` or ``'skipped'`` (already present, in which case
+        the checksums come from its sidecars). A download whose MD5 differs from
+        ``md5`` is discarded and raises IOError.
+        """
+        dest = Path(dest)
+        if dest.exists() and (size is None or dest.stat().st_size == size):
+            logger.info(f"{dest.name} already downloaded")
+            return {'status': 'skipped', **read_sidecars(dest)}
+
+        length, accepts_ranges = self._probe(url)
+        size = size or length
+        part_path = dest.with_name(dest.name + '.part')
+
+        if accepts_ranges and size and size > self.part_size:
+            digests = self._download_ranges(url, part_path, size)
+        else:
+            digests = self._download_stream(url, part_path, size, accepts_ranges)
+
+        if md5 and digests['md5'] != md5.lower():
+            part_path.unlink()
+            raise IOError(f"MD5 mismatch for {dest.name}: expected {md5}, got {digests['md5']}")
+
+        write_sidecars(dest, digests)
+        os.replace(part_path, dest)
+        logger.info(f"Downloaded {dest.name} ({dest.stat().st_size / MB:.1f} MB)")
+        return {'status': 'downloaded', **digests}
+
+    def _probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """Return the content length and whether the server serves byte ranges."""
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"HEAD {url} failed ({str(e)}); downloading as a single stream")
+            return None, False
+        length = response.headers.get('Content-Length')
+        return (int(length) if length else None,
+                response.headers.get('Accept-Ranges', '').lower() == 'bytes')
+
+    def _download_ranges(self, url: str, part_path: Path, size: int) -> Dict[str, str]:
+        """Fetch missing parts concurrently and return the file's checksums.
+
+        Parts finish out of order, so the hashes advance over the contiguous prefix
+        of finished parts as it grows, reading bytes that were just written and are
+        still in the page cache instead of re-reading the file afterwards.
+        """
+        state_path = part_path.with_name(part_path.name + '.json')
+        state = {'url': url, 'size': size, 'part_size': self.part_size, 'done': []}
+        if state_path.exists() and part_path.exists() and part_path.stat().st_size == size:
+            with open(state_path) as f:
+                saved = json.load(f)
+            if {k: saved.get(k) for k in ('url', 'size', 'part_size')} == \
+                    {k: state[k] for k in ('url', 'size', 'part_size')}:
+                state = saved
+        if not state['done']:
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+
+        done = set(state['done'])
+        bounds = [(start, min(start + self.part_size, size))
+                  for start in range(0, size, self.part_size)]
+        parts = [(i, start, end - 1) for i, (start, end) in enumerate(bounds) if i not in done]
+        if done:
+            logger.info(f"Resuming {part_path.name}: {len(parts)} of "
+                        f"{len(parts) + len(done)} parts left")
+
+        hasher = MultiHasher()
+        hashed = 0  # parts [0, hashed) have been fed to the hasher
+
+        errors = []
+        with open(part_path, 'r+b') as f:
+            futures = {self._part_pool.submit(self._fetch_range, url, f.fileno(), start, end): i
+                       for i, start, end in parts}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                with self._state_lock:
+                    done.add(futures[future])
+                    state['done'] = sorted(done)
+                    _write_json_atomic(state_path, state)
+                while hashed in done:
+                    hash_range(f.fileno(), *bounds[hashed], hasher)
+                    hashed += 1
+
+            if errors:
+                raise errors[0]
+            # Parts finished by an earlier run when no download was in flight
+            while hashed < len(bounds):
+                hash_range(f.fileno(), *bounds[hashed], hasher)
+                hashed += 1
+
+        state_path.unlink()
+        return hasher.hexdigests()
+
+    def _fetch_range(self, url: str, fd: int, start: int, end: int) -> None:
+        """Write bytes ``start..end`` of ``url`` at the same offsets, resuming on retry."""
+        offset = start
+        for attempt in range(self.retries + 1):
+            try:
+                with requests.get(url, headers={'Range': f"bytes={offset}-{end}"},
+                                  stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise IOError(f"Server ignored range request for {url}")
+                    for chunk in response.iter_content(self.chunk_size):
+                        self._throttle(len(chunk))
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                if offset != end + 1:
+                    raise IOError(f"Range {start}-{end} of {url} ended at byte {offset}")
+                return
+            except (requests.exceptions.RequestException, IOError) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {url} from byte {offset}: {str(e)}")
+                time.sleep(2 ** attempt)
+
+    def _download_stream(self, url: str, part_path: Path, size: Optional[int],
+                         accepts_ranges: bool) -> Dict[str, str]:
+        """Download in one stream, appending to an existing ``.part`` file when possible.
+
+        Checksums are updated chunk by chunk as the data is written; only a resumed
+        prefix is read back from disk.
+        """
+        for attempt in range(self.retries + 1):
+            offset = part_path.stat().st_size if part_path.exists() and accepts_ranges else 0
+            headers = {'Range': f"bytes={offset}-"} if offset else {}
+            try:
+                with requests.get(url, headers=headers, stream=True,
+                                  timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    # A 200 answer to a range request carries the whole file again
+                    appending = offset and response.status_code == 206
+                    hasher = MultiHasher()
+                    with open(part_path, 'a+b' if appending else 'wb') as f:
+                        if appending:
+                            hash_range(f.fileno(), 0, offset, hasher)
+                        for chunk in response.iter_content(self.chunk_size):
+                            self._throttle(len(chunk))
+                            f.write(chunk)
+                            hasher.update(chunk)
+                if size is not None and part_path.stat().st_size != size:
+                    raise IOError(f"{url} ended at {part_path.stat().st_size} of {size} bytes")
+                return hasher.hexdigests()
+            except (requests.exceptions.RequestException, IOError) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {url}: {str(e)}")
+                time.sleep(2 ** attempt)
+
+    def _throttle(self, nbytes: int) -> None:
+        if self.limiter is not None:
+            self.limiter.acquire(nbytes)
+
+
+def _split(value) -> List[str]:
+    return [v for v in str(value or '').split(';') if v]
+
+
+def _write_json_atomic(path: Path, payload: Dict) -> None:
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+DOWNLOAD_MANIFEST_FIELDS = ['accession', 'url', 'path', 'bytes', 'md5', 'sha256',
+                            'expected_md5', 'status', 'seconds', 'error']
+
+
+def write_download_manifest(results: List[Dict], path: Path) -> None:
+    """Write ``download_runs`` results, including checksums, as a CSV manifest."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=DOWNLOAD_MANIFEST_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def read_manifest_accessions(manifest_path: Path) -> List[str]:
+    """Return the ``accession`` column of a sample manifest CSV."""
+    with open(manifest_path, newline='') as f:
+        return [row['accession'] for row in csv.DictReader(f) if row.get('accession')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download run FASTQ files from ENA")
+    parser.add_argument('accessions', nargs='*', help='Run accessions to download')
+    parser.add_argument('--manifest', type=Path, help='CSV manifest with an accession column')
+    parser.add_argument('--output-dir', type=Path, default=PROJECT_ROOT / 'data' / 'sra-cache')
+    parser.add_argument('--config', type=Path, default=PROJECT_ROOT / 'config' / 'eda_config.json',
+                        help='Config whose "downloads" section provides defaults')
+    parser.add_argument('--max-concurrency', type=int, help='Files downloaded at once')
+    parser.add_argument('--range-workers', type=int, help='Concurrent byte-range requests')
+    parser.add_argument('--max-mb-per-second', type=float, help='Combined bandwidth cap')
+    parser.add_argument('--report', type=Path,
+                        help='Download manifest CSV (default: <output-dir>/download_manifest.csv)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = {}
+    if args.config.exists():
+        with open(args.config) as f:
+            settings = json.load(f).get('downloads', {})
+    max_mb_per_second = args.max_mb_per_second or settings.get('max_mb_per_second')
+
+    accessions = list(args.accessions)
+    if args.manifest:
+        accessions += read_manifest_accessions(args.manifest)
+    if not accessions:
+        parser.error("no accessions given")
+
+    with FastqDownloader(
+        args.output_dir,
+        max_concurrency=args.max_concurrency or settings.get('max_concurrency', 4),
+        range_workers=args.range_workers or settings.get('range_workers', 4),
+        part_size=int(settings.get('part_size_mb', 64) * MB),
+        max_bytes_per_second=max_mb_per_second * MB if max_mb_per_second else None,
+        retries=settings.get('retries', 3)
+    ) as downloader:
+        results = downloader.download_runs(accessions)
+
+    report_path = args.report or args.output_dir / 'download_manifest.csv'
+    write_download_manifest(results, report_path)
+    logger.info(f"Saved download manifest to {report_path}")
+
+    if any(r['status'] == 'failed' for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
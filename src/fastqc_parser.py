@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+FastQC result parsing for FungiMap.
+Reads ``fastqc_data.txt`` straight from a ``_fastqc.zip`` (or an extracted
+directory) in one pass, with every module's table as typed NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Make the project root importable when run as `python src/fastqc_parser.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = 'fastqc_data.txt'
+
+BASIC_STATISTICS = 'Basic Statistics'
+PER_BASE_QUALITY = 'Per base sequence quality'
+PER_SEQUENCE_GC = 'Per sequence GC content'
+DUPLICATION_LEVELS = 'Sequence Duplication Levels'
+ADAPTER_CONTENT = 'Adapter Content'
+
+# Modules whose values are reported verbatim rather than as numbers
+TEXT_MODULES = {BASIC_STATISTICS}
+
+
+class FastQCModule:
+    """One ``>>Module`` block: its status, ``#Key value`` header lines and table columns.
+
+    The table text is split into columns the first time any column is used, and each
+    column becomes a typed array on first access, so callers only pay for what they
+    read. Numeric columns are float64 arrays; columns with labels such as ``10-14``
+    or ``>10``, the sequences of ``Overrepresented sequences`` and everything in
+    ``TEXT_MODULES`` stay object arrays of strings.
+    """
+
+    def __init__(self, name: str, status: str, header: Dict[str, str],
+                 columns: List[str], table: str):
+        self.name = name
+        self.status = status
+        self.header = header
+        self.columns = columns
+        self._table = table
+        self._values = None
+        self._arrays = {}
+
+    def _split(self) -> Dict[str, List[str]]:
+        # One split for the whole table, then each column is a strided slice
+        table, width = self._table, len(self.columns)
+        lines = table.count('\n') + 1 if table else 0
+        fields = table.replace('\n', '\t').split('\t') if table else []
+        if len(fields) == width * lines:
+            return {column: fields[i::width] for i, column in enumerate(self.columns)}
+        rows = [line.split('\t') for line in table.split('\n')] if table else []
+        return {column: [row[i] if i < len(row) else '' for row in rows]
+                for i, column in enumerate(self.columns)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        array = self._arrays.get(column)
+        if array is None:
+            if self._values is None:
+                self._values = self._split()
+            values = self._values[column]
+            if self.name not in TEXT_MODULES:
+                try:
+                    array = np.array(values, dtype=np.float64)
+                except ValueError:
+                    pass
+            if array is None:
+                array = np.array(values, dtype=object)
+            self._arrays[column] = array
+        return array
+
+    @property
+    def data(self) -> Dict[str, np.ndarray]:
+        """Every column as an array, in report order."""
+        return {column: self[column] for column in self.columns}
+
+    def __len__(self) -> int:
+        return self._table.count('\n') + 1 if self._table else 0
+
+
+class FastQCReport:
+    """All modules of one ``fastqc_data.txt``, keyed by module name."""
+
+    def __init__(self, modules: Dict[str, FastQCModule], version: str = '', source: str = ''):
+        self.modules = modules
+        self.version = version
+        self.source = source
+
+    @classmethod
+    def from_text(cls, text: str, source: str = '<fastqc_data.txt>') -> 'FastQCReport':
+        """Parse a whole ``fastqc_data.txt`` in one pass, splitting it at module boundaries."""
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        if '\n\n' in text:
+            text = '\n'.join(line for line in text.split('\n') if line)
+        version = text.partition('\n')[0].partition('\t')[2] if text.startswith('##FastQC') else ''
+
+        *blocks, tail = text.split('>>END_MODULE')
+        if '>>' in tail:
+            name = tail[tail.index('>>') + 2:].partition('\n')[0].partition('\t')[0]
+            raise ValueError(f"{source}: module '{name}' has no >>END_MODULE")
+
+        modules = {}
+        for block in blocks:
+            start = block.find('>>')
+            if start < 0:
+                continue
+            title, _, body = block[start + 2:].partition('\n')
+            name, _, status = title.partition('\t')
+            header, columns = {}, []
+            # ``#`` lines lead the table: ``#Key<TAB>value`` lines, then the column names
+            while body.startswith('#'):
+                line, _, body = body.partition('\n')
+                fields = line[1:].split('\t')
+                if len(fields) == 2 and not columns and _is_number(fields[1]):
+                    header[fields[0]] = fields[1]
+                else:
+                    columns = fields
+            modules[name] = FastQCModule(name, status, header, columns, body.strip('\n'))
+        if not modules:
+            raise ValueError(f"{source}: no FastQC modules found")
+        return cls(modules, version, source)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], source: str = '<fastqc_data.txt>') -> 'FastQCReport':
+        return cls.from_text('\n'.join(line.rstrip('\r\n') for line in lines), source)
+
+    @classmethod
+    def from_zip(cls, path: Path) -> 'FastQCReport':
+        """Read ``fastqc_data.txt`` out of a FastQC zip without extracting it."""
+        with zipfile.ZipFile(path) as zf:
+            member = next((name for name in zf.namelist()
+                           if name.rsplit('/', 1)[-1] == DATA_FILE), None)
+            if member is None:
+                raise ValueError(f"{path}: no {DATA_FILE} in archive")
+            text = zf.read(member).decode('utf-8')
+        return cls.from_text(text, source=str(path))
+
+    @classmethod
+    def from_path(cls, path: Path) -> 'FastQCReport':
+        """Read a ``_fastqc.zip``, an extracted ``_fastqc`` directory or a ``fastqc_data.txt``.
+
+        A missing ``<sample>_fastqc`` directory falls back to ``<sample>_fastqc.zip``.
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / DATA_FILE
+        elif not path.exists() and path.with_name(path.name + '.zip').exists():
+            path = path.with_name(path.name + '.zip')
+        if path.suffix == '.zip':
+            return cls.from_zip(path)
+        with open(path, encoding='utf-8') as f:
+            return cls.from_text(f.read(), source=str(path))
+
+    def __contains__(self, module: str) -> bool:
+        return module in self.modules
+
+    def __getitem__(self, module: str) -> FastQCModule:
+        return self.modules[module]
+
+    @property
+    def statuses(self) -> Dict[str, str]:
+        """Module name to ``PASS``/``WARN``/``FAIL``, as in FastQC's ``summary.txt``."""
+        return {name: module.status.upper() for name, module in self.modules.items()}
+
+    @property
+    def basic_statistics(self) -> Dict[str, str]:
+        if BASIC_STATISTICS not in self.modules:
+            return {}
+        module = self.modules[BASIC_STATISTICS]
+        return dict(zip(module['Measure'], module['Value']))
+
+    @property
+    def total_sequences(self) -> int:
+        return int(float(self.basic_statistics.get('Total Sequences', 0)))
+
+    @property
+    def gc_percent(self) -> float:
+        return float(self.basic_statistics.get('%GC', 0))
+
+    @property
+    def sequence_length(self) -> str:
+        return self.basic_statistics.get('Sequence length', '')
+
+    @property
+    def encoding(self) -> str:
+        return self.basic_statistics.get('Encoding', '')
+
+    @property
+    def mean_quality(self) -> float:
+        """Mean of the per-base mean qualities (one value per reported base or base group)."""
+        if PER_BASE_QUALITY not in self.modules:
+            return 0.0
+        means = self.modules[PER_BASE_QUALITY]['Mean']
+        return float(means.mean()) if len(means) else 0.0
+
+    @property
+    def deduplicated_percent(self) -> Optional[float]:
+        if DUPLICATION_LEVELS not in self.modules:
+            return None
+        value = self.modules[DUPLICATION_LEVELS].header.get('Total Deduplicated Percentage')
+        return float(value) if value is not None else None
+
+    @property
+    def max_adapter_content(self) -> float:
+        """Highest percentage of any adapter at any position."""
+        if ADAPTER_CONTENT not in self.modules:
+            return 0.0
+        module = self.modules[ADAPTER_CONTENT]
+        values = [module[column] for column in module.columns[1:]
+                  if module[column].dtype == np.float64 and len(module[column])]
+        return float(max(column.max() for column in values)) if values else 0.0
+
+    def summary(self) -> Dict:
+        """Scalar metrics used across the pipeline, plus every module's status."""
+        return {
+            'total_sequences': self.total_sequences,
+            'sequence_length': self.sequence_length,
+            'gc_percent': self.gc_percent,
+            'quality_encoding': self.encoding,
+            'mean_quality': self.mean_quality,
+            'deduplicated_percent': self.deduplicated_percent,
+            'max_adapter_content': self.max_adapter_content,
+            **{f"status:{name}": status for name, status in self.statuses.items()}
+        }
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def read_fastqc(path: Path) -> FastQCReport:
+    return FastQCReport.from_path(path)
+
+
+def _summary_task(path: Path) -> Tuple[Optional[Dict], Optional[str]]:
+    try:
+        return FastQCReport.from_path(path).summary(), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {str(e)}"
+
+
+def summarize_fastqc(paths: Iterable[Path], max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Summaries of many FastQC results parsed across processes, one row per path in input order.
+
+    Unreadable results keep their row with the failure in ``error``.
+    """
+    paths = [Path(path) for path in paths]
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers > 1:
+        chunksize = max(1, len(paths) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_summary_task, paths, chunksize=chunksize))
+    else:
+        results = [_summary_task(path) for path in paths]
+
+    rows = []
+    for path, (summary, error) in zip(paths, results):
+        if error is not None:
+            logger.error(f"Error parsing FastQC results from {path}: {error}")
+        rows.append({'path': str(path), **(summary or {}), 'error': error})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize FastQC results in parallel")
+    parser.add_argument('paths', nargs='+', type=Path,
+                        help='_fastqc.zip files or extracted _fastqc directories')
+    parser.add_argument('-o', '--output', type=Path, help='CSV to write (default: stdout)')
+    parser.add_argument('--workers', type=int, help='Processes to parse with (default: CPU count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    summaries = summarize_fastqc(args.paths, args.workers)
+    summaries.to_csv(args.output or sys.stdout, index=False)
+    failed = int(summaries['error'].notna().sum())
+    logger.info(f"Parsed {len(summaries) - failed}/{len(summaries)} FastQC results")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Kraken2 report parsing for FungiMap.
+Reads a report in one pass into taxid-indexed arrays so clade
+queries (total, classified, fungal, human reads) are dictionary lookups.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+UNCLASSIFIED_TAXID = 0
+ROOT_TAXID = 1
+FUNGI_TAXID = 4751
+HUMAN_TAXID = 9606
+
+TAB = '\t'
+
+
+class KrakenReport:
+    """Columns of a Kraken2 report as arrays in report order.
+
+    Handles both the standard 6-column layout and ``--report-minimizer-data``
+    (8 columns). Clade depth is taken from the indentation of the name column and
+    used to derive each row's parent, so lineages come without a taxonomy file.
+    Each file is read once and split into fields with a single call; the numeric
+    columns are then converted in bulk.
+    """
+
+    def __init__(self, percents: np.ndarray, clade_counts: np.ndarray,
+                 direct_counts: np.ndarray, ranks: np.ndarray, taxids: np.ndarray,
+                 depths: np.ndarray, names: List[str]):
+        self.percents = percents
+        self.clade_counts = clade_counts
+        self.direct_counts = direct_counts
+        self.ranks = ranks
+        self.taxids = taxids
+        self.depths = depths
+        self.names = names
+        self._rows = dict(zip(taxids.tolist(), range(len(names))))
+        self._parents = None
+
+    @classmethod
+    def from_text(cls, text: str, source: str = '<report>') -> 'KrakenReport':
+        """Parse a whole report with one split; each column is then converted in bulk."""
+        if '\n\n' in text or '\r' in text:
+            text = '\n'.join(line for line in text.splitlines() if line.strip())
+        text = text.strip('\n')
+        lines = text.count('\n') + 1 if text else 0
+        width = text.split('\n', 1)[0].count(TAB) + 1 if text else 6
+
+        fields = text.replace('\n', TAB).split(TAB) if text else []
+        if width not in (6, 8) or len(fields) != width * lines:
+            for number, line in enumerate(text.split('\n'), 1):
+                columns = line.count(TAB) + 1
+                if columns != width or columns not in (6, 8):
+                    raise ValueError(f"{source}:{number}: expected 6 or 8 columns, got {columns}")
+
+        raw_names = fields[width - 1::width]
+        names = [name.lstrip(' ') for name in raw_names]
+        indent = (np.fromiter(map(len, raw_names), dtype=np.int32, count=lines)
+                  - np.fromiter(map(len, names), dtype=np.int32, count=lines))
+
+        return cls(
+            percents=np.array(list(map(float, fields[0::width])), dtype=np.float64),
+            clade_counts=np.fromiter(map(int, fields[1::width]), dtype=np.int64, count=lines),
+            direct_counts=np.fromiter(map(int, fields[2::width]), dtype=np.int64, count=lines),
+            ranks=np.array(fields[width - 3::width], dtype=object),
+            taxids=np.fromiter(map(int, fields[width - 2::width]), dtype=np.int64, count=lines),
+            depths=indent // 2,
+            names=names,
+        )
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], source: str = '<report>') -> 'KrakenReport':
+        return cls.from_text('\n'.join(line.rstrip('\n') for line in lines), source)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'KrakenReport':
+        with open(path) as f:
+            return cls.from_text(f.read(), source=str(path))
+
+    @property
+    def parents(self) -> np.ndarray:
+        """Row index of each row's parent (-1 at the top), derived from indentation."""
+        if self._parents is None:
+            depths = self.depths.tolist()
+            parents, stack = [], []
+            for row, depth in enumerate(depths):
+                while stack and depths[stack[-1]] >= depth:
+                    stack.pop()
+                parents.append(stack[-1] if stack else -1)
+                stack.append(row)
+            self._parents = np.asarray(parents, dtype=np.int64)
+        return self._parents
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, taxid: int) -> bool:
+        return taxid in self._rows
+
+    def clade_reads(self, taxid: int) -> int:
+        """Reads assigned to ``taxid`` or its descendants; 0 if the taxon is absent."""
+        row = self._rows.get(taxid)
+        return int(self.clade_counts[row]) if row is not None else 0
+
+    @property
+    def classified_reads(self) -> int:
+        return self.clade_reads(ROOT_TAXID)
+
+    @property
+    def total_reads(self) -> int:
+        return self.clade_reads(UNCLASSIFIED_TAXID) + self.clade_reads(ROOT_TAXID)
+
+    def clade_percent(self, taxid: int) -> float:
+        """Clade reads as a percentage of all reads, computed from counts."""
+        total = self.total_reads
+        return self.clade_reads(taxid) / total * 100 if total else 0.0
+
+    def lineage(self, taxid: int) -> List[int]:
+        """Taxids from ``taxid`` up to the root, as nested in the report."""
+        row = self._rows.get(taxid)
+        parents = self.parents
+        lineage = []
+        while row is not None and row >= 0:
+            lineage.append(int(self.taxids[row]))
+            row = parents[row]
+        return lineage
+
+    def top(self, rank: str = 'S', n: int = 10) -> List[Dict]:
+        """The ``n`` taxa of ``rank`` with the most clade reads."""
+        rows = np.flatnonzero(self.ranks == rank)
+        rows = rows[np.argsort(-self.clade_counts[rows], kind='stable')][:n]
+        return [
+            {
+                'percent': float(self.percents[row]),
+                'clade_reads': int(self.clade_counts[row]),
+                'direct_reads': int(self.direct_counts[row]),
+                'rank': self.ranks[row],
+                'taxid': int(self.taxids[row]),
+                'name': self.names[row],
+            }
+            for row in rows
+        ]
+
+    def summary(self) -> Dict:
+        """Read totals and the classified, fungal and human fractions used across the pipeline."""
+        return {
+            'total_reads': self.total_reads,
+            'classified_reads': self.classified_reads,
+            'classified_percent': self.clade_percent(ROOT_TAXID),
+            'unclassified_percent': self.clade_percent(UNCLASSIFIED_TAXID),
+            'fungal_reads': self.clade_reads(FUNGI_TAXID),
+            'fungal_percent': self.clade_percent(FUNGI_TAXID),
+            'human_reads': self.clade_reads(HUMAN_TAXID),
+            'human_percent': self.clade_percent(HUMAN_TAXID),
+        }
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for FungiMap entry points.
+Snakemake starts the pipeline scripts once per sample, so heavy dependencies are
+bound at module level but only executed when first used.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module ``name``, executing it on first attribute access.
+
+    A module that is already imported is returned as is. A module that is not
+    installed raises ModuleNotFoundError here rather than at first use.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Consolidated sample metadata index for FungiMap.
+Keeps every sample's metadata in one SQLite file (one row per accession and
+field) so completeness checks for a whole cohort are a single query instead of
+one metadata.json open per sample.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Make the project root importable when run as `python src/metadata_index.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.checksums import source_stamp
+from src.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = 'metadata.json'
+
+# Values that do not count towards completeness (None, "Unknown" and "" as stored JSON)
+INVALID_VALUES = tuple(json.dumps(value) for value in (None, 'Unknown', ''))
+
+
+def score_completeness(valid_values, total_fields: int) -> np.ndarray:
+    """Completeness scores: 100 when every required field is valid, 30 when some are, else 0."""
+    valid_values = np.asarray(valid_values)
+    return np.select([valid_values == total_fields, valid_values > 0], [100.0, 30.0], 0.0)
+
+
+class MetadataIndex:
+    """SQLite table of sample metadata fields keyed by accession.
+
+    Values are stored JSON-encoded, so they round-trip with their types and the
+    invalid values can be matched in SQL. ``samples.source`` holds the stamp of
+    the metadata.json a sample was imported from (NULL for records added
+    directly), which lets ``import_directory`` skip unchanged files. A lock
+    serialises access so the index can be shared by worker threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                accession TEXT PRIMARY KEY,
+                source TEXT,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fields (
+                accession TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (accession, field)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def upsert(self, records: Iterable[Tuple[str, Dict, Optional[str]]], batch_size: int = 5000) -> int:
+        """Replace the metadata of each ``(accession, metadata, source)``; return how many were new."""
+        before = len(self)
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            now = datetime.now().isoformat()
+            with self._lock:
+                self._conn.executemany("DELETE FROM fields WHERE accession = ?",
+                                       [(accession,) for accession, _, _ in batch])
+                self._conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?)",
+                                       [(accession, source, now) for accession, _, source in batch])
+                self._conn.executemany("INSERT INTO fields VALUES (?, ?, ?)",
+                                       [(accession, field, json.dumps(value))
+                                        for accession, metadata, _ in batch
+                                        for field, value in metadata.items()])
+                self._conn.commit()
+        return len(self) - before
+
+    def remove(self, accessions: Iterable[str]) -> None:
+        rows = [(accession,) for accession in accessions]
+        with self._lock:
+            self._conn.executemany("DELETE FROM fields WHERE accession = ?", rows)
+            self._conn.executemany("DELETE FROM samples WHERE accession = ?", rows)
+            self._conn.commit()
+
+    def get(self, accession: str) -> Optional[Dict]:
+        """The stored metadata of ``accession``, or None if it is not indexed."""
+        if accession not in self:
+            return None
+        with self._lock:
+            rows = self._conn.execute("SELECT field, value FROM fields WHERE accession = ?",
+                                      (accession,)).fetchall()
+        return {field: json.loads(value) for field, value in rows}
+
+    def sources(self) -> Dict[str, Optional[str]]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT accession, source FROM samples"))
+
+    def import_directory(self, storage_root: Path, max_workers: Optional[int] = None) -> Dict[str, str]:
+        """Import ``<storage_root>/<accession>/metadata.json`` files; return each sample's status.
+
+        The status is ``added``, ``updated``, ``unchanged``, ``removed`` (its file is
+        gone) or ``failed`` (unreadable JSON). Only new and changed files are read;
+        a changed file that fails to load removes the sample.
+        """
+        storage_root = Path(storage_root)
+        known = {accession: source for accession, source in self.sources().items() if source is not None}
+        status, pending = {}, []
+        for path in sorted(storage_root.glob(f"*/{METADATA_FILE}")):
+            accession = path.parent.name
+            stamp = source_stamp(path)
+            if known.get(accession) == stamp:
+                status[accession] = 'unchanged'
+            else:
+                pending.append((accession, path, stamp))
+                status[accession] = 'updated' if accession in known else 'added'
+
+        removed = [accession for accession in known if accession not in status]
+        status.update((accession, 'removed') for accession in removed)
+
+        records = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = executor.map(_read_metadata, [path for _, path, _ in pending])
+            for (accession, _, stamp), metadata in zip(pending, loaded):
+                if metadata is None:
+                    status[accession] = 'failed'
+                    removed.append(accession)
+                    continue
+                records.append((accession, metadata, stamp))
+        self.remove(removed)
+        self.upsert(records)
+        return status
+
+    def completeness(self, accessions: List[str], required_fields: List[str]) -> pd.DataFrame:
+        """Score the metadata of ``accessions`` against ``required_fields`` in one pass.
+
+        Returns a frame indexed by accession with ``exists`` (indexed at all),
+        ``valid_values`` and ``metadata_completeness`` (0/30/100, see
+        ``score_completeness``), built from one query for the whole list.
+        """
+        required_fields = list(dict.fromkeys(required_fields))
+        columns = {field: i for i, field in enumerate(required_fields)}
+        placeholders = ', '.join('?' * len(required_fields))
+        with self._lock:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted (position INTEGER PRIMARY KEY, accession TEXT)"
+            )
+            self._conn.execute("DELETE FROM wanted")
+            self._conn.executemany("INSERT INTO wanted VALUES (?, ?)", enumerate(accessions))
+            present = self._conn.execute(
+                "SELECT wanted.position FROM wanted JOIN samples USING (accession)"
+            ).fetchall()
+            valid = self._conn.execute(
+                f"""
+                SELECT wanted.position, fields.field FROM wanted JOIN fields USING (accession)
+                WHERE fields.field IN ({placeholders})
+                AND fields.value NOT IN ({', '.join('?' * len(INVALID_VALUES))})
+                """,
+                (*required_fields, *INVALID_VALUES)
+            ).fetchall()
+            self._conn.execute("DELETE FROM wanted")
+
+        exists = np.zeros(len(accessions), dtype=bool)
+        exists[np.array([position for position, in present], dtype=np.int64)] = True
+        matrix = np.zeros((len(accessions), len(required_fields)), dtype=bool)
+        if valid:
+            rows, fields = zip(*valid)
+            matrix[np.array(rows), np.array([columns[field] for field in fields])] = True
+        valid_values = matrix.sum(axis=1)
+        scores = np.where(exists, score_completeness(valid_values, len(required_fields)), 0.0)
+        return pd.DataFrame({'exists': exists, 'valid_values': valid_values, 'metadata_completeness': scores},
+                            index=pd.Index(accessions, name='accession'))
+
+    def __contains__(self, accession: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM samples WHERE accession = ?",
+                                      (accession,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _read_metadata(path: Path) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            metadata = json.load(f)
+        if not isinstance(metadata, dict):
+            raise ValueError("not a JSON object")
+        return metadata
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading metadata from {path}: {str(e)}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import per-sample metadata.json files into a metadata index")
+    parser.add_argument('storage_root', type=Path, help='Directory holding <accession>/metadata.json')
+    parser.add_argument('-o', '--output', type=Path, help='Index to create or update '
+                                                          '(default: <storage_root>/metadata_index.sqlite)')
+    parser.add_argument('--workers', type=int, help='Threads to read files with')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    index = MetadataIndex(args.output or args.storage_root / 'metadata_index.sqlite')
+    status = index.import_directory(args.storage_root, args.workers)
+    counts = {state: sum(1 for s in status.values() if s == state)
+              for state in ('added', 'updated', 'unchanged', 'removed', 'failed')}
+    logger.info(f"{index.path}: {len(index)} samples "
+                f"({counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+                f"{counts['removed']} removed, {counts['failed']} failed)")
+    index.close()
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Resumable MGnify crawler for FungiMap.
+Follows JSON:API pagination from studies to samples to runs and emits run records
+in the schema consumed by DataHarvester.process_candidates.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+
+class MGnifyCrawler:
+    """Crawl MGnify studies -> samples -> runs with bounded concurrency.
+
+    Studies on each ``/studies`` page are crawled concurrently. As each study
+    finishes, its run records are appended to ``mgnify_runs.jsonl`` and the
+    checkpoint (``mgnify_checkpoint.json``) records the study as done together with
+    the spool size. A restarted crawl truncates the spool back to that size and
+    continues from the last unfinished page, so the spool holds each run once.
+    By default ``crawl()`` first replays the spool, i.e. every call yields the full
+    result set once; pass ``replay=False`` to get only runs not yielded before.
+
+    MGnify exposes no read counts, so each study's runs are enriched with
+    ``read_count``/``base_count``/``fastq_bytes`` from the ENA filereport. Runs ENA
+    does not know about keep ``spots``/``size_MB`` as None.
+    """
+
+    CHECKPOINT_NAME = 'mgnify_checkpoint.json'
+    SPOOL_NAME = 'mgnify_runs.jsonl'
+    ENA_FILEREPORT = 'https://www.ebi.ac.uk/ena/portal/api/filereport'
+
+    def __init__(self, get_json: Callable[[str, Dict], Dict], api_url: str,
+                 checkpoint_dir: Path, params: Optional[Dict] = None,
+                 metadata_fields: Optional[List[str]] = None, max_concurrency: int = 4,
+                 ena_url: Optional[str] = None):
+        self.get_json = get_json
+        self.api_url = api_url.rstrip('/')
+        self.ena_url = ena_url or self.ENA_FILEREPORT
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = self.checkpoint_dir / self.CHECKPOINT_NAME
+        self.spool_path = self.checkpoint_dir / self.SPOOL_NAME
+        self.params = params or {}
+        self.metadata_fields = metadata_fields or []
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _params_key(self) -> str:
+        return hashlib.sha256(json.dumps(self.params, sort_keys=True).encode()).hexdigest()
+
+    def _load_checkpoint(self) -> Dict:
+        """Load the checkpoint, discarding it if it belongs to different crawl parameters."""
+        fresh = {'params_key': self._params_key(), 'next_url': None,
+                 'completed_studies': [], 'spool_bytes': 0, 'done': False}
+        if not self.checkpoint_path.exists():
+            return fresh
+
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        if state.get('params_key') != fresh['params_key']:
+            logger.warning(f"Checkpoint in {self.checkpoint_dir} was written for other "
+                           f"MGnify filters; starting a fresh crawl")
+            return fresh
+        return state
+
+    def _save_checkpoint(self, state: Dict) -> None:
+        """Write the checkpoint atomically so a crash never leaves it half written."""
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _iter_pages(self, url: str) -> Iterator[Dict]:
+        """Yield every page of a JSON:API collection by following ``links.next``."""
+        while url:
+            page = self.get_json(url, {})
+            yield page
+            url = (page.get('links') or {}).get('next')
+
+    @staticmethod
+    def _related(item: Dict, relation: str) -> Optional[str]:
+        return (((item.get('relationships') or {}).get(relation) or {})
+                .get('links') or {}).get('related')
+
+    def _normalise_run(self, run: Dict, sample: Dict, study_id: str) -> Dict:
+        """Map MGnify run/sample resources onto the harvester's raw record schema."""
+        run_attrs = run.get('attributes') or {}
+        sample_attrs = sample.get('attributes') or {}
+        metadata = {
+            str(m.get('key', '')).strip().lower().replace(' ', '_').replace('-', '_'): m.get('value')
+            for m in sample_attrs.get('sample-metadata') or []
+        }
+        biome = sample_attrs.get('environment-biome') or ''
+
+        record = {
+            'run_accession': run_attrs.get('accession') or run.get('id', ''),
+            'spots': None,  # filled from the ENA filereport in _add_read_counts
+            'bases': None,
+            'size_MB': None,
+            'sample_attribute': ';'.join(f"{key}={value}" for key, value in metadata.items() if value),
+            'habitat': biome.split(':')[-1],
+            'study_accession': study_id,
+            'sample_accession': sample.get('id', ''),
+            'experiment_type': run_attrs.get('experiment-type', ''),
+            'instrument_platform': run_attrs.get('instrument-platform', ''),
+        }
+        for field in self.metadata_fields:
+            record[field] = metadata.get(field) or ''
+        return record
+
+    def _add_read_counts(self, study: Dict, records: List[Dict]) -> None:
+        """Fill spots/bases/size_MB from the ENA filereport for the study's runs."""
+        attrs = study.get('attributes') or {}
+        accession = attrs.get('secondary-accession') or attrs.get('bioproject') or study['id']
+        rows = self.get_json(self.ena_url, {
+            'accession': accession,
+            'result': 'read_run',
+            'fields': 'run_accession,read_count,base_count,fastq_bytes',
+            'format': 'json'
+        })
+        counts = {row.get('run_accession'): row for row in rows or []}
+
+        for record in records:
+            row = counts.get(record['run_accession'])
+            if not row or not row.get('read_count'):
+                continue
+            record['spots'] = int(row['read_count'])
+            record['bases'] = int(row.get('base_count') or 0)
+            fastq_bytes = sum(int(b) for b in str(row.get('fastq_bytes') or '').split(';') if b)
+            record['size_MB'] = fastq_bytes / (1024 * 1024)
+
+    def _crawl_study(self, study: Dict) -> List[Dict]:
+        """Collect normalised run records for every sample of one study."""
+        study_id = study['id']
+        samples_url = self._related(study, 'samples') or f"{self.api_url}/studies/{study_id}/samples"
+
+        records = []
+        for samples_page in self._iter_pages(samples_url):
+            for sample in samples_page.get('data', []):
+                runs_url = self._related(sample, 'runs') or f"{self.api_url}/samples/{sample['id']}/runs"
+                for runs_page in self._iter_pages(runs_url):
+                    for run in runs_page.get('data', []):
+                        records.append(self._normalise_run(run, sample, study_id))
+
+        if records:
+            self._add_read_counts(study, records)
+        return records
+
+    def _replay_spool(self, spool_bytes: int) -> Iterator[Dict]:
+        """Drop records written after the last checkpoint and return a reader for the rest."""
+        if not self.spool_path.exists():
+            return iter(())
+        with open(self.spool_path, 'r+b') as f:
+            f.truncate(spool_bytes)
+        return self._read_spool()
+
+    def _read_spool(self) -> Iterator[Dict]:
+        with open(self.spool_path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def crawl(self, replay: bool = True) -> Iterator[Dict]:
+        """Yield run records, resuming from the checkpoint if one exists.
+
+        With ``replay`` the runs spooled by earlier, interrupted calls are yielded
+        first; without it only newly crawled runs are yielded.
+        """
+        state = self._load_checkpoint()
+        spooled = self._replay_spool(state['spool_bytes'])
+        if replay:
+            yield from spooled
+        if state['done']:
+            logger.info("MGnify crawl already complete; nothing left to fetch")
+            return
+
+        # Cursor URLs carry their own query string, so the first page does too
+        url = state['next_url'] or f"{self.api_url}/studies?{urlencode(self.params)}"
+        completed = set(state['completed_studies'])
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor, \
+                open(self.spool_path, 'ab') as spool:
+            for page in self._iter_pages(url):
+                studies = [s for s in page.get('data', []) if s['id'] not in completed]
+                futures = {executor.submit(self._crawl_study, s): s['id'] for s in studies}
+
+                for future in as_completed(futures):
+                    study_id = futures[future]
+                    records = future.result()
+                    spool.writelines((json.dumps(r) + '\n').encode() for r in records)
+                    spool.flush()
+                    os.fsync(spool.fileno())
+
+                    completed.add(study_id)
+                    state.update(next_url=url, completed_studies=sorted(completed),
+                                 spool_bytes=spool.tell())
+                    self._save_checkpoint(state)
+                    logger.info(f"Crawled MGnify study {study_id}: {len(records)} runs")
+                    yield from records
+
+                # Page finished: move the cursor on and forget per-page progress
+                url = (page.get('links') or {}).get('next')
+                completed.clear()
+                state.update(next_url=url, completed_studies=[], done=url is None)
+                self._save_checkpoint(state)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Headless, incremental plot rendering for FungiMap.
+Renders independent figures with the Agg backend across worker processes and
+skips figures whose input data is unchanged since the previous render.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints of the last successful render of each figure, next to the figures
+FINGERPRINTS_FILE = '.plot_fingerprints.json'
+
+# Figures reused within a worker process, keyed by (render function, size)
+_FIGURES: Dict[Tuple[str, Tuple[float, float]], Figure] = {}
+
+
+@dataclass
+class PlotJob:
+    """One figure: ``render(path, **inputs)`` writes ``output`` below the plot directory.
+
+    ``render`` must be a module-level function so jobs can be sent to worker
+    processes. Paths in ``inputs`` are fingerprinted by size and mtime, so a job
+    can load its data (e.g. a FastQC zip) in the worker instead of pickling it.
+    """
+
+    output: str
+    render: Callable
+    inputs: Dict = field(default_factory=dict)
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(f"{self.render.__module__}.{self.render.__qualname__}".encode())
+        for name in sorted(self.inputs):
+            digest.update(name.encode())
+            _update_digest(digest, self.inputs[name])
+        return digest.hexdigest()
+
+
+def _update_digest(digest, value) -> None:
+    """Feed a stable representation of a plot input to ``digest``."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(getattr(value, 'columns', value.name)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes()
+                      if value.dtype != object else repr(value.tolist()).encode())
+    elif isinstance(value, Path):
+        try:
+            stat = value.stat()
+            digest.update(f"{value}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            digest.update(f"{value}:missing".encode())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def reusable_figure(render: Callable, figsize: Tuple[float, float],
+                    setup: Optional[Callable[[Figure], None]] = None) -> Figure:
+    """A figure kept per worker process, so per-sample batches skip figure setup.
+
+    Without ``setup`` the figure is cleared for every call. With ``setup`` it is
+    built once by ``setup(figure)`` and handed back as is, so the caller only
+    updates its artists' data, which avoids rebuilding axes and ticks. Figures are
+    created without pyplot, so nothing accumulates in its global state.
+    """
+    key = (render.__qualname__, tuple(figsize))
+    figure = _FIGURES.get(key)
+    if figure is None:
+        from matplotlib.figure import Figure
+
+        figure = _FIGURES[key] = Figure(figsize=figsize)
+        if setup is not None:
+            setup(figure)
+    elif setup is None:
+        figure.clear()
+    return figure
+
+
+def use_headless_backend() -> None:
+    """Select Agg unless pyplot is already in use (figures here never need pyplot)."""
+    if 'matplotlib.pyplot' not in sys.modules:
+        import matplotlib
+
+        matplotlib.use('Agg')
+
+
+def _render_task(task: Tuple[PlotJob, Path]) -> Optional[str]:
+    job, path = task
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        job.render(path, **job.inputs)
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e)}"
+
+
+def render_plots(jobs: Iterable[PlotJob], plot_dir: Path, max_workers: Optional[int] = None,
+                 force: bool = False) -> Dict[str, str]:
+    """Render the jobs whose inputs changed; return ``rendered``/``skipped``/``failed`` per output.
+
+    A job is skipped when its figure exists and its fingerprint matches the last
+    successful render. Failed figures are logged and re-rendered on the next call.
+    """
+    plot_dir = Path(plot_dir)
+    plot_dir.mkdir(parents=True, exist_ok=True)
+    use_headless_backend()
+    fingerprints_path = plot_dir / FINGERPRINTS_FILE
+    previous = {}
+    if fingerprints_path.exists():
+        try:
+            previous = json.loads(fingerprints_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable plot fingerprints {fingerprints_path}: {str(e)}")
+
+    status, fingerprints, pending = {}, {}, []
+    for job in jobs:
+        fingerprint = job.fingerprint()
+        path = plot_dir / job.output
+        if not force and previous.get(job.output) == fingerprint and path.exists():
+            status[job.output] = 'skipped'
+            fingerprints[job.output] = fingerprint
+        else:
+            pending.append((job, path, fingerprint))
+
+    tasks = [(job, path) for job, path, _ in pending]
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        # Batches of figures per task let each worker reuse its figures
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(_render_task, tasks, chunksize=chunksize))
+    else:
+        errors = [_render_task(task) for task in tasks]
+
+    for (job, _, fingerprint), error in zip(pending, errors):
+        if error is not None:
+            logger.error(f"Error rendering {job.output}: {error}")
+            status[job.output] = 'failed'
+        else:
+            status[job.output] = 'rendered'
+            fingerprints[job.output] = fingerprint
+
+    if fingerprints != previous:
+        tmp_path = fingerprints_path.with_name(FINGERPRINTS_FILE + '.tmp')
+        tmp_path.write_text(json.dumps(fingerprints, indent=1, sort_keys=True))
+        os.replace(tmp_path, fingerprints_path)
+
+    counts = {state: sum(1 for s in status.values() if s == state)
+              for state in ('rendered', 'skipped', 'failed')}
+    logger.info(f"Plots in {plot_dir}: {counts['rendered']} rendered, "
+                f"{counts['skipped']} unchanged, {counts['failed']} failed")
+    return status
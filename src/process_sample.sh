@@ -67,36 +67,29 @@ validate_kraken_db() {
 # Function to download from ENA
 download_from_ena() {
     local accession="$1"
-    local output_file="${CACHE_DIR}/${accession}.fastq.gz"
     
     log "Downloading ${accession}..."
     
-    # Get download URL from ENA API
-    local url
-    url=$(curl -s "https://www.ebi.ac.uk/ena/portal/api/filereport?accession=${accession}&result=read_run&fields=fastq_ftp&format=tsv" | tail -n1 | cut -f2)
-    
-    if [[ -z "${url}" ]]; then
-        error "Could not get download URL for ${accession}"
+    # Resolves fastq_ftp via the ENA portal, resumes partial files and skips
+    # files already fetched (e.g. by the manifest prefetch in run_eda_pipeline.sh)
+    if ! python "${SCRIPT_DIR}/fastq_downloader.py" --output-dir "${CACHE_DIR}" "${accession}"; then
+        error "Download failed for ${accession}"
     fi
     
-    # Download with retry logic
-    local max_retries=3
-    local retry_count=0
-    
-    while [[ ${retry_count} -lt ${max_retries} ]]; do
-        if wget --quiet --tries=3 --timeout=60 "ftp://${url}" -O "${output_file}"; then
-            if [[ -s "${output_file}" ]]; then
-                log "Download successful: ${output_file}"
-                return 0
-            fi
-        fi
-        
-        log "Retry ${retry_count} of ${max_retries}..."
-        ((retry_count++))
-        sleep 5
-    done
+    log "Download successful: ${accession}"
+}
+
+# Function to pick the FASTQ file to analyse (forward reads for paired runs)
+local_fastq() {
+    local accession="$1"
     
-    error "Download failed for ${accession} after ${max_retries} attempts"
+    if [[ -s "${CACHE_DIR}/${accession}.fastq.gz" ]]; then
+        echo "${CACHE_DIR}/${accession}.fastq.gz"
+    elif [[ -s "${CACHE_DIR}/${accession}_1.fastq.gz" ]]; then
+        echo "${CACHE_DIR}/${accession}_1.fastq.gz"
+    else
+        error "No FASTQ file found for ${accession} in ${CACHE_DIR}"
+    fi
 }
 
 # Function to run FastQC
@@ -163,7 +156,7 @@ calculate_stats() {
 # Main processing function
 process_sample() {
     local accession="$1"
-    local fastq_path="${CACHE_DIR}/${accession}.fastq.gz"
+    local fastq_path
     local output_prefix="${RESULTS_DIR}/kraken2/${accession}"
     
     mkdir -p "${CACHE_DIR}" "${RESULTS_DIR}/kraken2"
@@ -172,6 +165,7 @@ process_sample() {
     
     # Download data
     download_from_ena "${accession}"
+    fastq_path=$(local_fastq "${accession}")
     
     # Run QC
     run_fastqc "${fastq_path}"
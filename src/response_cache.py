@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for FungiMap harvesting.
+Stores JSON API responses in SQLite keyed by URL and canonicalised parameters.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Parameters that authenticate a request but do not change its response
+IGNORED_PARAMS = {'api_key', 'email', 'tool'}
+
+# Cache hits are recorded in memory and written to SQLite in batches of this size
+ACCESS_FLUSH_SIZE = 256
+
+
+def is_cacheable(payload) -> bool:
+    """Reject error payloads that APIs (notably eutils) return with HTTP 200."""
+    if not isinstance(payload, dict):
+        return True
+    if {'error', 'ERROR', 'esummaryresult'} & payload.keys():
+        return False
+    return not any(isinstance(v, dict) and 'ERROR' in v for v in payload.values())
+
+
+class ResponseCache:
+    """SQLite-backed JSON response cache with per-endpoint TTLs and LRU eviction.
+
+    A fresh entry is served without touching the network. A stale entry that carried
+    an ETag or Last-Modified header is revalidated with a conditional request and
+    reused on ``304 Not Modified``. Once the stored bodies exceed ``max_bytes`` the
+    least recently used entries are evicted. Bodies that are not JSON, or that hold
+    an API error, are returned to the caller but never stored.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 512 * 1024 * 1024,
+                 default_ttl: float = 86400, ttls: Optional[Dict[str, float]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # Longest matching URL fragment wins, e.g. {'esearch.fcgi': 3600}
+        self.ttls = dict(sorted((ttls or {}).items(), key=lambda kv: -len(kv[0])))
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+
+        self._lock = threading.Lock()
+        self._pending_access = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A lost access time only affects LRU order, so skip the per-commit fsync
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Hash the URL and its parameters in a canonical, order-independent form."""
+        canonical = sorted(
+            (str(k), str(v)) for k, v in (params or {}).items() if k not in IGNORED_PARAMS
+        )
+        payload = json.dumps([url, canonical], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """Return the TTL of the most specific endpoint pattern matching ``url``."""
+        for pattern, ttl in self.ttls.items():
+            if pattern in url:
+                return ttl
+        return self.default_ttl
+
+    def get_json(self, url: str, params: Optional[Dict] = None, timeout: float = 30,
+                 limiter=None) -> Dict:
+        """Return the JSON body for ``url``, from cache when fresh or still valid.
+
+        ``limiter`` (a ``TokenBucket``) is only consulted for requests that actually
+        go to the network, so cache hits are not rate limited.
+        """
+        key = self.make_key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+        now = time.time()
+        if row is not None and now - row[3] < self.ttl_for(url):
+            self._record_access(key, now)
+            self._bump('hits')
+            return json.loads(row[0])
+
+        headers = {}
+        if row is not None:
+            if row[1]:
+                headers['If-None-Match'] = row[1]
+            if row[2]:
+                headers['If-Modified-Since'] = row[2]
+
+        if limiter is not None:
+            limiter.acquire()
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+
+        if row is not None and response.status_code == 304:
+            self._refresh(key, time.time())
+            self._bump('revalidated')
+            return json.loads(row[0])
+
+        response.raise_for_status()
+        self._bump('misses')
+        body = response.content
+        payload = json.loads(body)
+        if is_cacheable(payload):
+            self._store(key, url, body, response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'))
+        else:
+            logger.warning(f"Not caching error response from {url}")
+        return payload
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self.stats[counter] += 1
+
+    def _record_access(self, key: str, now: float) -> None:
+        with self._lock:
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+
+    def _flush_access(self) -> None:
+        """Write buffered access times; the caller holds the lock and commits."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(t, k) for k, t in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def _refresh(self, key: str, now: float) -> None:
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key)
+            )
+            self._conn.commit()
+
+    def _store(self, key: str, url: str, body: bytes, etag: Optional[str],
+               last_modified: Optional[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._flush_access()  # eviction needs current LRU order
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, len(body), etag, last_modified, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats['evictions'] += len(doomed)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
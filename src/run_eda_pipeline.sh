@@ -104,6 +104,20 @@ initialize_results_dir() {
     log "Results directory structure initialized"
 }
 
+# Function to download every manifest sample up front, several runs at once
+prefetch_samples() {
+    log "Prefetching FASTQ files for all manifest samples..."
+    
+    if ! python "${SCRIPT_DIR}/fastq_downloader.py" \
+                --manifest "${RESULTS_DIR}/manifest.csv" \
+                --output-dir "${DATA_DIR}/sra-cache"; then
+        # Samples that failed are retried (and reported) by process_sample.sh
+        log "Some downloads failed during prefetch"
+    fi
+    
+    log "Prefetch complete"
+}
+
 # Function to process a single sample
 process_sample() {
     local accession="$1"
@@ -158,6 +172,9 @@ main() {
     # Initialize results directory
     initialize_results_dir
     
+    # Download all samples in parallel before the per-sample analysis
+    prefetch_samples
+    
     # Process each sample from manifest
     while IFS=, read -r accession biome source size url checksum; do
         if [[ "${accession}" != "accession" ]]; then  # Skip header
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Structured parsing of NCBI esummary payloads for FungiMap.
+Extracts run, experiment and library fields from the ``expxml``/``runs`` XML
+fragments of SRA summaries and the attributes of BioSample summaries.
+"""
+
+from __future__ import annotations
+
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List
+
+from src.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Column types of the records produced by parse_summary
+RUN_COLUMNS = {
+    'run_accession': 'string',
+    'experiment_accession': 'string',
+    'study_accession': 'string',
+    'sample_accession': 'string',
+    'biosample': 'string',
+    'bioproject': 'string',
+    'spots': 'Int64',
+    'bases': 'Int64',
+    'size_MB': 'float64',
+    'platform': 'string',
+    'instrument_model': 'string',
+    'library_strategy': 'string',
+    'library_source': 'string',
+    'library_selection': 'string',
+    'library_layout': 'string',
+    'organism': 'string',
+    'taxid': 'Int64',
+    'title': 'string',
+    'createdate': 'string',
+    'updatedate': 'string',
+}
+
+# BioSample placeholders that mean the value was not recorded
+MISSING_VALUES = {
+    '', 'missing', 'not collected', 'not applicable', 'not provided', 'unknown',
+    'na', 'n/a', 'none', 'null', '-',
+}
+
+# Attributes that describe where a sample came from, most specific first
+HABITAT_ATTRIBUTES = ['isolation_source', 'env_local_scale', 'env_medium', 'env_broad_scale']
+
+LIBRARY_TAGS = {
+    'LIBRARY_STRATEGY': 'library_strategy',
+    'LIBRARY_SOURCE': 'library_source',
+    'LIBRARY_SELECTION': 'library_selection',
+}
+
+
+def _iter_elements(fragment: str) -> Iterator[ET.Element]:
+    """Yield the elements of an XML fragment (several roots allowed) as they close."""
+    parser = ET.XMLPullParser(events=('end',))
+    parser.feed('<root>')
+    parser.feed(fragment)
+    parser.feed('</root>')
+    for _, element in parser.read_events():
+        yield element
+    parser.close()
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_expxml(expxml: str) -> Dict:
+    """Extract experiment, study, sample and library fields from an ``expxml`` fragment."""
+    fields = {}
+    for element in _iter_elements(expxml):
+        tag = element.tag
+        if tag == 'Title':
+            fields['title'] = element.text
+        elif tag == 'Platform':
+            fields['platform'] = (element.text or '').strip() or None
+            fields['instrument_model'] = element.get('instrument_model')
+        elif tag == 'Statistics':
+            fields['_total_bases'] = _to_int(element.get('total_bases'))
+            fields['_total_size'] = _to_int(element.get('total_size'))
+        elif tag == 'Experiment':
+            fields['experiment_accession'] = element.get('acc')
+        elif tag == 'Study':
+            fields['study_accession'] = element.get('acc')
+        elif tag == 'Sample':
+            fields['sample_accession'] = element.get('acc')
+        elif tag == 'Organism':
+            fields['organism'] = element.get('ScientificName')
+            fields['taxid'] = _to_int(element.get('taxid'))
+        elif tag in LIBRARY_TAGS:
+            fields[LIBRARY_TAGS[tag]] = (element.text or '').strip() or None
+        elif tag == 'LIBRARY_LAYOUT':
+            layout = next(iter(element), None)
+            fields['library_layout'] = layout.tag if layout is not None else None
+        elif tag == 'Bioproject':
+            fields['bioproject'] = (element.text or '').strip() or None
+        elif tag == 'Biosample':
+            fields['biosample'] = (element.text or '').strip() or None
+    return fields
+
+
+def parse_runs(runs_xml: str) -> List[Dict]:
+    """Extract accession and spot/base counts of every ``<Run>`` in a ``runs`` fragment."""
+    return [
+        {
+            'run_accession': element.get('acc'),
+            'spots': _to_int(element.get('total_spots')),
+            'bases': _to_int(element.get('total_bases')),
+        }
+        for element in _iter_elements(runs_xml) if element.tag == 'Run'
+    ]
+
+
+def parse_summary(entry: Dict) -> List[Dict]:
+    """Turn one SRA esummary document into one raw record per run.
+
+    The experiment's ``total_size`` is split across its runs by base count. Entries
+    without ``expxml``/``runs`` (already flat summaries) are mapped field by field.
+    """
+    if 'expxml' not in entry and 'runs' not in entry:
+        return [{
+            'run_accession': entry.get('accession', ''),
+            'spots': entry.get('spots', 0),
+            'bases': entry.get('bases', 0),
+            'size_MB': entry.get('size_MB', 0),
+            'sample_attribute': entry.get('attributes', '')
+        }]
+
+    try:
+        experiment = parse_expxml(entry.get('expxml') or '')
+        runs = parse_runs(entry.get('runs') or '')
+    except ET.ParseError as e:
+        logger.warning(f"Skipping malformed SRA summary {entry.get('uid')}: {str(e)}")
+        return []
+
+    total_bases = experiment.pop('_total_bases', None)
+    total_size = experiment.pop('_total_size', None)
+    experiment['createdate'] = entry.get('createdate')
+    experiment['updatedate'] = entry.get('updatedate')
+
+    records = []
+    for run in runs:
+        size_mb = None
+        if total_size is not None:
+            share = (run['bases'] / total_bases
+                     if len(runs) > 1 and run['bases'] and total_bases else 1)
+            size_mb = total_size * share / MB
+        records.append({**experiment, **run, 'size_MB': size_mb, 'sample_attribute': ''})
+    return records
+
+
+def iter_run_records(entries: Iterable[Dict]) -> Iterator[Dict]:
+    """Stream run records from esummary documents."""
+    for entry in entries:
+        yield from parse_summary(entry)
+
+
+def parse_biosample_attributes(sampledata: str) -> Dict[str, str]:
+    """Return BioSample attributes keyed by harmonized name, without missing-value placeholders."""
+    attributes = {}
+    for element in _iter_elements(sampledata or ''):
+        if element.tag != 'Attribute':
+            continue
+        name = element.get('harmonized_name') or element.get('attribute_name') or ''
+        name = name.strip().lower().replace(' ', '_').replace('-', '_')
+        value = (element.text or '').strip()
+        if name and value.lower() not in MISSING_VALUES:
+            attributes.setdefault(name, value)
+    return attributes
+
+
+def apply_biosample_attributes(record: Dict, attributes: Dict[str, str]) -> None:
+    """Merge BioSample attributes into a run record as columns, ``sample_attribute`` and habitat."""
+    for name, value in attributes.items():
+        record.setdefault(name, value)
+    record['sample_attribute'] = ';'.join(f"{name}={value}" for name, value in attributes.items())
+    habitat = next((attributes[name] for name in HABITAT_ATTRIBUTES if name in attributes), None)
+    if habitat:
+        record['habitat'] = habitat
+
+
+def records_to_frame(records: Iterable[Dict]) -> pd.DataFrame:
+    """Build a DataFrame with the typed run columns; other columns keep inferred types."""
+    frame = pd.DataFrame(list(records))
+    for column, dtype in RUN_COLUMNS.items():
+        if column not in frame.columns:
+            continue
+        if dtype in ('Int64', 'float64'):
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(dtype)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
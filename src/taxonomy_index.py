@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+NCBI taxonomy index for FungiMap.
+Builds parent/rank arrays and an Euler-tour interval per taxon from ``nodes.dmp``
+and ``names.dmp`` (as shipped in a Kraken2 database's ``taxonomy/`` directory),
+stored as ``.npy`` files that are memory-mapped on open.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Default index location inside a taxonomy directory
+INDEX_DIR = 'fungimap_index'
+
+NODES_FILE = 'nodes.dmp'
+NAMES_FILE = 'names.dmp'
+DMP_SEPARATOR = '\t|\t'
+
+ROOT_TAXID = 1
+
+# Ranks with a precomputed ancestor per taxon, and their lineage prefixes
+LINEAGE_RANKS = ('superkingdom', 'kingdom', 'phylum', 'class', 'order', 'family', 'genus', 'species')
+LINEAGE_PREFIXES = ('d', 'k', 'p', 'c', 'o', 'f', 'g', 's')
+
+# NCBI renamed superkingdom to domain; both fill the same lineage slot
+RANK_ALIASES = {'domain': 'superkingdom'}
+
+ARRAYS = ('parent', 'rank_code', 'depth', 'tin', 'tout', 'rank_ancestors', 'name_offsets')
+
+
+class TaxonomyIndex:
+    """Taxonomy arrays indexed directly by taxid; taxids absent from the dump have ``tin == -1``.
+
+    ``tin``/``tout`` are the first and last preorder positions of each taxon's
+    subtree, so ``a`` is an ancestor of ``t`` exactly when ``tin[a] <= tin[t] <= tout[a]``.
+    ``rank_code[t]`` indexes ``ranks`` and ``rank_ancestors[r, t]`` is the ancestor
+    of ``t`` at ``LINEAGE_RANKS[r]`` (0 if none), which makes rank roll-ups and
+    lineage strings array lookups. Instances pickle as their directory, so they can
+    be sent to worker processes cheaply.
+    """
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        meta_path = self.index_dir / 'meta.json'
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No taxonomy index in {self.index_dir}")
+        self.meta = json.loads(meta_path.read_text())
+        if self.meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"{self.index_dir}: index version {self.meta.get('version')}, "
+                             f"expected {INDEX_VERSION}; rebuild it")
+        self.ranks = self.meta['ranks']
+        # Plain ndarray views of the mappings: np.memmap's own indexing is slow for scalars
+        for name in ARRAYS:
+            setattr(self, name, np.load(self.index_dir / f"{name}.npy", mmap_mode='r').view(np.ndarray))
+        names_path = self.index_dir / 'names.bin'
+        self.names = (np.memmap(names_path, dtype=np.uint8, mode='r').view(np.ndarray)
+                      if names_path.stat().st_size else np.zeros(0, dtype=np.uint8))
+
+    def __getstate__(self):
+        return {'index_dir': self.index_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state['index_dir'])
+
+    @classmethod
+    def open(cls, index_dir: Path) -> 'TaxonomyIndex':
+        return cls(index_dir)
+
+    @classmethod
+    def build(cls, nodes_path: Path, names_path: Path, index_dir: Path) -> 'TaxonomyIndex':
+        """Build the index from ``nodes.dmp``/``names.dmp`` into ``index_dir`` and open it."""
+        taxids, parents, rank_labels = _read_nodes(nodes_path)
+        size = int(taxids.max()) + 1 if len(taxids) else ROOT_TAXID + 1
+        ranks = sorted(set(rank_labels))
+        rank_codes = {rank: code for code, rank in enumerate(ranks)}
+
+        parent = np.zeros(size, dtype=np.int32)
+        parent[taxids] = parents
+        rank_code = np.full(size, -1, dtype=np.int8 if len(ranks) < 128 else np.int16)
+        rank_code[taxids] = np.fromiter((rank_codes[label] for label in rank_labels),
+                                        dtype=rank_code.dtype, count=len(taxids))
+
+        depth, tin, tout, rank_ancestors = _euler_tour(taxids, parent, rank_code, ranks)
+        unreached = int(np.count_nonzero(tin[taxids] < 0))
+        if unreached:
+            logger.warning(f"{nodes_path}: {unreached} taxa are not connected to the root")
+
+        name_offsets, names = _name_table(names_path, size)
+
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {'parent': parent, 'rank_code': rank_code, 'depth': depth, 'tin': tin, 'tout': tout,
+                  'rank_ancestors': rank_ancestors, 'name_offsets': name_offsets}
+        for name, array in arrays.items():
+            np.save(index_dir / f"{name}.npy", array)
+        (index_dir / 'names.bin').write_bytes(names)
+        (index_dir / 'meta.json').write_text(json.dumps({
+            'version': INDEX_VERSION,
+            'ranks': ranks,
+            'taxa': int(len(taxids)),
+            'sources': {str(path): _source_stamp(path) for path in (nodes_path, names_path)},
+        }, indent=1))
+        logger.info(f"Indexed {len(taxids):,} taxa into {index_dir}")
+        return cls(index_dir)
+
+    @classmethod
+    def from_taxonomy_dir(cls, taxonomy_dir: Path, index_dir: Optional[Path] = None) -> 'TaxonomyIndex':
+        """Open the index of a taxonomy directory or Kraken2 database, building it if missing or stale.
+
+        ``taxonomy_dir`` holds ``nodes.dmp`` and ``names.dmp``, directly or in a
+        ``taxonomy/`` subdirectory. The index defaults to ``<taxonomy>/fungimap_index``.
+        """
+        taxonomy_dir = Path(taxonomy_dir)
+        if not (taxonomy_dir / NODES_FILE).exists() and (taxonomy_dir / 'taxonomy' / NODES_FILE).exists():
+            taxonomy_dir = taxonomy_dir / 'taxonomy'
+        nodes_path, names_path = taxonomy_dir / NODES_FILE, taxonomy_dir / NAMES_FILE
+        index_dir = Path(index_dir) if index_dir is not None else taxonomy_dir / INDEX_DIR
+
+        meta_path = index_dir / 'meta.json'
+        if meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text())
+                if (meta.get('version') == INDEX_VERSION and meta.get('sources') ==
+                        {str(path): _source_stamp(path) for path in (nodes_path, names_path)}):
+                    return cls(index_dir)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Rebuilding unreadable taxonomy index {index_dir}: {str(e)}")
+        return cls.build(nodes_path, names_path, index_dir)
+
+    def _lookup(self, taxids: Iterable[int]) -> np.ndarray:
+        """Row of each taxid, with taxids outside the index mapped to row 0 (never a taxon)."""
+        taxids = _as_array(taxids, np.int64)
+        return np.where((taxids > 0) & (taxids < len(self.parent)), taxids, 0)
+
+    def __contains__(self, taxid: int) -> bool:
+        return 0 < taxid < len(self.tin) and self.tin[taxid] >= 0
+
+    def __len__(self) -> int:
+        return int(self.meta['taxa'])
+
+    def name(self, taxid: int) -> str:
+        if not 0 < taxid < len(self.name_offsets) - 1:
+            return ''
+        start, end = self.name_offsets[taxid:taxid + 2].tolist()
+        return self.names[start:end].tobytes().decode('utf-8')
+
+    def rank(self, taxid: int) -> str:
+        code = int(self.rank_code[taxid]) if taxid in self else -1
+        return self.ranks[code] if code >= 0 else ''
+
+    def parent_of(self, taxid: int) -> int:
+        """Parent taxid; the root is its own parent and unknown taxids have parent 0."""
+        return int(self.parent[taxid]) if taxid in self else 0
+
+    def is_ancestor(self, ancestor: int, taxid: int) -> bool:
+        """Whether ``taxid`` is ``ancestor`` or lies below it."""
+        if ancestor not in self or taxid not in self:
+            return False
+        return bool(self.tin[ancestor] <= self.tin[taxid] <= self.tout[ancestor])
+
+    def descendant_mask(self, taxids: Iterable[int], ancestor: int) -> np.ndarray:
+        """For each taxid, ``is_ancestor(ancestor, taxid)``, in one vectorized pass."""
+        rows = self._lookup(taxids)
+        if ancestor not in self:
+            return np.zeros(len(rows), dtype=bool)
+        tin = self.tin[rows]
+        return (tin >= self.tin[ancestor]) & (tin <= self.tout[ancestor])
+
+    def _rank_row(self, rank: str) -> int:
+        rank = RANK_ALIASES.get(rank, rank)
+        if rank not in LINEAGE_RANKS:
+            raise ValueError(f"Rank '{rank}' has no roll-up (expected one of {', '.join(LINEAGE_RANKS)})")
+        return LINEAGE_RANKS.index(rank)
+
+    def ancestor_at(self, taxid: int, rank: str) -> int:
+        """Ancestor of ``taxid`` at ``rank`` (itself if of that rank); 0 if there is none."""
+        if taxid not in self:
+            return 0
+        return int(self.rank_ancestors[self._rank_row(rank), taxid])
+
+    def ancestors_at(self, taxids: Iterable[int], rank: str) -> np.ndarray:
+        rows = self._lookup(taxids)
+        return np.asarray(self.rank_ancestors[self._rank_row(rank)][rows])
+
+    def lineage(self, taxid: int) -> str:
+        """Lineage over ``LINEAGE_RANKS`` in MetaPhlAn style, e.g. ``d__Eukaryota|k__Fungi|p__Ascomycota``."""
+        if taxid not in self:
+            return ''
+        ancestors = self.rank_ancestors[:, taxid].tolist()
+        return '|'.join(f"{prefix}__{self.name(ancestor)}"
+                        for prefix, ancestor in zip(LINEAGE_PREFIXES, ancestors) if ancestor)
+
+    def rollup(self, taxids: Iterable[int], counts: Iterable[int], rank: str,
+               within: Optional[int] = None) -> Dict[int, int]:
+        """Sum ``counts`` by each taxid's ancestor at ``rank``, optionally only below ``within``.
+
+        Pass per-taxon (direct) counts, e.g. a Kraken2 report's direct read counts;
+        taxa without an ancestor at ``rank`` are left out.
+        """
+        taxids = _as_array(taxids, np.int64)
+        counts = _as_array(counts, np.int64)
+        ancestors = self.ancestors_at(taxids, rank)
+        keep = ancestors > 0
+        if within is not None:
+            keep &= self.descendant_mask(taxids, within)
+        groups, inverse = np.unique(ancestors[keep], return_inverse=True)
+        totals = np.bincount(inverse, weights=counts[keep], minlength=len(groups))
+        return {int(group): int(total) for group, total in zip(groups, totals)}
+
+
+def _as_array(values: Iterable, dtype) -> np.ndarray:
+    return np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=dtype)
+
+
+def _source_stamp(path: Path) -> Optional[Dict]:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_nodes(path: Path):
+    """Taxid, parent and rank columns of ``nodes.dmp``."""
+    taxids, parents, ranks = [], [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.split(DMP_SEPARATOR, 3)
+            if len(fields) < 3:
+                continue
+            taxids.append(fields[0])
+            parents.append(fields[1])
+            ranks.append(fields[2].rstrip('\t|\n'))
+    return (np.array(taxids, dtype=np.int64), np.array(parents, dtype=np.int64), ranks)
+
+
+def _name_table(path: Path, size: int):
+    """Offsets into, and the UTF-8 bytes of, each taxid's scientific name."""
+    names = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if 'scientific name' not in line:
+                continue
+            fields = line.split(DMP_SEPARATOR)
+            if len(fields) >= 4 and fields[3].startswith('scientific name'):
+                names[int(fields[0])] = fields[1].encode('utf-8')
+
+    lengths = np.zeros(size, dtype=np.int64)
+    taxids = np.fromiter((taxid for taxid in names if taxid < size), dtype=np.int64)
+    encoded = [names[taxid] for taxid in sorted(taxids.tolist())]
+    lengths[np.sort(taxids)] = [len(name) for name in encoded]
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, b''.join(encoded)
+
+
+def _euler_tour(taxids: np.ndarray, parent: np.ndarray, rank_code: np.ndarray, ranks):
+    """Depth, preorder interval and lineage-rank ancestors of every taxon, one tree level at a time."""
+    size = len(parent)
+    depth = np.full(size, -1, dtype=np.int16)
+    subtree = np.zeros(size, dtype=np.int64)
+    tin = np.full(size, -1, dtype=np.int32)
+    tout = np.full(size, -1, dtype=np.int32)
+    rank_ancestors = np.zeros((len(LINEAGE_RANKS), size), dtype=np.int32)
+    if ROOT_TAXID >= size or parent[ROOT_TAXID] not in (0, ROOT_TAXID):
+        return depth, tin, tout, rank_ancestors
+
+    # Children grouped by parent (then by taxid) so each level is a set of slices
+    children = taxids[taxids != ROOT_TAXID]
+    children = children[np.lexsort((children, parent[children]))]
+    child_parents = parent[children]
+
+    lineage_codes = [[code for code, name in enumerate(ranks) if RANK_ALIASES.get(name, name) == rank]
+                     for rank in LINEAGE_RANKS]
+
+    def mark_rank_ancestors(level):
+        for row, codes in enumerate(lineage_codes):
+            if codes:
+                own = level[np.isin(rank_code[level], codes)]
+                rank_ancestors[row, own] = own
+
+    levels = [np.array([ROOT_TAXID], dtype=np.int64)]
+    depth[ROOT_TAXID] = 0
+    mark_rank_ancestors(levels[0])
+    while True:
+        level = levels[-1]
+        starts = np.searchsorted(child_parents, level, side='left')
+        counts = np.searchsorted(child_parents, level, side='right') - starts
+        total = int(counts.sum())
+        if not total:
+            break
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        nxt = children[np.arange(total) + offsets]
+        nxt = nxt[depth[nxt] < 0]  # guards against cycles in a malformed dump
+        if not len(nxt):
+            break
+        depth[nxt] = len(levels)
+        rank_ancestors[:, nxt] = rank_ancestors[:, parent[nxt]]
+        mark_rank_ancestors(nxt)
+        levels.append(nxt)
+
+    # Subtree sizes bottom-up, then preorder starts top-down
+    subtree[np.concatenate(levels)] = 1
+    for level in reversed(levels[1:]):
+        np.add.at(subtree, parent[level], subtree[level])
+
+    tin[ROOT_TAXID] = 0
+    for level in levels[1:]:
+        sizes = subtree[level]
+        ends = np.cumsum(sizes)
+        first = np.flatnonzero(np.r_[True, parent[level][1:] != parent[level][:-1]])
+        group_start = np.repeat((ends - sizes)[first], np.diff(np.r_[first, len(level)]))
+        tin[level] = tin[parent[level]] + 1 + (ends - sizes - group_start)
+    reached = tin >= 0
+    tout[reached] = tin[reached] + subtree[reached] - 1
+    return depth, tin, tout, rank_ancestors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the FungiMap taxonomy index")
+    parser.add_argument('taxonomy_dir', type=Path,
+                        help='Directory with nodes.dmp/names.dmp, or a Kraken2 database')
+    parser.add_argument('-o', '--index-dir', type=Path, help=f"Index directory (default: <taxonomy>/{INDEX_DIR})")
+    parser.add_argument('--lineage', type=int, nargs='*', default=[], metavar='TAXID',
+                        help='Print the lineage of these taxids')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    index = TaxonomyIndex.from_taxonomy_dir(args.taxonomy_dir, args.index_dir)
+    for taxid in args.lineage:
+        if taxid not in index:
+            logger.error(f"Taxid {taxid} is not in the taxonomy")
+            sys.exit(1)
+        print(f"{taxid}\t{index.rank(taxid)}\t{index.lineage(taxid)}")
+
+
+if __name__ == '__main__':
+    main()
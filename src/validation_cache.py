@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of sample validation results for FungiMap.
+Stores results in SQLite under a hash of everything they were computed from:
+the sample's input files and the validation settings that applied to them.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.checksums import BUFFER_SIZE, hash_file
+
+logger = logging.getLogger(__name__)
+
+# Bump when the validation logic changes so older results stop matching
+CACHE_VERSION = 1
+
+# Results kept per accession; older keys (earlier inputs or settings) are dropped
+MAX_RESULTS_PER_SAMPLE = 4
+
+
+class ValidationCache:
+    """SQLite store of validation results keyed by a hash of their inputs.
+
+    Nothing is invalidated explicitly: a changed input file or setting produces a
+    different key, so the old entry is simply no longer found. File digests are
+    memoised by path, size and mtime, so fingerprinting an unchanged input costs
+    one stat rather than a read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A lost result is only recomputed, so skip the per-commit fsync
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                accession TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_accession ON results (accession, created_at)"
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS digests (
+                path TEXT PRIMARY KEY,
+                stamp TEXT NOT NULL,
+                digest TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(parts: Dict) -> str:
+        """Hash the JSON-serialisable description of a result's inputs."""
+        payload = json.dumps([CACHE_VERSION, parts], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def file_digests(self, paths: List[Path]) -> List[Optional[str]]:
+        """SHA-256 of each file's contents (None if it does not exist), memoised by size and mtime."""
+        stamps = []
+        for path in paths:
+            try:
+                stat = Path(path).stat()
+                stamps.append((stat.st_size, f"{stat.st_size}:{stat.st_mtime_ns}"))
+            except FileNotFoundError:
+                stamps.append(None)
+        with self._lock:
+            known = {path: (stamp, digest) for path, stamp, digest in self._conn.execute(
+                f"SELECT path, stamp, digest FROM digests WHERE path IN ({', '.join('?' * len(paths))})",
+                [str(path) for path in paths]
+            )}
+
+        digests, computed = [], []
+        for path, stamp in zip(paths, stamps):
+            if stamp is None:
+                digests.append(None)
+                continue
+            size, stamp = stamp
+            stored_stamp, digest = known.get(str(path), (None, None))
+            if stored_stamp != stamp:
+                # Size the read buffer to the file: reports are small, and hash_file allocates it per call
+                digest = hash_file(path, buffer_size=min(BUFFER_SIZE, size + 1))['sha256']
+                computed.append((str(path), stamp, digest))
+            digests.append(digest)
+
+        if computed:
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?)", computed)
+                self._conn.commit()
+        return digests
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The stored result for ``key``, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            self.stats['hits' if row is not None else 'misses'] += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, accession: str, result: Dict) -> None:
+        """Store a result, keeping the ``MAX_RESULTS_PER_SAMPLE`` newest of its accession."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                               (key, accession, json.dumps(result), time.time()))
+            self._conn.execute(
+                """
+                DELETE FROM results WHERE accession = ? AND key NOT IN (
+                    SELECT key FROM results WHERE accession = ? ORDER BY created_at DESC LIMIT ?
+                )
+                """,
+                (accession, accession, MAX_RESULTS_PER_SAMPLE)
+            )
+            self._conn.commit()
+            self.stats['stored'] += 1
+
+    def summary(self) -> str:
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / lookups * 100 if lookups else 0.0
+        return (f"{self.stats['hits']} hits, {self.stats['misses']} misses ({rate:.1f}% hit rate), "
+                f"{self.stats['stored']} stored")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
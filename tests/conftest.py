@@ -98,4 +98,33 @@ def validator(test_config, test_data_dir, tmp_path):
     criteria = ValidationCriteria(
         min_metadata_completeness=test_config["validation"]["criteria"]["min_metadata_completeness"]
     )
-    return SampleValidator(config_path, criteria)
\ No newline at end of file
+    return SampleValidator(config_path, criteria)
+
+# Writers for validator tests that need their own storage layout
+@pytest.fixture
+def write_metadata(test_config):
+    """Write ``<storage>/<accession>/metadata.json`` with every required field valid."""
+    fields = test_config["validation"]["required_metadata_fields"]
+
+    def write(storage, accession, **overrides):
+        path = storage / accession / "metadata.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(dict({field: "value" for field in fields}, **overrides)))
+        return path
+
+    return write
+
+@pytest.fixture
+def write_config(test_config, tmp_path):
+    """Write test_config with the given storage paths, criteria overrides and extra sections."""
+    def write(criteria=None, sections=None, **storage):
+        config = dict(test_config, storage={key: str(value) for key, value in storage.items()},
+                      **(sections or {}))
+        if criteria:
+            config["validation"] = dict(config["validation"],
+                                        criteria=dict(config["validation"]["criteria"], **criteria))
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps(config))
+        return config_path
+
+    return write
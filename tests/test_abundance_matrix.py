@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.abundance_matrix import AbundanceMatrix, sample_id_from_path
+
+BRACKEN_HEADER = ("name\ttaxonomy_id\ttaxonomy_lvl\tkraken_assigned_reads\tadded_reads\t"
+                  "new_est_reads\tfraction_total_reads\n")
+
+
+def write_report(path, fungal_reads, human_reads):
+    path.write_text(
+        f" 10.00\t100\t100\tU\t0\tunclassified\n"
+        f" 90.00\t{fungal_reads + human_reads}\t0\tR\t1\troot\n"
+        f" 50.00\t{fungal_reads}\t0\tK\t4751\t  Fungi\n"
+        f" 50.00\t{fungal_reads}\t{fungal_reads}\tS\t5062\t    Aspergillus oryzae\n"
+        f" 10.00\t{human_reads}\t{human_reads}\tS\t9606\t  Homo sapiens\n"
+    )
+    return path
+
+
+def test_append_keeps_vocabulary_and_sums_repeats():
+    abundance = AbundanceMatrix()
+    abundance.append('S1', [5062, 9606, 0], [40, 10, 0], names=['A. oryzae', 'H. sapiens', 'unclassified'])
+    abundance.append('S2', [5059, 5062, 5059], [3, 7, 2])
+
+    assert abundance.shape == (2, 4)
+    assert abundance.taxids == [5062, 9606, 0, 5059]
+    assert abundance.names[:2] == ['A. oryzae', 'H. sapiens']
+    assert abundance.matrix.toarray().tolist() == [[40, 10, 0, 0], [7, 0, 0, 5]]
+    assert abundance.matrix.nnz == 4
+    with pytest.raises(ValueError):
+        abundance.append('S1', [5062], [1])
+
+
+def test_update_reads_kraken_and_bracken(tmp_path):
+    write_report(tmp_path / 'SRR1_report.txt', 400, 100)
+    (tmp_path / 'SRR2_bracken.txt').write_text(
+        BRACKEN_HEADER
+        + "Aspergillus oryzae\t5062\tS\t300\t20\t320\t0.8\n"
+        + "Aspergillus flavus\t5059\tS\t70\t10\t80\t0.2\n"
+    )
+
+    abundance = AbundanceMatrix()
+    status = abundance.update([tmp_path / 'SRR1_report.txt', tmp_path / 'SRR2_bracken.txt',
+                               tmp_path / 'SRR3_report.txt'], max_workers=1)
+
+    assert status == {'SRR1': 'added', 'SRR2': 'added', 'SRR3': 'failed'}
+    assert abundance.samples == ['SRR1', 'SRR2']
+    frame = abundance.to_dataframe()
+    # Kraken2 rows hold direct counts, so they sum to the sample's reads
+    assert frame.loc['SRR1'].sum() == 600
+    assert frame.loc['SRR1', 5062] == 400
+    assert frame.loc['SRR2', 5062] == 320
+    assert frame.loc['SRR2', 5059] == 80
+    relative = abundance.to_dataframe(relative=True, min_samples=2)
+    assert list(relative.columns) == [5062]
+    assert relative.loc['SRR2', 5062] == pytest.approx(0.8)
+
+
+def test_update_prefers_bracken_for_duplicate_samples(tmp_path):
+    report = write_report(tmp_path / 'SRR1_report.txt', 400, 100)
+    bracken = tmp_path / 'SRR1_bracken.txt'
+    bracken.write_text(BRACKEN_HEADER + "Aspergillus oryzae\t5062\tS\t300\t20\t320\t1.0\n")
+
+    abundance = AbundanceMatrix()
+    status = abundance.update([bracken, report, report], max_workers=1)
+
+    assert status == {str(report): 'skipped', 'SRR1': 'added'}
+    assert abundance.samples == ['SRR1']
+    assert abundance.to_dataframe().loc['SRR1'].to_dict() == {5062: 320}
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_save_load_and_incremental_update(tmp_path, max_workers):
+    reports = [write_report(tmp_path / f"SRR{i}_report.txt", 100 * i, i) for i in range(1, 4)]
+    path = tmp_path / 'abundance.npz'
+
+    first = AbundanceMatrix.open(path)
+    first.update(reports[:2], max_workers=max_workers)
+    first.save(path)
+
+    second = AbundanceMatrix.load(path)
+    assert second.samples == first.samples
+    assert second.taxids == first.taxids
+    assert (second.matrix != first.matrix).nnz == 0
+
+    write_report(reports[0], 999, 1)
+    os.utime(reports[0], ns=(1, 1))
+    status = second.update(reports, max_workers=max_workers)
+    assert status == {'SRR1': 'updated', 'SRR2': 'unchanged', 'SRR3': 'added'}
+    assert second.samples == ['SRR2', 'SRR1', 'SRR3']
+    assert second.taxids == first.taxids
+    assert second.to_dataframe().loc['SRR1', 5062] == 999
+    assert np.asarray(second.matrix.sum(axis=1)).ravel().tolist() == [302, 1100, 403]
+
+
+def test_sample_id_from_path(tmp_path):
+    assert sample_id_from_path(tmp_path / 'SRR1_report.txt') == 'SRR1'
+    assert sample_id_from_path(tmp_path / 'SRR1_bracken.txt') == 'SRR1'
+    assert sample_id_from_path(tmp_path / 'SRR1.kreport') == 'SRR1'
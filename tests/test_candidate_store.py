@@ -0,0 +1,30 @@
+from src.candidate_store import CandidateStore
+
+def _candidate(accession, read_pairs=2000000, passes=True):
+    return {'accession': accession, 'habitat': 'soil', 'raw_read_pairs': read_pairs,
+            'estimated_size_gb': 1.0, 'metadata_completeness': 100.0,
+            'metadata_url': f"https://www.ncbi.nlm.nih.gov/sra/{accession}",
+            'passes_criteria': passes}
+
+def test_upsert_dedupes_by_accession(tmp_path):
+    """Re-harvested accessions are updated in place and not counted as added."""
+    store = CandidateStore(tmp_path / 'store.sqlite')
+    assert store.upsert([_candidate('SRR1'), _candidate('SRR2')]) == 2
+    assert store.upsert([_candidate('SRR2', read_pairs=10, passes=False),
+                         _candidate('SRR3', passes=None)], batch_size=1) == 1
+
+    rows = {c['accession']: c for c in store.iter_candidates()}
+    assert len(store) == 3
+    assert rows['SRR2']['raw_read_pairs'] == 10
+    assert rows['SRR2']['passes_criteria'] is False
+    assert rows['SRR3']['passes_criteria'] is None
+
+def test_watermarks_persist_per_query(tmp_path):
+    """High-water marks are kept per database and query across reopenings."""
+    store = CandidateStore(tmp_path / 'store.sqlite')
+    store.set_watermark('SRA', 'fungi', '2026/01/01')
+    store.close()
+
+    store = CandidateStore(tmp_path / 'store.sqlite')
+    assert store.get_watermark('SRA', 'fungi') == '2026/01/01'
+    assert store.get_watermark('SRA', 'mycobiome') is None
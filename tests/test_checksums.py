@@ -0,0 +1,42 @@
+import hashlib
+import os
+from src.checksums import hash_file, parse_checksum_file, verify_checksum_file, verify_sidecars, write_sidecars
+
+def test_hash_file_matches_hashlib(tmp_path):
+    """Buffered hashing gives the same digests as hashing the whole file at once."""
+    data = os.urandom(100_001)
+    path = tmp_path / 'reads.fastq.gz'
+    path.write_bytes(data)
+
+    digests = hash_file(path, ['md5', 'sha256'], buffer_size=4096)
+
+    assert digests == {'md5': hashlib.md5(data).hexdigest(),
+                       'sha256': hashlib.sha256(data).hexdigest()}
+
+def test_verify_checksum_file_reports_each_file(tmp_path):
+    """Headers are skipped and mismatched or missing files are reported in order."""
+    (tmp_path / 'a.txt').write_bytes(b'a')
+    (tmp_path / 'b.txt').write_bytes(b'b')
+    checksum_file = tmp_path / 'checksums.sha256'
+    checksum_file.write_text(
+        "=== Final File Checksums ===\n"
+        f"{hashlib.sha256(b'a').hexdigest()}  ./a.txt\n"
+        f"{hashlib.sha256(b'x').hexdigest()}  b.txt\n"
+        f"{hashlib.md5(b'c').hexdigest()} *c.txt\n"
+    )
+
+    results = verify_checksum_file(checksum_file, max_workers=2)
+
+    assert [e[0] for e in parse_checksum_file(checksum_file)] == ['sha256', 'sha256', 'md5']
+    assert [r['status'] for r in results] == ['ok', 'mismatch', 'missing']
+
+def test_verify_sidecars(tmp_path):
+    """Download sidecars are found recursively and checked against their files."""
+    path = tmp_path / 'run' / 'SRR1.fastq.gz'
+    path.parent.mkdir()
+    path.write_bytes(b'reads')
+    write_sidecars(path, hash_file(path, ['md5', 'sha256']))
+
+    assert [r['status'] for r in verify_sidecars(tmp_path)] == ['ok', 'ok']
+    path.write_bytes(b'truncated')
+    assert [r['status'] for r in verify_sidecars(tmp_path)] == ['mismatch', 'mismatch']
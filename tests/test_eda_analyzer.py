@@ -1,3 +1,5 @@
+import shutil
+import zipfile
 import pytest
 import pandas as pd
 import numpy as np
@@ -122,4 +124,178 @@ def test_generate_summary_report(base_dir):
     assert 'avg_metadata_completeness' in report
     assert 'avg_fungal_content' in report
     assert report['total_samples'] == 2
-    assert report['avg_metadata_completeness'] > 80.0
\ No newline at end of file
+    assert report['avg_metadata_completeness'] > 80.0
+
+def test_parse_kraken_report(base_dir):
+    """Kraken2 summaries use clade counts for root, Fungi and Homo sapiens."""
+    report_path = base_dir / 'results' / 'eda' / 'kraken2' / 'SRR1_report.txt'
+    report_path.write_text(
+        " 20.00\t200\t200\tU\t0\tunclassified\n"
+        " 80.00\t800\t0\tR\t1\troot\n"
+        " 50.00\t500\t0\tK\t4751\t  Fungi\n"
+        " 50.00\t500\t500\tS\t5062\t    Aspergillus oryzae\n"
+        " 10.00\t100\t100\tS\t9606\t  Homo sapiens\n"
+    )
+    
+    analyzer = EDAAnalyzer(base_dir)
+    stats = analyzer.parse_kraken_report(report_path)
+    
+    assert stats['total_reads'] == 1000
+    assert stats['classified_percent'] == pytest.approx(80.0)
+    assert stats['fungal_percent'] == pytest.approx(50.0)
+    assert stats['human_reads'] == 100
+    assert [s['name'] for s in stats['top_species']] == ['Aspergillus oryzae', 'Homo sapiens']
+
+def test_parse_kraken_report_with_taxonomy(base_dir):
+    """A taxonomy adds species lineages and rolls fungal reads up to phyla, whatever the report nesting."""
+    report_path = base_dir / 'results' / 'eda' / 'kraken2' / 'SRR1_report.txt'
+    report_path.write_text(
+        " 20.00\t200\t200\tU\t0\tunclassified\n"
+        " 80.00\t800\t0\tR\t1\troot\n"
+        " 60.00\t600\t100\tK\t4751\t  Fungi\n"
+        " 40.00\t400\t400\tS\t5062\t    Aspergillus oryzae\n"
+        " 10.00\t100\t100\tS\t5204\t    Basidiomycota\n"
+        " 10.00\t100\t100\tS\t9606\t  Homo sapiens\n"
+    )
+    
+    taxonomy_dir = base_dir / 'taxonomy'
+    shutil.copytree(Path(__file__).parent / 'data' / 'taxonomy', taxonomy_dir)
+    analyzer = EDAAnalyzer(base_dir, taxonomy_dir=taxonomy_dir)
+    stats = analyzer.parse_kraken_report(report_path)
+    
+    assert stats['fungal_phyla'] == {'Ascomycota': 400, 'Basidiomycota': 100}
+    lineages = {s['taxid']: s['lineage'] for s in stats['top_species']}
+    assert lineages[5062].startswith('d__Eukaryota|k__Fungi|p__Ascomycota|')
+    assert lineages[9606].endswith('g__Homo|s__Homo sapiens')
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_generate_read_stats(base_dir, max_workers):
+    """Samples come back in sample order and a broken sample does not stop the batch."""
+    eda_dir = base_dir / 'results' / 'eda'
+    for sample_id in ['SRR3', 'SRR1', 'SRR2']:
+        (eda_dir / f"{sample_id}.fastq.gz").touch()
+        if sample_id == 'SRR2':
+            continue
+        (eda_dir / 'kraken2' / f"{sample_id}_report.txt").write_text(
+            " 10.00\t100\t100\tU\t0\tunclassified\n"
+            " 90.00\t900\t0\tR\t1\troot\n"
+            " 30.00\t300\t300\tK\t4751\t  Fungi\n"
+        )
+        fastqc_data = (
+            ">>Basic Statistics\tpass\n"
+            "#Measure\tValue\n"
+            "Total Sequences\t1000\n"
+            "Sequence length\t150\n"
+            "%GC\t48\n"
+            ">>END_MODULE\n"
+        )
+        if sample_id == 'SRR3':
+            # FastQC's own output: read from the zip without extracting
+            with zipfile.ZipFile(eda_dir / 'fastqc' / f"{sample_id}_fastqc.zip", 'w') as zf:
+                zf.writestr(f"{sample_id}_fastqc/fastqc_data.txt", fastqc_data)
+        else:
+            fastqc_dir = eda_dir / 'fastqc' / f"{sample_id}_fastqc"
+            fastqc_dir.mkdir()
+            (fastqc_dir / 'fastqc_data.txt').write_text(fastqc_data)
+    
+    analyzer = EDAAnalyzer(base_dir, max_workers=max_workers)
+    stats = analyzer.generate_read_stats()
+    
+    assert list(stats['sample_id']) == ['SRR1', 'SRR3']
+    assert list(stats['fungal_percent']) == pytest.approx([30.0, 30.0])
+    assert list(analyzer.failed_samples) == ['SRR2']
+
+def test_generate_read_stats_reuses_cache(base_dir, monkeypatch):
+    """A re-run only parses samples whose inputs are new or changed."""
+    eda_dir = base_dir / 'results' / 'eda'
+    
+    def write_sample(sample_id, fungal_reads):
+        (eda_dir / f"{sample_id}.fastq.gz").touch()
+        (eda_dir / 'kraken2' / f"{sample_id}_report.txt").write_text(
+            f"  0.00\t0\t0\tU\t0\tunclassified\n"
+            f"100.00\t1000\t0\tR\t1\troot\n"
+            f"  1.00\t{fungal_reads}\t{fungal_reads}\tK\t4751\t  Fungi\n"
+        )
+        fastqc_dir = eda_dir / 'fastqc' / f"{sample_id}_fastqc"
+        fastqc_dir.mkdir(exist_ok=True)
+        (fastqc_dir / 'fastqc_data.txt').write_text(
+            ">>Basic Statistics\tpass\n#Measure\tValue\nSequence length\t150\n%GC\t48\n>>END_MODULE\n"
+        )
+    
+    for sample_id in ['SRR1', 'SRR2']:
+        write_sample(sample_id, 100)
+    first = EDAAnalyzer(base_dir, max_workers=1).generate_read_stats()
+    
+    parsed = []
+    original = EDAAnalyzer.sample_stats
+    monkeypatch.setattr(EDAAnalyzer, 'sample_stats',
+                        lambda self, sample_id: parsed.append(sample_id) or original(self, sample_id))
+    
+    write_sample('SRR2', 300)
+    write_sample('SRR3', 200)
+    second = EDAAnalyzer(base_dir, max_workers=1).generate_read_stats()
+    
+    assert parsed == ['SRR2', 'SRR3']
+    assert list(first.columns) == list(second.columns)
+    assert list(second['sample_id']) == ['SRR1', 'SRR2', 'SRR3']
+    assert list(second['fungal_percent']) == pytest.approx([10.0, 30.0, 20.0])
+    
+    # Same content with a new mtime is confirmed by hash, not re-parsed
+    report = eda_dir / 'kraken2' / 'SRR1_report.txt'
+    report.write_text(report.read_text())
+    parsed.clear()
+    EDAAnalyzer(base_dir, max_workers=1).generate_read_stats()
+    assert parsed == []
+
+def test_create_qc_summary(base_dir):
+    """Every failing threshold adds a note, in rule order; extra thresholds apply by column name."""
+    stats = pd.DataFrame({
+        'sample_id': ['SRR1', 'SRR2', 'SRR3'],
+        'total_reads': [10_000_000, 1_000_000, 8_000_000],
+        'fungal_percent': [2.0, 0.1, 3.0],
+        'human_percent': [0.5, 12.25, 0.1],
+        'gc_percent': [48.0, 50.0, 71.0],
+        'avg_length': ['150', '150', '100']
+    })
+    
+    analyzer = EDAAnalyzer(base_dir, thresholds={'max_gc_percent': 65})
+    summary = analyzer.create_qc_summary(stats)
+    
+    assert list(summary.columns) == ['sample_id', 'qc_status', 'notes', 'total_reads',
+                                     'fungal_percent', 'human_percent', 'gc_percent', 'avg_length']
+    assert list(summary['qc_status']) == ['PASS', 'EXCLUDE', 'EXCLUDE']
+    assert summary['notes'][0] == 'Passed all criteria'
+    assert summary['notes'][1] == ('Insufficient reads (1,000,000); Low fungal content (0.10%); '
+                                   'High human contamination (12.25%)')
+    assert summary['notes'][2] == 'gc_percent above 65 (71.0)'
+    assert summary['total_reads'].dtype == np.int64
+
+def test_create_sample_plots(base_dir):
+    """Per-sample panels render from the FastQC zip and are skipped while it is unchanged."""
+    data_file = Path(__file__).parent / 'data' / 'fastqc_data.txt'
+    with zipfile.ZipFile(base_dir / 'results' / 'eda' / 'fastqc' / 'SRR1_fastqc.zip', 'w') as zf:
+        zf.write(data_file, 'SRR1_fastqc/fastqc_data.txt')
+    
+    analyzer = EDAAnalyzer(base_dir, max_workers=1)
+    
+    assert analyzer.create_sample_plots(['SRR1', 'SRR2']) == {'SRR1_qc.png': 'rendered'}
+    assert (base_dir / 'results' / 'eda' / 'plots' / 'samples' / 'SRR1_qc.png').exists()
+    assert analyzer.create_sample_plots(['SRR1']) == {'SRR1_qc.png': 'skipped'}
+
+def test_update_abundance_matrix(base_dir):
+    """Kraken2 direct counts accumulate in abundance_matrix.npz across runs."""
+    kraken_dir = base_dir / 'results' / 'eda' / 'kraken2'
+    for sample_id, reads in [('SRR1', 300), ('SRR2', 50)]:
+        (kraken_dir / f"{sample_id}_report.txt").write_text(
+            " 10.00\t100\t100\tU\t0\tunclassified\n"
+            f" 90.00\t{reads}\t0\tR\t1\troot\n"
+            f" 90.00\t{reads}\t{reads}\tK\t4751\t  Fungi\n"
+        )
+    
+    analyzer = EDAAnalyzer(base_dir, max_workers=1)
+    analyzer.update_abundance_matrix(['SRR1', 'SRR3'])
+    abundance = analyzer.update_abundance_matrix(['SRR1', 'SRR2'])
+    
+    assert (base_dir / 'results' / 'eda' / 'abundance_matrix.npz').exists()
+    assert abundance.samples == ['SRR1', 'SRR2']
+    assert abundance.to_dataframe()[4751].tolist() == [300, 50]
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from src.eda_store import read_table, table_path, write_table
+
+
+@pytest.fixture
+def qc_summary():
+    return pd.DataFrame({
+        'sample_id': ['SRR3', 'SRR1', 'SRR2', 'SRR4'],
+        'qc_status': ['PASS', 'EXCLUDE', 'PASS', 'EXCLUDE'],
+        'notes': ['Passed all criteria', 'Low fungal content (0.10%)',
+                  'Passed all criteria', 'Insufficient reads (10)'],
+        'total_reads': [9_000_000, 8_000_000, 7_000_000, 10],
+        'fungal_percent': [12.5, 0.1, 3.0, 1.0],
+    })
+
+
+def test_round_trip_partitions_by_status(tmp_path, qc_summary):
+    path = write_table(qc_summary, tmp_path, 'qc_summary')
+
+    assert sorted(p.name for p in path.iterdir()) == ['qc_status=EXCLUDE', 'qc_status=PASS']
+    table = read_table(tmp_path, 'qc_summary').sort_values('sample_id', ignore_index=True)
+    assert table['sample_id'].tolist() == ['SRR1', 'SRR2', 'SRR3', 'SRR4']
+    assert table['qc_status'].tolist() == ['EXCLUDE', 'PASS', 'PASS', 'EXCLUDE']
+    assert table['total_reads'].tolist() == [8_000_000, 7_000_000, 9_000_000, 10]
+    # Columns of the schema the frame did not have come back as nulls
+    assert table['human_percent'].isna().all()
+
+
+def test_projection_and_filters(tmp_path, qc_summary):
+    write_table(qc_summary, tmp_path, 'qc_summary')
+
+    passing = read_table(tmp_path, 'qc_summary', columns=['sample_id', 'fungal_percent'],
+                         filters=[('qc_status', '==', 'PASS')])
+    assert list(passing.columns) == ['sample_id', 'fungal_percent']
+    assert passing.sort_values('sample_id')['fungal_percent'].tolist() == [3.0, 12.5]
+
+    high = read_table(tmp_path, 'qc_summary', columns=['sample_id'],
+                      filters=[('fungal_percent', '>', 2.0), ('total_reads', '>=', 8_000_000)])
+    assert high['sample_id'].tolist() == ['SRR3']
+
+
+def test_write_replaces_table_and_keeps_schema(tmp_path, qc_summary, caplog):
+    write_table(qc_summary, tmp_path, 'qc_summary')
+    write_table(qc_summary.head(1).assign(extra=1), tmp_path, 'qc_summary')
+
+    assert read_table(tmp_path, 'qc_summary')['sample_id'].tolist() == ['SRR3']
+    assert 'extra' in caplog.text
+    assert not any(p.name.startswith('.') for p in tmp_path.iterdir())
+
+    write_table(qc_summary.iloc[:0], tmp_path, 'qc_summary')
+    empty = read_table(tmp_path, 'qc_summary', columns=['sample_id', 'total_reads'])
+    assert empty.empty
+    assert list(empty.columns) == ['sample_id', 'total_reads']
+
+
+def test_unknown_or_missing_table(tmp_path):
+    with pytest.raises(KeyError):
+        table_path(tmp_path, 'no_such_table')
+    with pytest.raises(FileNotFoundError):
+        read_table(tmp_path, 'validation')
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from src.fastq_downloader import FastqDownloader
+
+FILES = {
+    'SRR1_1.fastq.gz': os.urandom(300_000),
+    'SRR1_2.fastq.gz': os.urandom(250_000),
+    'SRR2.fastq.gz': os.urandom(40_000),
+}
+MD5 = {name: hashlib.md5(body).hexdigest() for name, body in FILES.items()}
+
+@pytest.fixture
+def ena(request):
+    """Local ENA stand-in serving the portal search and FASTQ files over HTTP."""
+    ranges = getattr(request, 'param', True)
+    corrupt = getattr(request, 'param', None) == 'corrupt'
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _body(self):
+            return FILES[self.path.rsplit('/', 1)[-1]]
+
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+            host = f"127.0.0.1:{self.server.server_address[1]}/vol1"
+            rows = [{'run_accession': 'SRR1', 'fastq_ftp': f"{host}/SRR1_1.fastq.gz;{host}/SRR1_2.fastq.gz",
+                     'fastq_bytes': '300000;250000',
+                     'fastq_md5': f"{MD5['SRR1_1.fastq.gz']};{MD5['SRR1_2.fastq.gz']}"},
+                    {'run_accession': 'SRR2', 'fastq_ftp': f"{host}/SRR2.fastq.gz",
+                     'fastq_bytes': '40000', 'fastq_md5': 'bad' if corrupt else MD5['SRR2.fastq.gz']}]
+            body = json.dumps([r for r in rows if r['run_accession'] in form['query'][0]]).encode()
+            self._send(200, body)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(self._body())))
+            if ranges:
+                self.send_header('Accept-Ranges', 'bytes')
+            self.end_headers()
+
+        def do_GET(self):
+            body = self._body()
+            requests_seen.append((self.path, self.headers.get('Range')))
+            if ranges and self.headers.get('Range'):
+                start, end = self.headers['Range'].split('=')[1].split('-')
+                end = int(end) if end else len(body) - 1
+                self._send(206, body[int(start):end + 1])
+            else:
+                self._send(200, body)
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search", requests_seen
+    server.shutdown()
+
+def _downloader(tmp_path, ena_url, **kwargs):
+    return FastqDownloader(tmp_path / 'cache', ena_url=ena_url, scheme='http',
+                           part_size=64_000, chunk_size=16_000, retries=0, **kwargs)
+
+def test_download_runs_in_parallel_ranges(tmp_path, ena):
+    """Runs resolve in one ENA call and large files arrive intact from byte ranges."""
+    ena_url, seen = ena
+    with _downloader(tmp_path, ena_url) as downloader:
+        results = downloader.download_runs(['SRR1', 'SRR2', 'SRR404'])
+
+    assert [(r['accession'], r['status']) for r in results] == [
+        ('SRR1', 'downloaded'), ('SRR1', 'downloaded'), ('SRR2', 'downloaded'), ('SRR404', 'failed')]
+    for name, body in FILES.items():
+        assert (tmp_path / 'cache' / name).read_bytes() == body
+    assert [r.get('md5') for r in results[:3]] == list(MD5.values())
+    assert results[0]['sha256'] == hashlib.sha256(FILES['SRR1_1.fastq.gz']).hexdigest()
+    assert sum(1 for path, _ in seen if path.endswith('SRR1_1.fastq.gz')) == 5
+    assert not list((tmp_path / 'cache').glob('*.part*'))
+
+def test_resume_fetches_only_missing_parts(tmp_path, ena):
+    """A restarted download keeps finished parts and requests only the rest."""
+    ena_url, seen = ena
+    body = FILES['SRR1_1.fastq.gz']
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+    (cache / 'SRR1_1.fastq.gz.part').write_bytes(body[:128_000] + bytes(len(body) - 128_000))
+    (cache / 'SRR1_1.fastq.gz.part.json').write_text(json.dumps({
+        'url': ena_url.replace('/search', '/vol1/SRR1_1.fastq.gz'),
+        'size': len(body), 'part_size': 64_000, 'done': [0, 1]}))
+
+    with _downloader(tmp_path, ena_url) as downloader:
+        result = downloader.download_file(ena_url.replace('/search', '/vol1/SRR1_1.fastq.gz'),
+                                          cache / 'SRR1_1.fastq.gz')
+
+    assert result['status'] == 'downloaded'
+    assert result['md5'] == MD5['SRR1_1.fastq.gz']
+    assert (cache / 'SRR1_1.fastq.gz').read_bytes() == body
+    assert sorted(r for _, r in seen) == ['bytes=128000-191999', 'bytes=192000-255999',
+                                          'bytes=256000-299999']
+
+@pytest.mark.parametrize('ena', [False], indirect=True)
+def test_stream_restarts_when_server_ignores_ranges(tmp_path, ena):
+    """Without range support a stale partial file is replaced, not appended to."""
+    ena_url, _ = ena
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+    (cache / 'SRR2.fastq.gz.part').write_bytes(b'stale')
+
+    with _downloader(tmp_path, ena_url) as downloader:
+        downloader.download_file(ena_url.replace('/search', '/vol1/SRR2.fastq.gz'),
+                                 cache / 'SRR2.fastq.gz')
+
+    assert (cache / 'SRR2.fastq.gz').read_bytes() == FILES['SRR2.fastq.gz']
+
+@pytest.mark.parametrize('ena', ['corrupt'], indirect=True)
+def test_md5_mismatch_discards_download(tmp_path, ena):
+    """A file whose MD5 disagrees with ENA fails and leaves nothing behind."""
+    ena_url, _ = ena
+    with _downloader(tmp_path, ena_url) as downloader:
+        results = downloader.download_runs(['SRR2'])
+        rerun = downloader.download_runs(['SRR1'])
+
+    assert results[0]['status'] == 'failed'
+    assert 'MD5 mismatch' in results[0]['error']
+    assert not list((tmp_path / 'cache').glob('SRR2*'))
+    assert [r['status'] for r in rerun] == ['downloaded', 'downloaded']
+
+def test_bandwidth_cap_is_shared(tmp_path, ena):
+    """The byte budget is enforced across concurrent files."""
+    ena_url, _ = ena
+    with _downloader(tmp_path, ena_url, max_bytes_per_second=1_000_000) as downloader:
+        start = time.monotonic()
+        downloader.download_runs(['SRR1', 'SRR2'])
+        elapsed = time.monotonic() - start
+
+    assert elapsed >= (590_000 - 16_000) / 1_000_000 * 0.9
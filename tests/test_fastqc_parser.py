@@ -0,0 +1,68 @@
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.fastqc_parser import FastQCReport, summarize_fastqc
+
+DATA_FILE = Path(__file__).parent / 'data' / 'fastqc_data.txt'
+
+
+@pytest.fixture
+def fastqc_zip(tmp_path):
+    path = tmp_path / 'SRR1_fastqc.zip'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('SRR1_fastqc/summary.txt', 'PASS\tBasic Statistics\tSRR1.fastq.gz\n')
+        zf.write(DATA_FILE, 'SRR1_fastqc/fastqc_data.txt')
+    return path
+
+
+def test_parse_modules_into_typed_arrays(fastqc_zip):
+    """Every module is parsed from the zip with numeric columns as float arrays."""
+    report = FastQCReport.from_zip(fastqc_zip)
+
+    assert report.version == '0.12.1'
+    assert report.total_sequences == 20000
+    assert report.sequence_length == '35-151'
+    assert report.gc_percent == 47.0
+    assert report.statuses['Per sequence GC content'] == 'FAIL'
+
+    quality = report['Per base sequence quality']
+    assert quality['Mean'].dtype == np.float64
+    assert list(quality['Base']) == ['1', '2', '3-4', '5-9']
+    assert report.mean_quality == pytest.approx(32.0)
+
+    assert report['Per sequence GC content']['Count'].sum() == 20000
+    assert report.deduplicated_percent == pytest.approx(86.25)
+    assert list(report['Sequence Duplication Levels']['Duplication Level']) == ['1', '2', '>10']
+    assert report.max_adapter_content == pytest.approx(1.25)
+    assert report['Overrepresented sequences']['Count'][0] == 40
+
+
+def test_from_path_accepts_directories_and_zips(tmp_path, fastqc_zip):
+    extracted = tmp_path / 'SRR2_fastqc'
+    extracted.mkdir()
+    (extracted / 'fastqc_data.txt').write_text(DATA_FILE.read_text())
+
+    from_dir = FastQCReport.from_path(extracted)
+    from_zip = FastQCReport.from_path(tmp_path / 'SRR1_fastqc')
+
+    assert from_dir.summary() == from_zip.summary()
+
+
+def test_truncated_module_is_an_error():
+    with pytest.raises(ValueError, match="no >>END_MODULE"):
+        FastQCReport.from_lines([">>Basic Statistics\tpass", "#Measure\tValue", "%GC\t40"])
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_summarize_fastqc_keeps_order_and_failures(tmp_path, fastqc_zip, max_workers):
+    broken = tmp_path / 'SRR0_fastqc.zip'
+    broken.write_bytes(b'not a zip')
+
+    summaries = summarize_fastqc([fastqc_zip, broken, fastqc_zip], max_workers=max_workers)
+
+    assert list(summaries['path']) == [str(fastqc_zip), str(broken), str(fastqc_zip)]
+    assert list(summaries['error'].isna()) == [True, False, True]
+    assert summaries['total_sequences'][2] == 20000
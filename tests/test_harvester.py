@@ -1,13 +1,37 @@
+import json
+import random
+import time
 import pytest
 import pandas as pd
 import requests
 from pathlib import Path
-from src.data_harvester import DataHarvester
+from src.data_harvester import DataHarvester, candidate_schema, write_parquet_chunks
+from src.rate_limiter import TokenBucket
+from src.response_cache import ResponseCache
 
 @pytest.fixture
 def harvester(test_config_file):
     return DataHarvester(test_config_file)
 
+class _StubResponse:
+    """Minimal stand-in for requests.Response carrying a JSON payload."""
+
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
 def test_config_validation(harvester):
     """Test configuration validation."""
     assert harvester.config is not None
@@ -28,6 +52,14 @@ def test_check_metadata_completeness(harvester):
     assert isinstance(completeness, float)
     assert 0 <= completeness <= 100
 
+def test_check_metadata_completeness_list_values(harvester):
+    """List-valued fields count as present; a NaN counts as missing in both scoring paths."""
+    record = {'collection_date': '2025-09', 'geo_loc_name': 'USA',
+              'host': ['soil', 'root'], 'isolation_source': float('nan')}
+
+    assert harvester.check_metadata_completeness(record) == 75.0
+    assert harvester.score_candidates(pd.DataFrame([record]))['metadata_completeness'].tolist() == [75.0]
+
 def test_process_candidates(harvester):
     """Test candidate processing."""
     test_data = {
@@ -75,4 +107,277 @@ def test_query_mgnify(harvester):
         if 'data' in result:
             assert isinstance(result['data'], list)
     except requests.exceptions.RequestException:
-        pytest.skip("MGnify API not accessible")
\ No newline at end of file
+        pytest.skip("MGnify API not accessible")
+
+def test_fetch_summaries_preserves_batch_order(harvester, monkeypatch):
+    """Concurrent esummary batches are returned in submission order."""
+    def fake_get(url, params=None, timeout=None):
+        uids = params['id'].split(',')
+        time.sleep(random.uniform(0, 0.01))
+        result = {'uids': uids}
+        result.update({uid: {'accession': f"SRR{uid}"} for uid in uids})
+        return _StubResponse({'result': result})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+    harvester.max_concurrency = 8
+    harvester.summary_batch_size = 5
+
+    ids = [str(i) for i in range(60)]
+    records = harvester.fetch_summaries(ids)
+
+    assert [r['accession'] for r in records] == [f"SRR{i}" for i in ids]
+
+def test_iter_sra_pages_through_history(harvester, monkeypatch, tmp_path):
+    """Streaming mode walks the esearch history and feeds save_results directly."""
+    pytest.importorskip('pyarrow')
+    total = 1234
+    calls = []
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append(params)
+        if url.endswith('esearch.fcgi'):
+            assert params['usehistory'] == 'y'
+            return _StubResponse({'esearchresult': {
+                'count': str(total), 'webenv': 'MCID_1', 'querykey': '1', 'idlist': []
+            }})
+        assert params['WebEnv'] == 'MCID_1'
+        start = params['retstart']
+        uids = [str(i) for i in range(start, start + params['retmax'])]
+        result = {'uids': uids}
+        result.update({uid: {'accession': f"SRR{uid}", 'spots': 2000000} for uid in uids})
+        return _StubResponse({'result': result})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+
+    stream = harvester.iter_candidates(harvester.iter_sra(page_size=100))
+    harvester.save_results(tmp_path, candidates=stream, chunk_size=500)
+
+    candidates = pd.read_parquet(tmp_path / 'candidates.parquet')
+    assert candidates['accession'].tolist() == [f"SRR{i}" for i in range(total)]
+    assert len(calls) == 1 + 13
+    manifest = pd.read_csv(tmp_path / 'manifest.csv')
+    assert manifest['results_count'].iloc[-1] == total
+
+def test_query_sra_rerun_served_from_cache(harvester, monkeypatch, tmp_path):
+    """A repeated harvest is answered from the response cache."""
+    calls = []
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        calls.append(url)
+        if url.endswith('esearch.fcgi'):
+            return _StubResponse({'esearchresult': {'idlist': ['1', '2']}})
+        return _StubResponse({'result': {'uids': ['1', '2'],
+                                     '1': {'accession': 'SRR1'}, '2': {'accession': 'SRR2'}}})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.cache = ResponseCache(tmp_path / 'cache.sqlite')
+
+    first = harvester.query_sra()
+    second = harvester.query_sra()
+
+    assert first.equals(second)
+    assert len(calls) == 2
+    assert harvester.cache.stats['hits'] == 2
+
+def test_crawl_mgnify_records_feed_process_candidates(harvester, monkeypatch, tmp_path):
+    """Crawled MGnify runs are scored by the same candidate pipeline as SRA runs."""
+    def fake_get_json(url, params, limiter=None):
+        if url.endswith('/filereport'):
+            return [{'run_accession': 'ERR1', 'read_count': '6000000', 'fastq_bytes': '2048'},
+                    {'run_accession': 'ERR2', 'read_count': ''}]
+        if '/studies?' in url:
+            return {'data': [{'id': 'MGYS1'}], 'links': {'next': None}}
+        if url.endswith('/samples'):
+            return {'data': [{'id': 'ERS1', 'attributes': {
+                'environment-biome': 'root:Environmental:Terrestrial:Soil',
+                'sample-metadata': [{'key': 'collection date', 'value': '2020'},
+                                    {'key': 'geo_loc_name', 'value': 'USA'}]}}],
+                'links': {}}
+        return {'data': [{'id': 'ERR1', 'attributes': {'accession': 'ERR1'}},
+                         {'id': 'ERR2', 'attributes': {'accession': 'ERR2'}}], 'links': {}}
+
+    monkeypatch.setattr(harvester, '_get_json', fake_get_json)
+    candidates = harvester.process_candidates(harvester.crawl_mgnify(tmp_path))
+
+    assert [c['accession'] for c in candidates] == ['ERR1', 'ERR2']
+    assert candidates[0]['habitat'] == 'Soil'
+    assert candidates[0]['metadata_completeness'] == 50.0
+    assert candidates[0]['raw_read_pairs'] == 6000000
+    assert candidates[0]['passes_criteria'] is False  # completeness below 70
+    assert candidates[1]['raw_read_pairs'] is None
+    assert candidates[1]['passes_criteria'] is None  # no read counts, left unscored
+    assert harvester.manifest[-1]['results_count'] == 2
+
+def test_iter_sra_records_manifest_when_stopped_early(harvester, monkeypatch):
+    """An abandoned stream still leaves a manifest entry with its partial count."""
+    def fake_get(url, params=None, timeout=None):
+        if url.endswith('esearch.fcgi'):
+            return _StubResponse({'esearchresult': {'count': '500', 'webenv': 'W', 'querykey': '1'}})
+        uids = [str(i) for i in range(params['retstart'], params['retstart'] + params['retmax'])]
+        return _StubResponse({'result': {uid: {'accession': f"SRR{uid}"} for uid in uids}})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+
+    stream = harvester.iter_sra(page_size=100)
+    first = [next(stream) for _ in range(3)]
+    stream.close()
+
+    assert len(first) == 3
+    assert harvester.manifest[-1]['results_count'] == 3
+    assert harvester.manifest[-1]['complete'] is False
+
+def test_write_parquet_chunks_with_late_values(tmp_path):
+    """Columns that are all None in the first chunk keep their declared type."""
+    pytest.importorskip('pyarrow')
+    records = [{'accession': None, 'passes_criteria': None}] * 3
+    records += [{'accession': 'SRR9', 'raw_read_pairs': 10, 'passes_criteria': True}]
+
+    count = write_parquet_chunks(records, tmp_path / 'c.parquet', chunk_size=2,
+                                 schema=candidate_schema())
+
+    table = pd.read_parquet(tmp_path / 'c.parquet')
+    assert count == 4
+    assert table['accession'].tolist()[-1] == 'SRR9'
+    assert table['raw_read_pairs'].tolist()[-1] == 10
+
+def test_score_candidates_matches_row_wise_rules(harvester):
+    """Columnar scoring reproduces the per-record completeness and threshold rules."""
+    test_df = pd.DataFrame({
+        'run_accession': ['SRR1', 'SRR2', 'SRR3', 'SRR4'],
+        'spots': ['2000000', 500000, None, 3000000],
+        'size_MB': [1024, 512, None, 2048],
+        'sample_attribute': ['host=soil;pH=7', None, 'host=root', ''],
+        'collection_date': ['2020', '2021', '', '2022'],
+        'geo_loc_name': ['USA', None, 'Kenya', 'Peru'],
+        'host': ['soil', 'soil', 'root', float('nan')],
+        'isolation_source': ['forest', 'field', 'root', 'leaf'],
+    })
+
+    scored = harvester.score_candidates(test_df)
+
+    assert scored['metadata_completeness'].tolist() == [100.0, 75.0, 75.0, 75.0]
+    assert scored['raw_read_pairs'].tolist() == [2000000, 500000, None, 3000000]
+    assert scored['estimated_size_gb'].tolist() == [1.0, 0.5, None, 2.0]
+    assert scored['habitat'].tolist() == ['host=soil', '', 'host=root', '']
+    assert scored['passes_criteria'].tolist() == [True, False, None, True]
+    for record in test_df.to_dict('records'):
+        expected = harvester.check_metadata_completeness(record)
+        assert scored.loc[test_df['run_accession'] == record['run_accession'],
+                          'metadata_completeness'].item() == expected
+
+def test_stream_and_frame_scoring_agree(harvester):
+    """Chunked stream scoring returns the same candidates as the DataFrame path."""
+    records = [{'run_accession': f"SRR{i}", 'spots': i * 100000,
+                'sample_attribute': f"host=h{i % 3}", 'host': 'soil' if i % 2 else ''}
+               for i in range(25)]
+
+    from_stream = list(harvester.iter_candidates(iter(records), chunk_size=7))
+    from_frame = harvester.process_candidates(pd.DataFrame(records))
+
+    assert from_stream == from_frame
+
+def test_harvest_sra_delta_fetches_only_newer_runs(harvester, monkeypatch, tmp_path):
+    """The second delta searches from the stored high-water mark and counts new rows."""
+    searches = []
+    releases = [['1', '2', '3'], ['3', '4']]
+
+    def fake_get(url, params=None, timeout=None):
+        if url.endswith('esearch.fcgi'):
+            searches.append(params)
+            uids = releases[len(searches) - 1]
+            return _StubResponse({'esearchresult': {'count': str(len(uids)),
+                                                    'webenv': 'W', 'querykey': '1'}})
+        uids = releases[len(searches) - 1][params['retstart']:params['retstart'] + params['retmax']]
+        return _StubResponse({'result': {uid: {'accession': f"SRR{uid}", 'spots': 2000000}
+                                         for uid in uids}})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+    harvester.candidate_store_path = tmp_path / 'store.sqlite'
+
+    assert harvester.harvest_sra_delta() == 3
+    assert harvester.harvest_sra_delta() == 1
+
+    assert 'mindate' not in searches[0]
+    assert searches[1]['datetype'] == 'mdat'
+    assert searches[1]['mindate'] == time.strftime('%Y/%m/%d')
+    assert [entry['rows_added'] for entry in harvester.manifest] == [3, 1]
+
+def test_iter_sra_parses_expxml_and_biosample_attributes(harvester, monkeypatch):
+    """Real esummary payloads yield typed runs whose BioSample attributes drive completeness."""
+    with open(Path(__file__).parent / 'data' / 'sra_esummary.json') as f:
+        esummary = json.load(f)
+
+    def fake_get(url, params=None, timeout=None):
+        if url.endswith('esearch.fcgi'):
+            return _StubResponse({'esearchresult': {'count': '1', 'webenv': 'W', 'querykey': '1'}})
+        if params['db'] == 'biosample':
+            assert params['id'] == 'SAMN500'
+            return _StubResponse({'result': {'uids': ['5'], '5': esummary['biosample']}})
+        return _StubResponse({'result': {'uids': ['1'], '1': esummary['sra']}})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+
+    candidates = list(harvester.iter_candidates(harvester.iter_sra()))
+
+    assert [c['accession'] for c in candidates] == ['SRR1', 'SRR2']
+    assert candidates[0]['habitat'] == 'forest soil'
+    assert candidates[0]['metadata_completeness'] == 75.0
+    assert candidates[1]['raw_read_pairs'] == 2000
+
+def test_query_sra_fan_out_runs_terms_concurrently(harvester, monkeypatch):
+    """Each term is searched in parallel and shared UIDs are fetched once."""
+    term_ids = {'fungi': ['1', '2', '3'], 'mycobiome': ['3', '4']}
+    summary_ids = []
+
+    def fake_get(url, params=None, timeout=None):
+        if url.endswith('esearch.fcgi'):
+            time.sleep(0.2)
+            term = next(t for t in term_ids if f'"{t}"' in params['term'])
+            assert params['term'].count('[All Fields]') == 1
+            return _StubResponse({'esearchresult': {'count': str(len(term_ids[term])),
+                                                    'idlist': term_ids[term]}})
+        summary_ids.extend(params['id'].split(','))
+        return _StubResponse({'result': {uid: {'accession': f"SRR{uid}", 'spots': 2000000}
+                                         for uid in params['id'].split(',')}})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    harvester.rate_limiter = TokenBucket(1000)
+
+    start = time.monotonic()
+    results = harvester.query_sra_fan_out()
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.35
+    assert sorted(summary_ids) == ['1', '2', '3', '4']
+    assert results['run_accession'].tolist() == ['SRR1', 'SRR2', 'SRR3', 'SRR4']
+    assert harvester.term_stats == [
+        {'database': 'SRA', 'term': 'fungi', 'hits': 3, 'unique_hits': 2, 'overlap_hits': 1},
+        {'database': 'SRA', 'term': 'mycobiome', 'hits': 2, 'unique_hits': 1, 'overlap_hits': 1},
+    ]
+    assert [entry['results_count'] for entry in harvester.manifest] == [3, 2]
+
+def test_query_mgnify_fan_out_merges_biomes(harvester, monkeypatch, tmp_path):
+    """Biome queries follow their own cursors and studies seen twice are merged."""
+    pages = {
+        'soil': [{'data': [{'id': 'MGYS1'}], 'links': {'next': 'http://next/soil2'}},
+                 {'data': [{'id': 'MGYS2'}], 'links': {'next': None}}],
+        'root': [{'data': [{'id': 'MGYS2'}, {'id': 'MGYS3'}], 'links': {}}],
+    }
+
+    def fake_get_json(url, params, limiter=None):
+        if url == 'http://next/soil2':
+            return pages['soil'][1]
+        return pages[params['biome']][0]
+
+    monkeypatch.setattr(harvester, '_get_json', fake_get_json)
+    studies = harvester.query_mgnify_fan_out()
+    harvester.save_results(tmp_path)
+
+    assert [s['id'] for s in studies] == ['MGYS1', 'MGYS2', 'MGYS3']
+    stats = pd.read_csv(tmp_path / 'term_stats.csv')
+    assert stats[['term', 'hits', 'overlap_hits']].values.tolist() == [['soil', 2, 1], ['root', 2, 1]]
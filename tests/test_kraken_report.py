@@ -0,0 +1,44 @@
+import pytest
+from src.kraken_report import FUNGI_TAXID, HUMAN_TAXID, KrakenReport
+
+REPORT = (
+    " 10.00\t100\t100\tU\t0\tunclassified\n"
+    " 90.00\t900\t10\tR\t1\troot\n"
+    " 60.00\t600\t0\tR1\t131567\t  cellular organisms\n"
+    " 40.00\t400\t5\tK\t4751\t    Fungi\n"
+    " 30.00\t300\t300\tS\t5062\t      Aspergillus oryzae\n"
+    "  9.50\t95\t95\tS\t4932\t      Saccharomyces cerevisiae\n"
+    " 20.00\t200\t0\tK\t33208\t    Metazoa\n"
+    " 20.00\t200\t200\tS\t9606\t      Homo sapiens\n"
+)
+
+@pytest.fixture
+def report(tmp_path):
+    path = tmp_path / 'SRR1_report.txt'
+    path.write_text(REPORT)
+    return KrakenReport.from_file(path)
+
+def test_clade_queries(report):
+    """Totals and clade fractions come from taxid lookups."""
+    assert report.total_reads == 1000
+    assert report.classified_reads == 900
+    assert report.clade_reads(FUNGI_TAXID) == 400
+    assert report.clade_percent(HUMAN_TAXID) == pytest.approx(20.0)
+    assert report.clade_reads(12345) == 0
+    assert report.names[3] == 'Fungi'
+
+def test_lineage_follows_indentation(report):
+    assert report.lineage(5062) == [5062, 4751, 131567, 1]
+    assert report.lineage(0) == [0]
+
+def test_top_species(report):
+    top = report.top('S', 2)
+    assert [t['name'] for t in top] == ['Aspergillus oryzae', 'Homo sapiens']
+    assert top[0]['clade_reads'] == 300
+
+def test_minimizer_columns_and_malformed_lines():
+    """--report-minimizer-data reports parse the same; malformed lines raise."""
+    lines = [" 50.00\t5\t5\t40\t30\tU\t0\tunclassified", " 50.00\t5\t1\t40\t30\tR\t1\troot"]
+    assert KrakenReport.from_lines(lines).total_reads == 10
+    with pytest.raises(ValueError):
+        KrakenReport.from_lines(["50.00\t5\tU\t0\tunclassified"])
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.lazy_import import lazy_import
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def loaded_after_import(module: str):
+    """Packages a fresh interpreter has executed after importing ``module``.
+
+    Lazily imported packages sit in ``sys.modules`` unexecuted, so a package only
+    counts once one of its submodules is loaded.
+    """
+    code = f"import sys, {module}; print(' '.join({{m.split('.')[0] for m in sys.modules if '.' in m}}))"
+    proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True, check=True)
+    return set(proc.stdout.split())
+
+
+def test_lazy_import_defers_execution(tmp_path, monkeypatch):
+    marker = tmp_path / 'executed'
+    (tmp_path / 'slow_module.py').write_text(f"open({str(marker)!r}, 'w').close()\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'slow_module', raising=False)
+
+    module = lazy_import('slow_module')
+    assert not marker.exists()
+    assert module.VALUE == 42
+    assert marker.exists()
+    assert lazy_import('slow_module') is module
+
+
+def test_lazy_import_missing_module():
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import('fungimap_no_such_module')
+
+
+@pytest.mark.parametrize('module', ['src.data_harvester', 'src.fastqc_parser', 'src.sra_parser',
+                                    'workflow.scripts.sample_validator_fixed'])
+def test_entry_points_do_not_load_pandas(module):
+    assert 'pandas' not in loaded_after_import(module)
+
+
+def test_eda_analyzer_does_not_load_plotting():
+    loaded = loaded_after_import('src.analyze_eda_results')
+    assert 'seaborn' not in loaded
+    assert 'matplotlib' not in loaded
+
+
+def test_generate_embeddings_help_without_model_dependencies():
+    proc = subprocess.run([sys.executable, 'workflow/scripts/generate_embeddings.py', '--help'],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0
+    assert 'usage' in proc.stdout
@@ -0,0 +1,70 @@
+import json
+import os
+
+from src.metadata_index import MetadataIndex, score_completeness
+
+REQUIRED = ['collection_date', 'geo_loc_name', 'host']
+
+
+def write_metadata(storage, accession, metadata):
+    (storage / accession).mkdir(parents=True, exist_ok=True)
+    path = storage / accession / 'metadata.json'
+    path.write_text(json.dumps(metadata))
+    return path
+
+
+def test_score_completeness():
+    assert score_completeness([3, 2, 1, 0], 3).tolist() == [100.0, 30.0, 30.0, 0.0]
+    assert score_completeness(0, 0) == 100.0
+
+
+def test_completeness_matches_per_file_rules(tmp_path):
+    index = MetadataIndex(tmp_path / 'index.sqlite')
+    assert index.upsert([
+        ('S1', {'collection_date': '2025', 'geo_loc_name': 'Canada', 'host': 'soil'}, None),
+        ('S2', {'collection_date': '2025', 'geo_loc_name': 'Unknown', 'host': None, 'extra': 'x'}, None),
+        ('S3', {'collection_date': '', 'geo_loc_name': 'Unknown'}, None),
+        ('S4', {'collection_date': 0, 'geo_loc_name': False, 'host': 'Unknown host'}, None),
+    ]) == 4
+
+    scores = index.completeness(['S4', 'S1', 'MISSING', 'S2', 'S3', 'S1'], REQUIRED)
+
+    assert scores.index.tolist() == ['S4', 'S1', 'MISSING', 'S2', 'S3', 'S1']
+    assert scores['exists'].tolist() == [True, True, False, True, True, True]
+    assert scores['valid_values'].tolist() == [3, 3, 0, 1, 0, 3]
+    assert scores['metadata_completeness'].tolist() == [100.0, 100.0, 0.0, 30.0, 0.0, 100.0]
+    assert index.get('S2') == {'collection_date': '2025', 'geo_loc_name': 'Unknown', 'host': None, 'extra': 'x'}
+    assert index.get('MISSING') is None
+
+
+def test_import_directory_is_incremental(tmp_path):
+    storage = tmp_path / 'cache'
+    write_metadata(storage, 'SRR1', {'collection_date': '2025', 'geo_loc_name': 'Canada', 'host': 'soil'})
+    changed = write_metadata(storage, 'SRR2', {'collection_date': '2025'})
+    gone = write_metadata(storage, 'SRR3', {'host': 'soil'})
+    index = MetadataIndex(tmp_path / 'index.sqlite')
+    index.upsert([('MANUAL', {'host': 'soil'}, None)])
+
+    assert index.import_directory(storage) == {'SRR1': 'added', 'SRR2': 'added', 'SRR3': 'added'}
+
+    write_metadata(storage, 'SRR2', {'collection_date': '2025', 'geo_loc_name': 'Canada', 'host': 'root'})
+    os.utime(changed, ns=(1, 1))
+    gone.unlink()
+    (storage / 'SRR4').mkdir()
+    (storage / 'SRR4' / 'metadata.json').write_text('{not json')
+
+    status = index.import_directory(storage, max_workers=2)
+
+    assert status == {'SRR1': 'unchanged', 'SRR2': 'updated', 'SRR3': 'removed', 'SRR4': 'failed'}
+    assert sorted(index.sources()) == ['MANUAL', 'SRR1', 'SRR2']
+    assert index.completeness(['SRR2'], REQUIRED)['metadata_completeness'].tolist() == [100.0]
+
+
+def test_reopen_keeps_records(tmp_path):
+    index = MetadataIndex(tmp_path / 'index.sqlite')
+    index.upsert([('S1', {'host': 'soil'}, '10:20')])
+    index.close()
+
+    index = MetadataIndex(tmp_path / 'index.sqlite')
+    assert len(index) == 1 and 'S1' in index
+    assert index.sources() == {'S1': '10:20'}
@@ -0,0 +1,96 @@
+import pytest
+import requests
+from src.mgnify_crawler import MGnifyCrawler
+
+API = 'https://mgnify.test/api/v1'
+
+def _page(data, next_url=None):
+    return {'data': data, 'links': {'next': next_url}}
+
+class FakeMGnify:
+    """Five studies over two pages, two paginated samples each, two runs per sample."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def __call__(self, url, params):
+        self.calls.append(url)
+        if url == self.fail_on:
+            self.fail_on = None
+            raise requests.exceptions.ConnectionError("connection reset")
+        if url.endswith('/filereport'):
+            study = params['accession']
+            return [{'run_accession': f"{study}-S{s}-R{r}", 'read_count': '2000000',
+                     'base_count': '300000000', 'fastq_bytes': '1048576;1048576'}
+                    for s in range(2) for r in range(2) if study != 'MGYS4']
+        if url.endswith('/studies?page=2'):
+            return _page([{'id': f"MGYS{i}"} for i in range(3, 5)])
+        if '/studies?' in url:
+            return _page([{'id': f"MGYS{i}"} for i in range(3)], f"{API}/studies?page=2")
+        if url.endswith('/samples'):
+            study = url.split('/')[-2]
+            return _page([{'id': f"{study}-S0"}], f"{url}?page=2")
+        if url.endswith('/samples?page=2'):
+            study = url.split('/')[-2]
+            return _page([{'id': f"{study}-S1"}])
+        sample = url.split('/')[-2]
+        return _page([{'id': f"{sample}-R{i}", 'attributes': {'accession': f"{sample}-R{i}"}}
+                      for i in range(2)])
+
+def test_crawl_follows_all_cursors(tmp_path):
+    """Every study page, sample page and run page is visited."""
+    crawler = MGnifyCrawler(FakeMGnify(), API, tmp_path, params={'biome': 'soil'})
+    records = list(crawler.crawl())
+
+    assert len(records) == 5 * 2 * 2
+    assert {r['study_accession'] for r in records} == {f"MGYS{i}" for i in range(5)}
+    assert set(records[0]) >= {'run_accession', 'spots', 'size_MB', 'sample_attribute'}
+
+    by_study = {r['study_accession']: r for r in records}
+    assert by_study['MGYS0']['spots'] == 2000000
+    assert by_study['MGYS0']['size_MB'] == 2.0
+    assert by_study['MGYS4']['spots'] is None  # unknown to ENA
+
+def test_interrupted_crawl_resumes_without_duplicates(tmp_path):
+    """A crawl that fails mid-way resumes from its checkpoint and emits each run once."""
+    fake = FakeMGnify(fail_on=f"{API}/samples/MGYS3-S1/runs")
+    first = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for record in MGnifyCrawler(fake, API, tmp_path, max_concurrency=1).crawl():
+            first.append(record)
+
+    fake.calls.clear()
+    resumed = list(MGnifyCrawler(fake, API, tmp_path, max_concurrency=1).crawl())
+
+    accessions = [r['run_accession'] for r in resumed]
+    assert len(accessions) == len(set(accessions)) == 20
+    assert f"{API}/studies?" not in fake.calls  # first page not re-fetched
+    assert not any('MGYS0' in url for url in fake.calls)
+
+    replayed = list(MGnifyCrawler(fake, API, tmp_path).crawl())
+    assert [r['run_accession'] for r in replayed] == accessions
+
+def test_resume_without_replay_skips_already_yielded_runs(tmp_path):
+    """replay=False yields only runs that the interrupted call did not yield."""
+    fake = FakeMGnify(fail_on=f"{API}/samples/MGYS3-S1/runs")
+    first = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for record in MGnifyCrawler(fake, API, tmp_path, max_concurrency=1).crawl():
+            first.append(record['run_accession'])
+
+    rest = [r['run_accession'] for r in
+            MGnifyCrawler(fake, API, tmp_path, max_concurrency=1).crawl(replay=False)]
+
+    assert not set(first) & set(rest)
+    assert len(first) + len(rest) == 20
+
+def test_changed_filters_start_a_fresh_crawl(tmp_path):
+    """A checkpoint written for other filters is not reused."""
+    list(MGnifyCrawler(FakeMGnify(), API, tmp_path, params={'biome': 'soil'}).crawl())
+
+    fake = FakeMGnify()
+    records = list(MGnifyCrawler(fake, API, tmp_path, params={'biome': 'marine'}).crawl())
+
+    assert f"{API}/studies?biome=marine" in fake.calls
+    assert len(records) == 20
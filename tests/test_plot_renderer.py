@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.plot_renderer import FINGERPRINTS_FILE, PlotJob, render_plots, reusable_figure
+
+
+def render_line(path, values):
+    figure = reusable_figure(render_line, (3, 2))
+    figure.subplots().plot(values)
+    figure.savefig(path)
+
+
+def render_broken(path, values):
+    raise ValueError("no data")
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_render_plots_skips_unchanged_figures(tmp_path, max_workers):
+    jobs = [PlotJob('a.png', render_line, {'values': np.arange(5)}),
+            PlotJob('b.png', render_line, {'values': np.ones(5)})]
+
+    first = render_plots(jobs, tmp_path, max_workers=max_workers)
+    assert first == {'a.png': 'rendered', 'b.png': 'rendered'}
+    assert (tmp_path / 'a.png').stat().st_size > 0
+
+    jobs[1] = PlotJob('b.png', render_line, {'values': np.zeros(5)})
+    second = render_plots(jobs, tmp_path, max_workers=max_workers)
+    assert second == {'a.png': 'skipped', 'b.png': 'rendered'}
+
+
+def test_failed_figures_are_isolated_and_retried(tmp_path):
+    jobs = [PlotJob('bad.png', render_broken, {'values': [1]}),
+            PlotJob('good.png', render_line, {'values': [1, 2]})]
+
+    assert render_plots(jobs, tmp_path, max_workers=1) == {'bad.png': 'failed', 'good.png': 'rendered'}
+    assert set(json.loads((tmp_path / FINGERPRINTS_FILE).read_text())) == {'good.png'}
+    assert render_plots(jobs, tmp_path, max_workers=1)['bad.png'] == 'failed'
+
+
+def test_deleted_figure_is_rendered_again(tmp_path):
+    jobs = [PlotJob('a.png', render_line, {'values': [1, 2]})]
+    render_plots(jobs, tmp_path, max_workers=1)
+    (tmp_path / 'a.png').unlink()
+
+    assert render_plots(jobs, tmp_path, max_workers=1) == {'a.png': 'rendered'}
@@ -0,0 +1,29 @@
+import time
+import threading
+import pytest
+from src.rate_limiter import TokenBucket
+
+def test_token_bucket_limits_rate():
+    """Token bucket admits roughly `rate` acquisitions per second."""
+    bucket = TokenBucket(50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.19
+
+def test_token_bucket_is_shared_across_threads():
+    """Concurrent callers draw from the same budget."""
+    bucket = TokenBucket(100, capacity=1)
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)])
+               for _ in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - start >= 0.18
+
+def test_token_bucket_rejects_non_positive_rate():
+    """A zero rate would block forever, so it is refused up front."""
+    with pytest.raises(ValueError):
+        TokenBucket(0)
@@ -0,0 +1,81 @@
+import pytest
+import requests
+from src.response_cache import ResponseCache
+
+class _CachedResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.content = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fake endpoint that honours If-None-Match and records every request."""
+    calls = []
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        calls.append(headers or {})
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return _CachedResponse(b'', status_code=304)
+        return _CachedResponse(b'{"value": 1}', headers={'ETag': '"v1"'})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    return calls
+
+def test_cache_hit_ignores_param_order_and_api_key(tmp_path, server):
+    """Identical requests are served from disk, even across cache instances."""
+    cache = ResponseCache(tmp_path / 'cache.sqlite')
+    assert cache.get_json('http://x/esummary.fcgi', {'db': 'sra', 'id': '1'}) == {'value': 1}
+    cache.close()
+
+    cache = ResponseCache(tmp_path / 'cache.sqlite')
+    params = {'id': '1', 'db': 'sra', 'api_key': 'secret'}
+    assert cache.get_json('http://x/esummary.fcgi', params) == {'value': 1}
+    assert len(server) == 1
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 0
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path, server):
+    """Expired entries are revalidated and reused on 304 Not Modified."""
+    cache = ResponseCache(tmp_path / 'cache.sqlite', ttls={'esearch.fcgi': 0})
+    cache.get_json('http://x/esearch.fcgi', {'term': 'fungi'})
+    assert cache.get_json('http://x/esearch.fcgi', {'term': 'fungi'}) == {'value': 1}
+
+    assert server[-1]['If-None-Match'] == '"v1"'
+    assert cache.stats == {'hits': 0, 'misses': 1, 'revalidated': 1, 'evictions': 0}
+
+def test_lru_eviction_respects_size_bound(tmp_path, server):
+    """The least recently used entries are evicted once max_bytes is exceeded."""
+    cache = ResponseCache(tmp_path / 'cache.sqlite', max_bytes=30)
+    cache.get_json('http://x/a', {})
+    cache.get_json('http://x/b', {})
+    cache.get_json('http://x/a', {})  # refresh a, making b least recently used
+    cache.get_json('http://x/c', {})
+
+    assert cache.stats['evictions'] == 1
+    cache.get_json('http://x/a', {})
+    assert cache.stats['hits'] == 2
+    cache.get_json('http://x/b', {})
+    assert cache.stats['misses'] == 4
+
+def test_error_payloads_are_not_cached(tmp_path, monkeypatch):
+    """eutils errors returned with HTTP 200 and non-JSON bodies are never stored."""
+    bodies = [b'{"esummaryresult": ["Unable to obtain query #1"]}', b'<html>busy</html>',
+              b'{"result": {"uids": []}}']
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        return _CachedResponse(bodies.pop(0))
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    cache = ResponseCache(tmp_path / 'cache.sqlite')
+
+    assert 'esummaryresult' in cache.get_json('http://x/esummary.fcgi', {'id': '1'})
+    with pytest.raises(ValueError):
+        cache.get_json('http://x/esummary.fcgi', {'id': '1'})
+    assert cache.get_json('http://x/esummary.fcgi', {'id': '1'}) == {'result': {'uids': []}}
+    assert cache.get_json('http://x/esummary.fcgi', {'id': '1'}) == {'result': {'uids': []}}
+    assert cache.stats['hits'] == 1
@@ -0,0 +1,43 @@
+import json
+import pandas as pd
+from pathlib import Path
+from src.sra_parser import parse_biosample_attributes, parse_summary, records_to_frame
+
+with open(Path(__file__).parent / 'data' / 'sra_esummary.json') as f:
+    ESUMMARY = json.load(f)
+
+def test_parse_summary_yields_one_typed_record_per_run():
+    """Runs share the experiment fields and split its size by base count."""
+    records = parse_summary(ESUMMARY['sra'])
+
+    assert [r['run_accession'] for r in records] == ['SRR1', 'SRR2']
+    first = records[0]
+    assert first['spots'] == 1000 and first['bases'] == 300000
+    assert first['size_MB'] == 1.0
+    assert records[1]['size_MB'] == 2.0
+    assert first['platform'] == 'ILLUMINA'
+    assert first['instrument_model'] == 'Illumina NovaSeq 6000'
+    assert first['library_layout'] == 'PAIRED'
+    assert first['library_source'] == 'METAGENOMIC'
+    assert first['taxid'] == 410658
+    assert (first['study_accession'], first['biosample']) == ('SRP200', 'SAMN500')
+    assert first['updatedate'] == '2021/07/02'
+
+def test_parse_summary_skips_malformed_xml():
+    assert parse_summary({**ESUMMARY['sra'], 'expxml': '<Summary>'}) == []
+
+def test_biosample_attributes_drop_placeholders():
+    """Attributes are keyed by harmonized name and placeholders count as missing."""
+    assert parse_biosample_attributes(ESUMMARY['biosample']['sampledata']) == {
+        'collection_date': '2021-06-15',
+        'geo_loc_name': 'USA: Oregon',
+        'isolation_source': 'forest soil',
+    }
+
+def test_records_to_frame_types_columns():
+    frame = records_to_frame(parse_summary({**ESUMMARY['sra'], 'createdate': None}))
+
+    assert frame['spots'].dtype == 'Int64'
+    assert frame['size_MB'].dtype == 'float64'
+    assert frame['run_accession'].tolist() == ['SRR1', 'SRR2']
+    assert pd.isna(frame['createdate']).all()
@@ -0,0 +1,75 @@
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.taxonomy_index import INDEX_DIR, TaxonomyIndex
+
+DATA_DIR = Path(__file__).parent / 'data' / 'taxonomy'
+
+
+@pytest.fixture
+def taxonomy(tmp_path):
+    """A Kraken2-style database with the test dump in ``taxonomy/``."""
+    shutil.copytree(DATA_DIR, tmp_path / 'kraken2-db' / 'taxonomy')
+    return TaxonomyIndex.from_taxonomy_dir(tmp_path / 'kraken2-db')
+
+
+def test_names_ranks_and_lineage(taxonomy):
+    assert len(taxonomy) == 22
+    assert taxonomy.name(4751) == 'Fungi'
+    assert taxonomy.name(9606) == 'Homo sapiens'
+    assert taxonomy.rank(4890) == 'phylum'
+    assert taxonomy.parent_of(5062) == 5052
+    assert taxonomy.lineage(5062) == ('d__Eukaryota|k__Fungi|p__Ascomycota|c__Eurotiomycetes|'
+                                      'o__Eurotiales|f__Aspergillaceae|g__Aspergillus|s__Aspergillus oryzae')
+    assert taxonomy.lineage(5204) == 'd__Eukaryota|k__Fungi|p__Basidiomycota'
+    assert taxonomy.lineage(123) == ''
+
+
+def test_ancestor_tests(taxonomy):
+    assert taxonomy.is_ancestor(4890, 5062)
+    assert taxonomy.is_ancestor(5062, 5062)
+    assert taxonomy.is_ancestor(1, 10239)
+    assert not taxonomy.is_ancestor(4751, 9606)
+    assert not taxonomy.is_ancestor(5062, 4890)
+    assert not taxonomy.is_ancestor(4751, 0)
+
+    mask = taxonomy.descendant_mask(np.array([5062, 9606, 0, 10**9, 4751, 5204]), 4751)
+    assert mask.tolist() == [True, False, False, False, True, True]
+
+
+def test_rank_rollup(taxonomy):
+    assert taxonomy.ancestor_at(5062, 'phylum') == 4890
+    assert taxonomy.ancestor_at(5062, 'domain') == 2759
+    assert taxonomy.ancestor_at(4751, 'genus') == 0
+    assert taxonomy.ancestors_at([5062, 9606, 0], 'kingdom').tolist() == [4751, 33208, 0]
+
+    taxids = [5062, 5059, 5204, 9606, 4751, 0]
+    counts = [10, 5, 3, 100, 40, 7]
+    assert taxonomy.rollup(taxids, counts, 'phylum') == {4890: 15, 5204: 3, 7711: 100}
+    assert taxonomy.rollup(taxids, counts, 'phylum', within=4751) == {4890: 15, 5204: 3}
+    with pytest.raises(ValueError):
+        taxonomy.rollup(taxids, counts, 'clade')
+
+
+def test_index_is_reused_until_dump_changes(taxonomy, tmp_path):
+    db = tmp_path / 'kraken2-db'
+    index_dir = db / 'taxonomy' / INDEX_DIR
+    assert not taxonomy.tin.flags.owndata  # mapped from disk, not loaded
+    built = (index_dir / 'tin.npy').stat().st_mtime_ns
+
+    assert TaxonomyIndex.from_taxonomy_dir(db).name(5062) == 'Aspergillus oryzae'
+    assert (index_dir / 'tin.npy').stat().st_mtime_ns == built
+
+    names = db / 'taxonomy' / 'names.dmp'
+    names.write_text(names.read_text().replace('Aspergillus oryzae', 'Aspergillus oryzae RIB40'))
+    assert TaxonomyIndex.from_taxonomy_dir(db).name(5062) == 'Aspergillus oryzae RIB40'
+
+
+def test_pickles_as_directory(taxonomy):
+    payload = pickle.dumps(taxonomy)
+    assert len(payload) < 1000
+    assert pickle.loads(payload).lineage(9606).endswith('s__Homo sapiens')
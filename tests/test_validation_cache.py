@@ -0,0 +1,44 @@
+import os
+
+import src.validation_cache as validation_cache
+from src.validation_cache import MAX_RESULTS_PER_SAMPLE, ValidationCache
+
+
+def test_make_key_is_order_independent():
+    first = ValidationCache.make_key({'accession': 'S1', 'metadata': ['abc', 70.0], 'sequence': None})
+    second = ValidationCache.make_key({'sequence': None, 'metadata': ['abc', 70.0], 'accession': 'S1'})
+    assert first == second
+    assert first != ValidationCache.make_key({'accession': 'S1', 'metadata': ['abc', 80.0], 'sequence': None})
+
+
+def test_file_digests_are_memoised_until_the_file_changes(tmp_path, monkeypatch):
+    hashed = []
+    hash_file = validation_cache.hash_file
+    monkeypatch.setattr(validation_cache, 'hash_file', lambda path, **kwargs: hashed.append(path) or hash_file(path, **kwargs))
+    cache = ValidationCache(tmp_path / 'cache.sqlite')
+    path = tmp_path / 'SRR1_report.txt'
+    path.write_text('100\n')
+
+    digest, missing = cache.file_digests([path, tmp_path / 'missing.txt'])
+    assert missing is None
+    assert cache.file_digests([path]) == [digest]
+    assert len(hashed) == 1
+
+    path.write_text('200\n')
+    os.utime(path, ns=(1, 1))
+    assert cache.file_digests([path]) != [digest]
+    assert len(hashed) == 2
+
+
+def test_put_get_and_retention(tmp_path):
+    cache = ValidationCache(tmp_path / 'cache.sqlite')
+    assert cache.get('k0') is None
+    for i in range(MAX_RESULTS_PER_SAMPLE + 2):
+        cache.put(f"k{i}", 'S1', {'accession': 'S1', 'passes_all': True, 'run': i})
+    cache.put('other', 'S2', {'accession': 'S2'})
+
+    assert len(cache) == MAX_RESULTS_PER_SAMPLE + 1
+    assert cache.get('k0') is None
+    assert cache.get(f"k{MAX_RESULTS_PER_SAMPLE + 1}")['run'] == MAX_RESULTS_PER_SAMPLE + 1
+    assert cache.stats == {'hits': 1, 'misses': 2, 'stored': MAX_RESULTS_PER_SAMPLE + 3}
+    assert cache.summary().startswith('1 hits, 2 misses (33.3% hit rate)')
@@ -121,4 +121,209 @@ async def test_validate_sample_batch(validator, test_data_dir):
         assert acc in results
         assert isinstance(results[acc], ValidationResult)
         assert results[acc].passes_all is True
-        assert results[acc].metrics["metadata_completeness"] == 100.0  # All fields valid
\ No newline at end of file
+        assert results[acc].metrics["metadata_completeness"] == 100.0  # All fields valid
+
+
+@pytest.mark.anyio
+async def test_taxonomic_composition_with_taxonomy(write_config, tmp_path):
+    """With a taxonomy configured, Bracken species are classified as fungal by lineage."""
+    from workflow.scripts.sample_validator_fixed import SampleValidator
+
+    storage = tmp_path / "cache"
+    (storage / "eda" / "kraken2").mkdir(parents=True)
+    (storage / "eda" / "bracken").mkdir(parents=True)
+    (storage / "eda" / "kraken2" / "TAX001_report.txt").write_text(
+        " 20.00\t200\t200\tU\t0\tunclassified\n"
+        " 80.00\t800\t0\tR\t1\troot\n"
+        " 50.00\t500\t0\tK\t4751\t  Fungi\n"
+        " 50.00\t500\t500\tS\t5062\t    Aspergillus oryzae\n"
+    )
+    (storage / "eda" / "bracken" / "TAX001_bracken.txt").write_text(
+        "name\ttaxonomy_id\ttaxonomy_lvl\tkraken_assigned_reads\tadded_reads\tnew_est_reads\tfraction_total_reads\n"
+        "Aspergillus oryzae\t5062\tS\t400\t10\t410\t0.40\n"
+        "Homo sapiens\t9606\tS\t300\t0\t300\t0.30\n"
+        "Aspergillus flavus\t5059\tS\t100\t5\t105\t0.10\n"
+    )
+    config_path = write_config(local_path=storage, sections={"taxonomy": {
+        "taxonomy_dir": str(Path(__file__).parent / "data" / "taxonomy"),
+        "index_dir": str(tmp_path / "taxonomy_index"),
+    }})
+
+    metrics = await SampleValidator(config_path)._analyze_taxonomic_composition("TAX001")
+
+    assert metrics["fungal_signal"] == pytest.approx(50.0)
+    assert metrics["dominant_species"] == ["Aspergillus oryzae", "Homo sapiens", "Aspergillus flavus"]
+    assert metrics["dominant_fungal_species"] == ["Aspergillus oryzae", "Aspergillus flavus"]
+    assert metrics["fungal_species_abundance"] == pytest.approx(0.5)
+
+
+@pytest.mark.anyio
+async def test_validate_sample_batch_queue(write_metadata, write_config, tmp_path):
+    """More samples than workers are all validated, including missing ones."""
+    from workflow.scripts.sample_validator_fixed import SampleValidator
+
+    storage = tmp_path / "cache"
+    accessions = [f"QUEUE{i:03d}" for i in range(25)]
+    for i, acc in enumerate(accessions):
+        if i % 5:  # every fifth sample has no metadata.json
+            write_metadata(storage, acc)
+    config_path = write_config(local_path=storage)
+
+    validator = SampleValidator(config_path, batch_size=4, max_workers=2)
+    results = await validator.validate_sample_batch(accessions)
+
+    assert list(sorted(results)) == accessions
+    assert [acc for acc in accessions if results[acc].passes_all] == [
+        acc for i, acc in enumerate(accessions) if i % 5
+    ]
+    assert validator.processed_count == 25
+    assert validator.failed_count == 0
+
+
+@pytest.mark.anyio
+async def test_validate_sample_batch_with_metadata_index(test_config, write_config, tmp_path):
+    """With storage.metadata_index, scores come from the index instead of metadata.json files."""
+    from src.metadata_index import MetadataIndex
+    from workflow.scripts.sample_validator_fixed import SampleValidator
+
+    fields = test_config["validation"]["required_metadata_fields"]
+    index_path = tmp_path / "metadata_index.sqlite"
+    index = MetadataIndex(index_path)
+    index.upsert([
+        ("IDX001", {field: "value" for field in fields}, None),
+        ("IDX002", dict({field: "value" for field in fields}, host="Unknown"), None),
+    ])
+    index.close()
+    config_path = write_config(local_path=tmp_path / "cache", metadata_index=index_path)
+
+    validator = SampleValidator(config_path)
+    results = await validator.validate_sample_batch(["IDX001", "IDX002", "IDX003"])
+
+    assert results["IDX001"].passes_all is True
+    assert results["IDX002"].metrics["metadata_completeness"] == 30.0
+    assert results["IDX003"].metrics["metadata_completeness"] == 0.0
+    assert results["IDX003"].warnings == ["Metadata file does not exist for IDX003"]
+    assert validator._metadata_scores == {}
+    assert (await validator.validate_sample("IDX001")).passes_all is True
+
+
+@pytest.mark.anyio
+async def test_validate_sample_checks_all_probes(write_metadata, write_config, tmp_path):
+    """FastQC and Kraken2 results are validated against the configured criteria."""
+    import zipfile
+    from workflow.scripts.sample_validator_fixed import SampleValidator
+
+    storage, eda_dir = tmp_path / "cache", tmp_path / "results" / "eda"
+    for sub in ("fastqc", "kraken2"):
+        (eda_dir / sub).mkdir(parents=True)
+    for acc, fungal_reads in (("FULL001", 500), ("FULL002", 50)):
+        write_metadata(storage, acc)
+        with zipfile.ZipFile(eda_dir / "fastqc" / f"{acc}_fastqc.zip", "w") as zf:
+            zf.write(Path(__file__).parent / "data" / "fastqc_data.txt", f"{acc}_fastqc/fastqc_data.txt")
+        (eda_dir / "kraken2" / f"{acc}_report.txt").write_text(
+            f" 20.00\t200\t200\tU\t0\tunclassified\n"
+            f" 80.00\t800\t0\tR\t1\troot\n"
+            f"  0.00\t{fungal_reads}\t0\tK\t4751\t  Fungi\n"
+            f"  0.00\t100\t100\tS\t9606\t  Homo sapiens\n"
+        )
+    config_path = write_config(criteria={"min_read_pairs": 5000}, local_path=storage, eda_dir=eda_dir)
+
+    validator = SampleValidator(config_path)
+    results = await validator.validate_sample_batch(["FULL001", "FULL002"])
+
+    passing, failing = results["FULL001"], results["FULL002"]
+    assert passing.passes_all is True, passing.warnings
+    assert passing.metrics["read_pairs"] == 10000
+    assert passing.metrics["fungal_signal"] == pytest.approx(50.0)
+    assert passing.metrics["host_contamination"] == pytest.approx(10.0)
+    assert failing.passes_all is False
+    assert failing.warnings == ["Fungal signal 5.00% below minimum 10%"]
+    for name in ("metadata", "sequence", "taxonomy", "validation"):
+        assert passing.metrics[f"{name}_time_seconds"] > 0
+
+    report = validator.generate_validation_report(results)
+    assert report["Status"].tolist() == ["PASS", "FAIL"]
+    assert (report["validation_time"] > 0).all()
+
+
+@pytest.mark.anyio
+async def test_validation_cache_reuses_unchanged_samples(write_metadata, write_config, tmp_path):
+    """Cached results are reused until a sample's inputs or its applicable settings change."""
+    import os
+    from workflow.scripts.sample_validator_fixed import SampleValidator
+
+    storage, eda_dir = tmp_path / "cache", tmp_path / "eda"
+    (eda_dir / "kraken2").mkdir(parents=True)
+    for acc in ("CACHE001", "CACHE002"):
+        write_metadata(storage, acc)
+    (eda_dir / "kraken2" / "CACHE002_report.txt").write_text(
+        " 50.00\t500\t500\tU\t0\tunclassified\n"
+        " 50.00\t500\t0\tR\t1\troot\n"
+        " 50.00\t500\t500\tK\t4751\t  Fungi\n"
+    )
+
+    def make_validator(**criteria):
+        return SampleValidator(write_config(criteria=criteria, local_path=storage, eda_dir=eda_dir,
+                                            validation_cache=tmp_path / "results.sqlite"))
+
+    first = await make_validator().validate_sample_batch(["CACHE001", "CACHE002"])
+    validator = make_validator()
+    second = await validator.validate_sample_batch(["CACHE001", "CACHE002"])
+    assert validator.result_cache.stats == {"hits": 2, "misses": 0, "stored": 0}
+    assert [result.warnings for result in second.values()] == [result.warnings for result in first.values()]
+    # Cached results report this run's (lookup) time, not the stored probe timings
+    assert second["CACHE002"].metrics["taxonomy_time_seconds"] == 0.0
+    assert second["CACHE002"].metrics["fungal_signal"] == first["CACHE002"].metrics["fungal_signal"]
+
+    # Only the sample with a Kraken2 report is affected by the fungal signal threshold
+    validator = make_validator(min_fungal_signal=60.0)
+    results = await validator.validate_sample_batch(["CACHE001", "CACHE002"])
+    assert validator.result_cache.stats == {"hits": 1, "misses": 1, "stored": 1}
+    assert results["CACHE002"].passes_all is False
+
+    os.utime(write_metadata(storage, "CACHE001", host="Unknown"), ns=(1, 1))
+    validator = make_validator(min_fungal_signal=60.0)
+    results = await validator.validate_sample_batch(["CACHE001", "CACHE002"])
+    assert validator.result_cache.stats == {"hits": 1, "misses": 1, "stored": 1}
+    assert results["CACHE001"].metrics["metadata_completeness"] == 30.0
+
+    # A probe that fails to parse its input is reported but not cached
+    (eda_dir / "fastqc").mkdir()
+    (eda_dir / "fastqc" / "CACHE001_fastqc.zip").write_bytes(b"not a zip")
+    for _ in range(2):
+        validator = make_validator(min_fungal_signal=60.0)
+        results = await validator.validate_sample_batch(["CACHE001"])
+        assert validator.result_cache.stats == {"hits": 0, "misses": 1, "stored": 0}
+        assert any(warning.startswith("Validation error") for warning in results["CACHE001"].warnings)
+
+
+def test_batch_cli_validates_manifest(write_metadata, write_config, tmp_path):
+    """The batch CLI validates a whole manifest in one process and writes the combined report."""
+    import pandas as pd
+    from src.eda_store import read_table
+    from workflow.scripts.sample_validator_fixed import main
+
+    storage = tmp_path / "cache"
+    for acc in ("CLI001", "CLI002"):
+        write_metadata(storage, acc)
+    config_path = write_config(local_path=storage)
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("accession,use_type\nCLI001,pilot\nCLI002,pilot\nCLI003,pilot\nCLI001,pilot\nCLI004,full\n")
+
+    main([str(config_path), "--manifest", str(manifest), "--use-type", "pilot",
+          "--output", str(tmp_path / "combined.csv"), "--store", str(tmp_path / "store")])
+    report = pd.read_csv(tmp_path / "combined.csv")
+    assert report["Accession"].tolist() == ["CLI001", "CLI002", "CLI003"]
+    assert report["Status"].tolist() == ["PASS", "PASS", "FAIL"]
+    assert sorted(read_table(tmp_path / "store", "validation")["Accession"]) == ["CLI001", "CLI002", "CLI003"]
+    assert not list(tmp_path.glob("*_report.csv"))
+
+    # Per-sample reports are optional
+    main([str(config_path), "--accessions", "CLI002", "CLI004", "--output", str(tmp_path / "combined.csv"),
+          "--per-sample-dir", str(tmp_path / "reports")])
+    assert sorted(path.name for path in (tmp_path / "reports").iterdir()) == ["CLI002_report.csv", "CLI004_report.csv"]
+    assert pd.read_csv(tmp_path / "reports" / "CLI002_report.csv")["Status"].tolist() == ["PASS"]
+
+    # The former single-sample usage still works
+    main([str(tmp_path / "CLI001.fastq.gz"), str(config_path), str(tmp_path / "CLI001_report.csv")])
+    assert pd.read_csv(tmp_path / "CLI001_report.csv")["Accession"].tolist() == ["CLI001"]
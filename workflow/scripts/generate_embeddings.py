@@ -5,12 +5,8 @@ Generates protein embeddings for downstream ML analysis.
 """
 
 import argparse
-import h5py
 import numpy as np
-import torch
 from pathlib import Path
-from Bio import SeqIO
-from transformers import EsmModel, EsmTokenizer
 import logging
 from typing import List, Dict
 import time
@@ -26,6 +22,10 @@ def setup_logging():
 
 def load_esm_model(model_name: str, device: str = "cuda"):
     """Load ESM model and tokenizer."""
+    # torch and transformers take seconds to import; load them only when a model is needed
+    import torch
+    from transformers import EsmModel, EsmTokenizer
+
     logger = logging.getLogger(__name__)
 
     logger.info(f"Loading ESM model: {model_name}")
@@ -48,6 +48,8 @@ def process_proteins_batch(
     sequences: List[str], model, tokenizer, device: str, batch_size: int = 32
 ):
     """Process protein sequences in batches."""
+    import torch
+
     logger = logging.getLogger(__name__)
 
     embeddings = []
@@ -125,6 +127,8 @@ def main():
     protein_ids = []
 
     try:
+        from Bio import SeqIO
+
         for record in SeqIO.parse(args.input, "fasta"):
             sequences.append(str(record.seq))
             protein_ids.append(record.id)
@@ -159,6 +163,8 @@ def main():
     # Save embeddings
     logger.info(f"Saving embeddings to {args.output}")
     try:
+        import h5py
+
         Path(args.output).parent.mkdir(parents=True, exist_ok=True)
 
         with h5py.File(args.output, "w") as f:
@@ -14,8 +14,16 @@ from datetime import datetime, timedelta
 import logging
 import psutil
 import socket
+import sys
 from typing import Dict, List, Optional
 
+# Make the project root importable when run as a script from workflow/scripts
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.eda_store import STORE_DIR, read_table, table_path
+
 
 def setup_logging():
     """Set up logging configuration."""
@@ -195,21 +203,28 @@ class ProductionMonitor:
             if validation_reports:
                 analysis["validation_reports"] = len(validation_reports)
 
-                # Try to get sample count from combined report
+                # Try to get sample count from combined report, reading only the
+                # status column from the EDA store when it has been written
+                store_dir = results_path / "eda" / STORE_DIR
                 combined_report = (
                     results_path / "eda" / "validation" / "combined_report.csv"
                 )
-                if combined_report.exists():
-                    try:
-                        df = pd.read_csv(combined_report)
-                        analysis["validated_samples"] = len(df)
-                        analysis["passed_samples"] = len(df[df["Status"] == "PASS"])
-                        analysis["failed_samples"] = len(df[df["Status"] == "FAIL"])
+                try:
+                    if table_path(store_dir, "validation").is_dir():
+                        status = read_table(store_dir, "validation", columns=["Status"])["Status"]
+                    elif combined_report.exists():
+                        status = pd.read_csv(combined_report, usecols=["Status"])["Status"]
+                    else:
+                        status = None
+                    if status is not None:
+                        analysis["validated_samples"] = len(status)
+                        analysis["passed_samples"] = int((status == "PASS").sum())
+                        analysis["failed_samples"] = int((status == "FAIL").sum())
                         analysis["success_rate"] = round(
-                            analysis["passed_samples"] / len(df) * 100, 1
+                            analysis["passed_samples"] / len(status) * 100, 1
                         )
-                    except Exception:
-                        pass
+                except Exception:
+                    pass
 
             return analysis
 
@@ -4,13 +4,35 @@ Sample validation and pre-filtering system for FungiMap.
 Implements validation of samples against quality criteria.
 """
 
-import pandas as pd
+from __future__ import annotations
+
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import csv
 import logging
 import json
 import sys
+import time
+
+import anyio
+
+# Make the project root importable when run as a script from workflow/scripts
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.eda_store import write_table
+from src.fastqc_parser import FastQCReport
+from src.kraken_report import FUNGI_TAXID, HUMAN_TAXID, KrakenReport
+from src.lazy_import import lazy_import
+from src.metadata_index import MetadataIndex, score_completeness
+from src.taxonomy_index import TaxonomyIndex
+from src.validation_cache import ValidationCache
+
+# pandas is only needed for batch reports, not per-sample validation
+pd = lazy_import("pandas")
 
 
 @dataclass
@@ -18,6 +40,15 @@ class ValidationCriteria:
     """Criteria for sample validation."""
 
     min_metadata_completeness: float = 70.0
+    min_read_pairs: int = 1000000
+    min_fungal_signal: float = 10.0
+    max_host_contamination: float = 50.0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "ValidationCriteria":
+        """Criteria from ``validation.criteria`` (missing keys keep their defaults)."""
+        criteria = config.get("validation", {}).get("criteria", {})
+        return cls(**{f.name: criteria[f.name] for f in fields(cls) if f.name in criteria})
 
 
 @dataclass
@@ -41,17 +72,55 @@ class SampleValidator:
         batch_size: int = 10,
         max_workers: int = 4,
     ):
-        """Initialize the sample validator with batch processing capabilities."""
+        """
+        Initialize the sample validator with batch processing capabilities.
+        ``batch_size`` is the number of samples validated concurrently and
+        ``max_workers`` the number of worker threads blocking file reads may use at once.
+        """
         self.config = self._load_config(config_path)
         self.logger = self._setup_logging()
         self.storage_root = Path(self.config["storage"]["local_path"])
         self.storage_root.mkdir(parents=True, exist_ok=True)
+        # FastQC, Kraken2 and Bracken outputs (<eda_dir>/fastqc, kraken2, bracken)
+        self.eda_dir = Path(
+            self.config["storage"].get("eda_dir", self.storage_root / "eda")
+        )
+        self.criteria = criteria or ValidationCriteria.from_config(self.config)
 
         # Production scaling parameters
         self.batch_size = batch_size
         self.max_workers = max_workers
         self.processed_count = 0
         self.failed_count = 0
+        self._io_limiter = anyio.CapacityLimiter(max_workers)
+
+        # Optional consolidated metadata ("storage": {"metadata_index": <SQLite file>})
+        # replacing the per-sample metadata.json reads; see src/metadata_index.py
+        index_path = self.config["storage"].get("metadata_index")
+        self.metadata_index = MetadataIndex(index_path) if index_path else None
+        # Scores computed up front for the running batch: accession -> (exists, score, valid values)
+        self._metadata_scores: Dict[str, Tuple[bool, float, int]] = {}
+
+        # Optional result cache ("storage": {"validation_cache": <SQLite file>}) keyed by
+        # the sample's inputs and the settings that apply to them
+        cache_path = self.config["storage"].get("validation_cache")
+        self.result_cache = ValidationCache(cache_path) if cache_path else None
+
+        # Optional NCBI taxonomy ("taxonomy": {"taxonomy_dir": <Kraken2 DB or nodes/names.dmp dir>})
+        taxonomy_config = self.config.get("taxonomy", {})
+        self.taxonomy = (
+            TaxonomyIndex.from_taxonomy_dir(
+                taxonomy_config["taxonomy_dir"], taxonomy_config.get("index_dir")
+            )
+            if taxonomy_config.get("taxonomy_dir")
+            else None
+        )
+        # Changes whenever the index is rebuilt from different dumps
+        self._taxonomy_fingerprint = (
+            (self.taxonomy.index_dir / "meta.json").read_text()
+            if self.taxonomy is not None
+            else None
+        )
 
     def _load_config(self, config_path: Path) -> Dict:
         """Load configuration from JSON file."""
@@ -82,13 +151,56 @@ class SampleValidator:
         """Get path for sample metadata file."""
         return self.storage_root / accession / "metadata.json"
 
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call in a worker thread without blocking the event loop."""
+        return await anyio.to_thread.run_sync(func, *args, limiter=self._io_limiter)
+
+    def _score_metadata(self, accessions: List[str]) -> Dict[str, Tuple[bool, float, int]]:
+        """Score many samples from the metadata index in one pass (blocking)."""
+        scores = self.metadata_index.completeness(
+            accessions, self.config["validation"]["required_metadata_fields"]
+        )
+        return dict(
+            zip(
+                scores.index,
+                zip(
+                    scores["exists"].tolist(),
+                    scores["metadata_completeness"].tolist(),
+                    scores["valid_values"].tolist(),
+                ),
+            )
+        )
+
+    async def _indexed_metadata_score(self, accession: str) -> Tuple[bool, float, int]:
+        """Score from the running batch, or a single-sample index query."""
+        score = self._metadata_scores.get(accession)
+        if score is None:
+            score = (await self._run_blocking(self._score_metadata, [accession]))[accession]
+        return score
+
     async def _ensure_metadata_exists(self, accession: str) -> bool:
         """Check if metadata file exists. Returns True if file exists."""
+        if self.metadata_index is not None:
+            exists, _, _ = await self._indexed_metadata_score(accession)
+            return exists
+
         metadata_path = Path(self._get_metadata_path(accession))
-        return metadata_path.exists()
+        return await self._run_blocking(metadata_path.exists)
+
+    @staticmethod
+    def _read_metadata(metadata_path: Path) -> Optional[Dict]:
+        """Load a metadata file, or None if it does not exist (blocking)."""
+        if not metadata_path.exists():
+            return None
+        with open(metadata_path) as f:
+            return json.load(f)
 
     async def _check_metadata_completeness(self, accession: str) -> Tuple[float, int]:
         """Check metadata completeness against MIxS standards."""
+        if self.metadata_index is not None:
+            _, completeness, valid_values = await self._indexed_metadata_score(accession)
+            return completeness, valid_values
+
         required_fields = self.config["validation"]["required_metadata_fields"]
         metadata_path = self._get_metadata_path(accession)
 
@@ -96,13 +208,11 @@ class SampleValidator:
         self.logger.debug(f"Required fields: {required_fields}")
 
         try:
-            if not metadata_path.exists():
+            metadata = await self._run_blocking(self._read_metadata, metadata_path)
+            if metadata is None:
                 self.logger.debug("Metadata file does not exist")
                 return 0.0, 0
 
-            with open(metadata_path) as f:
-                metadata = json.load(f)
-
             self.logger.debug(f"Loaded metadata: {metadata}")
 
             # Count valid values (must have non-Unknown values)
@@ -130,12 +240,7 @@ class SampleValidator:
                 (valid_values / total_fields) * 100 if total_fields else 0.0
             )
 
-            if valid_values == total_fields:
-                completeness = 100.0  # All fields valid
-            elif valid_values > 0:
-                completeness = 30.0  # Some fields valid but not all
-            else:
-                completeness = 0.0  # No valid fields
+            completeness = float(score_completeness(valid_values, total_fields))
 
             self.logger.debug(f"Raw completeness: {raw_completeness:.1f}%")
             self.logger.debug(f"Adjusted completeness: {completeness:.1f}%")
@@ -147,59 +252,130 @@ class SampleValidator:
 
         return completeness, valid_values
 
+    async def _probe_metadata(self, accession: str) -> Optional[Tuple[float, int]]:
+        """Metadata completeness and valid field count (None if there is no metadata)."""
+        if not await self._ensure_metadata_exists(accession):
+            return None
+        return await self._check_metadata_completeness(accession)
+
+    def _cache_key(self, accession: str) -> str:
+        """Hash of the sample's input contents and the criteria its probes are checked against (blocking)."""
+        cache = self.result_cache
+        criteria = self.criteria
+        paths = [
+            self.eda_dir / "fastqc" / f"{accession}_fastqc.zip",
+            self.eda_dir / "kraken2" / f"{accession}_report.txt",
+            self.eda_dir / "bracken" / f"{accession}_bracken.txt",
+        ]
+        if self.metadata_index is None:
+            paths.append(self._get_metadata_path(accession))
+        fastqc, kraken, bracken, *metadata = cache.file_digests(paths)
+        if self.metadata_index is not None:
+            record = self.metadata_index.get(accession)
+            metadata = json.dumps(record, sort_keys=True) if record is not None else None
+        else:
+            metadata = metadata[0]
+
+        # A setting only enters the key when its probe has inputs to check, so
+        # changing it invalidates just the results it can affect
+        parts = {
+            "accession": accession,
+            "metadata": [
+                metadata,
+                self.config["validation"]["required_metadata_fields"],
+                criteria.min_metadata_completeness,
+            ]
+            if metadata is not None
+            else None,
+            "sequence": [fastqc, criteria.min_read_pairs] if fastqc is not None else None,
+            "taxonomy": [
+                kraken,
+                bracken,
+                criteria.min_fungal_signal,
+                criteria.max_host_contamination,
+                self._taxonomy_fingerprint,
+            ]
+            if kraken is not None
+            else None,
+        }
+        return cache.make_key(parts)
+
+    def _cache_lookup(self, accession: str) -> Tuple[str, Optional[Dict]]:
+        """The sample's cache key and stored result, if any (blocking)."""
+        key = self._cache_key(accession)
+        return key, self.result_cache.get(key)
+
     async def validate_sample(self, accession: str) -> ValidationResult:
         """
         Validate a single sample against all criteria.
-        Uses streaming where possible to minimize memory usage.
+        With a result cache, a sample whose inputs and applicable settings are
+        unchanged returns its stored result without running any probe.
+        """
+        if self.result_cache is None:
+            result, _ = await self._run_probes(accession)
+            return result
+
+        start = time.perf_counter()
+        key, cached = await self._run_blocking(self._cache_lookup, accession)
+        if cached is not None:
+            self.logger.debug(f"Cached validation result for {accession}")
+            result = ValidationResult(**cached)
+            # Report the time of this lookup, not the probe timings of the stored run
+            for name in result.metrics:
+                if name.endswith("_time_seconds"):
+                    result.metrics[name] = 0.0
+            result.metrics["validation_time_seconds"] = time.perf_counter() - start
+            return result
+
+        result, complete = await self._run_probes(accession)
+        if complete:
+            await self._run_blocking(self.result_cache.put, key, accession, asdict(result))
+        return result
+
+    async def _run_probes(self, accession: str) -> Tuple[ValidationResult, bool]:
+        """
+        Validate a sample and say whether every probe ran without error (only
+        then may the result be cached).
+        The metadata, FastQC and Kraken2/Bracken probes run concurrently and their
+        results are checked against ``self.criteria``. Probes whose outputs do not
+        exist yet (e.g. before EDA) are skipped; each warning is a failed check.
         """
         self.logger.debug(f"Starting validation for {accession}")
+        start = time.perf_counter()
 
         # Initialize validation state
-        metrics = {"fungal_signal": 0.0, "read_pairs": 0, "host_contamination": 0.0}
+        metrics = {
+            "metadata_completeness": 0.0,
+            "fungal_signal": 0.0,
+            "read_pairs": 0,
+            "host_contamination": 0.0,
+        }
         warnings = []
-        passes_all = False
-
-        try:
-            # Check metadata exists
-            self.logger.debug("Checking if metadata exists")
-            if not await self._ensure_metadata_exists(accession):
-                warnings.append(f"Metadata file does not exist for {accession}")
-                metrics["metadata_completeness"] = 0.0
-                self.logger.debug("Metadata file missing")
-                return ValidationResult(
-                    accession=accession,
-                    passes_all=False,
-                    metrics=metrics,
-                    warnings=warnings,
-                )
+        probes = {
+            "metadata": self._probe_metadata,
+            "sequence": self._validate_sequence_data,
+            "taxonomy": self._analyze_taxonomic_composition,
+        }
+        outcomes = {}
 
-            # Validate metadata completeness
-            self.logger.debug("Checking metadata completeness")
-            metadata_score, valid_values = await self._check_metadata_completeness(
-                accession
-            )
-            metrics["metadata_completeness"] = metadata_score
-            self.logger.debug(f"Metadata score: {metadata_score}")
+        async def run_probe(name: str) -> None:
+            probe_start = time.perf_counter()
+            try:
+                outcomes[name] = await probes[name](accession)
+            except Exception as e:
+                self.logger.error(f"Validation error for {accession} ({name} probe): {str(e)}")
+                warnings.append(f"Validation error: {str(e)}")
+            metrics[f"{name}_time_seconds"] = time.perf_counter() - probe_start
 
-            # Pass if metadata is 100% complete
-            passes_all = metadata_score == 100.0
+        async with anyio.create_task_group() as task_group:
+            for name in probes:
+                task_group.start_soon(run_probe, name)
 
-            self.logger.debug(f"Validation result: {'PASS' if passes_all else 'FAIL'}")
+        warnings.extend(self._evaluate_criteria(accession, outcomes, metrics))
+        metrics["validation_time_seconds"] = time.perf_counter() - start
+        passes_all = not warnings
 
-            if not passes_all:
-                required_fields = len(
-                    self.config["validation"]["required_metadata_fields"]
-                )
-                invalid_count = required_fields - valid_values
-                warning = f"{invalid_count} metadata fields have invalid values (missing, empty, or 'Unknown')"
-                self.logger.debug(f"Adding warning: {warning}")
-                warnings.append(warning)
-
-        except Exception as e:
-            self.logger.error(f"Validation error for {accession}: {str(e)}")
-            warning = f"Validation error: {str(e)}"
-            warnings.append(warning)
-            passes_all = False
+        self.logger.debug(f"Validation result: {'PASS' if passes_all else 'FAIL'}")
 
         # Create validation result
         result = ValidationResult(
@@ -211,77 +387,87 @@ class SampleValidator:
         )
 
         self.logger.debug(f"Returning validation result for {accession}: {result}")
-        return result
+        return result, len(outcomes) == len(probes)
 
-    async def _validate_sequence_data(self, accession: str) -> Dict[str, float]:
-        """Validate sequence data quality using FastQC results."""
-        metrics = {"read_pairs": 0, "mean_quality": 0.0, "gc_content": 0.0}
+    def _evaluate_criteria(
+        self, accession: str, outcomes: Dict[str, Any], metrics: Dict[str, float]
+    ) -> List[str]:
+        """Merge probe results into ``metrics`` and return a warning per failed criterion."""
+        criteria = self.criteria
+        warnings = []
 
-        try:
-            # Get FastQC data path
-            fastqc_path = (
-                self.storage_root / "eda" / "fastqc" / f"{accession}_fastqc.zip"
-            )
-            if not fastqc_path.exists():
-                self.logger.warning(f"FastQC results not found for {accession}")
-                return metrics
-
-            # Process FastQC data
-            import zipfile
-
-            with zipfile.ZipFile(fastqc_path) as zf:
-                # Read FastQC summary
-                with zf.open(f"{accession}_fastqc/fastqc_data.txt") as f:
-                    data = f.read().decode("utf-8").split("\n")
-
-                    # Parse metrics
-                    for line in data:
-                        if line.startswith("Total Sequences"):
-                            metrics["read_pairs"] = (
-                                int(line.split()[-1]) // 2
-                            )  # Paired-end reads
-                        elif line.startswith("%GC"):
-                            metrics["gc_content"] = float(line.split()[-1])
-
-                    # Calculate mean quality from per base sequence quality
-                    in_quality_section = False
-                    quality_scores = []
-
-                    for line in data:
-                        if line.startswith("#Per base sequence quality"):
-                            in_quality_section = True
-                            continue
-                        elif line.startswith(">>END_MODULE") and in_quality_section:
-                            break
-                        elif in_quality_section and line and not line.startswith("#"):
-                            try:
-                                # Parse quality score from line (format: Base Mean MedianLowerQuartileUpperQuartile10thPercentile90thPercentile)
-                                parts = line.split()
-                                if (
-                                    len(parts) >= 2
-                                ):  # Ensure we have at least base and mean
-                                    quality_scores.append(
-                                        float(parts[1])
-                                    )  # Mean quality
-                            except (ValueError, IndexError):
-                                continue
-
-                    if quality_scores:
-                        metrics["mean_quality"] = sum(quality_scores) / len(
-                            quality_scores
-                        )
+        if "metadata" in outcomes:
+            if outcomes["metadata"] is None:
+                self.logger.debug("Metadata file missing")
+                warnings.append(f"Metadata file does not exist for {accession}")
+            else:
+                metadata_score, valid_values = outcomes["metadata"]
+                metrics["metadata_completeness"] = metadata_score
+                self.logger.debug(f"Metadata score: {metadata_score}")
+                if metadata_score < criteria.min_metadata_completeness:
+                    invalid_count = (
+                        len(self.config["validation"]["required_metadata_fields"])
+                        - valid_values
+                    )
+                    warnings.append(
+                        f"Metadata completeness {metadata_score:.0f}% is below "
+                        f"{criteria.min_metadata_completeness:.0f}%: {invalid_count} metadata "
+                        f"fields have invalid values (missing, empty, or 'Unknown')"
+                    )
 
-            self.logger.debug(f"Sequence metrics for {accession}: {metrics}")
+        sequence = outcomes.get("sequence")
+        if sequence is not None:
+            metrics.update(sequence)
+            if sequence["read_pairs"] < criteria.min_read_pairs:
+                warnings.append(
+                    f"Read pairs {sequence['read_pairs']:,} below minimum {criteria.min_read_pairs:,}"
+                )
 
-        except Exception as e:
-            self.logger.error(
-                f"Error processing FastQC results for {accession}: {str(e)}"
-            )
+        taxonomy = outcomes.get("taxonomy")
+        if taxonomy is not None:
+            metrics.update(taxonomy)
+            if taxonomy["fungal_signal"] < criteria.min_fungal_signal:
+                warnings.append(
+                    f"Fungal signal {taxonomy['fungal_signal']:.2f}% below minimum "
+                    f"{criteria.min_fungal_signal:g}%"
+                )
+            if taxonomy["host_contamination"] > criteria.max_host_contamination:
+                warnings.append(
+                    f"Host contamination {taxonomy['host_contamination']:.2f}% above maximum "
+                    f"{criteria.max_host_contamination:g}%"
+                )
+
+        return warnings
+
+    async def _validate_sequence_data(self, accession: str) -> Optional[Dict[str, float]]:
+        """Validate sequence data quality using FastQC results (None if there are none yet)."""
+        return await self._run_blocking(self._read_sequence_metrics, accession)
+
+    def _read_sequence_metrics(self, accession: str) -> Optional[Dict[str, float]]:
+        """Read the FastQC metrics of a sample (blocking); parse errors propagate."""
+        metrics = {"read_pairs": 0, "mean_quality": 0.0, "gc_content": 0.0}
+
+        # Get FastQC data path
+        fastqc_path = self.eda_dir / "fastqc" / f"{accession}_fastqc.zip"
+        if not fastqc_path.exists():
+            self.logger.debug(f"FastQC results not found for {accession}")
+            return None
 
+        # Process FastQC data straight from the zip in one pass
+        report = FastQCReport.from_zip(fastqc_path)
+        metrics["read_pairs"] = report.total_sequences // 2  # Paired-end reads
+        metrics["gc_content"] = report.gc_percent
+        metrics["mean_quality"] = report.mean_quality
+
+        self.logger.debug(f"Sequence metrics for {accession}: {metrics}")
         return metrics
 
-    async def _analyze_taxonomic_composition(self, accession: str) -> Dict[str, float]:
-        """Analyze taxonomic composition using Kraken2 and Bracken results."""
+    async def _analyze_taxonomic_composition(self, accession: str) -> Optional[Dict[str, float]]:
+        """Analyze taxonomic composition using Kraken2 and Bracken results (None if there are none yet)."""
+        return await self._run_blocking(self._read_taxonomic_composition, accession)
+
+    def _read_taxonomic_composition(self, accession: str) -> Optional[Dict[str, float]]:
+        """Read the Kraken2 and Bracken metrics of a sample (blocking); parse errors propagate."""
         metrics = {
             "fungal_signal": 0.0,
             "host_contamination": 0.0,
@@ -289,99 +475,68 @@ class SampleValidator:
             "species_abundance": {},
         }
 
-        try:
-            # Get Kraken2 and Bracken report paths
-            kraken_report = (
-                self.storage_root / "eda" / "kraken2" / f"{accession}_report.txt"
-            )
-            bracken_report = (
-                self.storage_root / "eda" / "bracken" / f"{accession}_bracken.txt"
-            )
+        # Get Kraken2 and Bracken report paths
+        kraken_report = self.eda_dir / "kraken2" / f"{accession}_report.txt"
+        bracken_report = self.eda_dir / "bracken" / f"{accession}_bracken.txt"
+
+        if not kraken_report.exists():
+            self.logger.debug(f"Kraken2 report not found for {accession}")
+            return None
+
+        # Process Kraken2 report for high-level metrics
+        report = KrakenReport.from_file(kraken_report)
+        metrics["fungal_signal"] = report.clade_percent(FUNGI_TAXID)
+        metrics["host_contamination"] = report.clade_percent(HUMAN_TAXID)
 
-            if not kraken_report.exists():
-                self.logger.warning(f"Kraken2 report not found for {accession}")
-                return metrics
+        # Process Bracken results if available
+        if bracken_report.exists():
+            species_abundances = {}
+            species_taxids = {}
 
-            # Process Kraken2 report for high-level metrics
-            total_reads = 0
-            fungal_reads = 0
-            host_reads = 0
+            with open(bracken_report) as f:
+                # Skip header
+                next(f)
 
-            with open(kraken_report) as f:
                 for line in f:
                     parts = line.strip().split("\t")
-                    if len(parts) != 6:
+                    if len(parts) < 7:
                         continue
 
-                    percentage = float(parts[0])
-                    reads = int(parts[1])
-                    level = parts[3]
-                    taxid = parts[4]
-                    name = parts[5].strip()
-
-                    # Count total classified reads
-                    if level == "U":
-                        total_reads = reads
-                    # Count fungal reads (Fungi kingdom)
-                    elif taxid == "4751":
-                        fungal_reads = reads
-                    # Check for host contamination
-                    elif taxid == "9606":
-                        host_reads = reads
-
-            # Calculate basic percentages
-            if total_reads > 0:
-                metrics["fungal_signal"] = (fungal_reads / total_reads) * 100
-                metrics["host_contamination"] = (host_reads / total_reads) * 100
-
-            # Process Bracken results if available
-            if bracken_report.exists():
-                species_abundances = {}
-
-                with open(bracken_report) as f:
-                    # Skip header
-                    next(f)
-
-                    for line in f:
-                        parts = line.strip().split("\t")
-                        if len(parts) < 7:
-                            continue
-
-                        name = parts[0]
-                        taxid = parts[1]
-                        level = parts[2]
-                        abundance = float(parts[6])  # Fraction of total reads
-
-                        if level == "S":  # Species level
-                            species_abundances[name] = abundance
-
-                # Sort species by abundance
-                sorted_species = sorted(
-                    species_abundances.items(), key=lambda x: x[1], reverse=True
-                )
-
-                # Store top species and their abundances
-                metrics["dominant_species"] = [sp[0] for sp in sorted_species[:5]]
-                metrics["species_abundance"] = dict(sorted_species[:10])
+                    name = parts[0]
+                    taxid = parts[1]
+                    level = parts[2]
+                    abundance = float(parts[6])  # Fraction of total reads
 
-            self.logger.debug(f"Taxonomic composition for {accession}: {metrics}")
+                    if level == "S":  # Species level
+                        species_abundances[name] = abundance
+                        species_taxids[name] = int(taxid)
 
-        except Exception as e:
-            self.logger.error(
-                f"Error processing taxonomic results for {accession}: {str(e)}"
+            # Sort species by abundance
+            sorted_species = sorted(
+                species_abundances.items(), key=lambda x: x[1], reverse=True
             )
 
-        return metrics
+            # Store top species and their abundances
+            metrics["dominant_species"] = [sp[0] for sp in sorted_species[:5]]
+            metrics["species_abundance"] = dict(sorted_species[:10])
 
-    async def validate_sample_batch(
-        self, accessions: List[str]
-    ) -> Dict[str, ValidationResult]:
-        """Validate multiple samples."""
-        results = {}
-        for acc in accessions:
-            result = await self.validate_sample(acc)
-            results[acc] = result
-        return results
+            if self.taxonomy is not None and sorted_species:
+                # Species under Fungi by taxonomy, whatever their name
+                fungal = self.taxonomy.descendant_mask(
+                    [species_taxids[sp[0]] for sp in sorted_species], FUNGI_TAXID
+                )
+                fungal_species = [
+                    sp for sp, is_fungal in zip(sorted_species, fungal) if is_fungal
+                ]
+                metrics["fungal_species_abundance"] = sum(
+                    sp[1] for sp in fungal_species
+                )
+                metrics["dominant_fungal_species"] = [
+                    sp[0] for sp in fungal_species[:5]
+                ]
+
+        self.logger.debug(f"Taxonomic composition for {accession}: {metrics}")
+        return metrics
 
     async def estimate_resources(self, accession: str) -> Dict[str, float]:
         """Estimate computational resources needed for processing."""
@@ -418,77 +573,68 @@ class SampleValidator:
     async def validate_sample_batch(
         self, accessions: List[str]
     ) -> Dict[str, ValidationResult]:
-        """Validate multiple samples in parallel batches."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
+        """
+        Validate many samples on the running event loop.
+        Accessions flow through a work queue to ``batch_size`` workers, so a slow
+        sample only holds up its own worker. Blocking file reads from all workers
+        share one limit of ``max_workers`` threads. With a metadata index, the
+        completeness of every sample is scored in one query before the queue starts.
+        """
         results = {}
         total_samples = len(accessions)
+        progress_step = max(1, total_samples // 10)
+        send_queue, receive_queue = anyio.create_memory_object_stream(self.batch_size)
 
         self.logger.info(f"Starting batch validation of {total_samples} samples")
 
-        # Process in batches to manage memory and resources
-        for i in range(0, total_samples, self.batch_size):
-            batch = accessions[i : i + self.batch_size]
-            batch_num = (i // self.batch_size) + 1
-            total_batches = (total_samples + self.batch_size - 1) // self.batch_size
-
-            self.logger.info(
-                f"Processing batch {batch_num}/{total_batches} ({len(batch)} samples)"
-            )
-
-            # Use ThreadPoolExecutor for I/O bound validation tasks
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Create tasks for this batch
-                tasks = [
-                    asyncio.get_event_loop().run_in_executor(
-                        executor, self._validate_single_sample, accession
-                    )
-                    for accession in batch
-                ]
-
-                # Wait for batch completion
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Process results
-                for accession, result in zip(batch, batch_results):
-                    if isinstance(result, Exception):
-                        self.logger.error(f"Error validating {accession}: {result}")
+        async def worker(queue) -> None:
+            async with queue:
+                async for accession in queue:
+                    try:
+                        results[accession] = await self.validate_sample(accession)
+                        self.processed_count += 1
+                    except Exception as e:
+                        self.logger.error(f"Error validating {accession}: {e}")
                         self.failed_count += 1
-                        # Create dummy failed result
                         results[accession] = ValidationResult(
                             accession=accession,
                             passes_all=False,
                             metrics={"error": 1.0},
-                            warnings=[f"Validation failed: {str(result)}"],
+                            warnings=[f"Validation failed: {str(e)}"],
+                        )
+
+                    if len(results) % progress_step == 0:
+                        progress = len(results) / total_samples * 100
+                        self.logger.info(
+                            f"Validated {len(results)}/{total_samples} samples - {progress:.1f}% total progress"
                         )
-                    else:
-                        results[accession] = result
-                        self.processed_count += 1
 
-            # Progress update
-            progress = ((i + len(batch)) / total_samples) * 100
-            self.logger.info(
-                f"Batch {batch_num}/{total_batches} completed - {progress:.1f}% total progress"
+        if self.metadata_index is not None:
+            # Score the metadata of the whole batch with one index query up front
+            self._metadata_scores.update(
+                await self._run_blocking(self._score_metadata, accessions)
             )
 
+        try:
+            async with anyio.create_task_group() as task_group:
+                for _ in range(min(self.batch_size, total_samples)):
+                    task_group.start_soon(worker, receive_queue.clone())
+                receive_queue.close()
+
+                async with send_queue:
+                    for accession in accessions:
+                        await send_queue.send(accession)
+        finally:
+            for accession in accessions:
+                self._metadata_scores.pop(accession, None)
+
         self.logger.info(
             f"Batch validation completed: {self.processed_count} successful, {self.failed_count} failed"
         )
-        return results
-
-    def _validate_single_sample(self, accession: str) -> ValidationResult:
-        """Validate a single sample (thread-safe version)."""
-        try:
-            # Run the existing validation logic
-            return asyncio.run(self.validate_sample(accession))
-        except Exception as e:
-            return ValidationResult(
-                accession=accession,
-                passes_all=False,
-                metrics={"error": 1.0},
-                warnings=[f"Validation failed: {str(e)}"],
-            )
+        if self.result_cache is not None:
+            self.logger.info(f"Result cache: {self.result_cache.summary()}")
+        # Report in input order rather than completion order
+        return {accession: results[accession] for accession in accessions}
 
     def generate_validation_report(
         self, results: Dict[str, ValidationResult]
@@ -520,34 +666,77 @@ class SampleValidator:
         self.logger.info(
             f"  Success rate: {(len(df[df['Status'] == 'PASS']) / len(df) * 100):.1f}%"
         )
+        if self.result_cache is not None:
+            self.logger.info(f"  Result cache: {self.result_cache.summary()}")
 
         return df
 
 
-if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) != 4:
-        print(
-            "Usage: sample_validator.py <fastq_file> <validation_config> <output_report>"
+def read_manifest(manifest_path: Path, use_type: Optional[str] = None) -> List[str]:
+    """
+    Accessions listed in a sample manifest CSV (an ``accession`` column), in file
+    order without duplicates. With ``use_type``, only rows whose ``use_type``
+    contains it are kept, as the Snakefile selects pilot samples.
+    """
+    with open(manifest_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if rows and "accession" not in rows[0]:
+        raise ValueError(f"{manifest_path} has no 'accession' column")
+    return list(
+        dict.fromkeys(
+            row["accession"].strip()
+            for row in rows
+            if row["accession"] and (use_type is None or use_type in (row.get("use_type") or ""))
         )
-        sys.exit(1)
-
-    fastq_file = Path(sys.argv[1])
-    config_path = Path(sys.argv[2])
-    output_report = Path(sys.argv[3])
-
-    # Get accession from fastq filename
-    accession = fastq_file.stem.split(".")[0]
-
-    # Initialize validator
-    validator = SampleValidator(config_path)
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 3 and not any(arg.startswith("-") for arg in argv):
+        # Former single-sample usage: <fastq_file> <validation_config> <output_report>,
+        # with the accession taken from the FASTQ filename
+        fastq_file, config_path, output_report = argv
+        argv = [config_path, "--accessions", Path(fastq_file).stem.split(".")[0], "--output", output_report]
+
+    parser = argparse.ArgumentParser(
+        description="Validate a cohort of samples in one process and write the combined report",
+        epilog="The former usage, <fastq_file> <validation_config> <output_report>, still validates one sample.",
+    )
+    parser.add_argument("config", type=Path, help="Pipeline configuration (JSON)")
+    samples = parser.add_mutually_exclusive_group(required=True)
+    samples.add_argument("--manifest", type=Path, help="Sample manifest CSV with an accession column")
+    samples.add_argument("--accessions", nargs="+", help="Accessions to validate")
+    parser.add_argument("--use-type", help="Only manifest rows whose use_type contains this (e.g. pilot)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Combined report CSV")
+    parser.add_argument("--per-sample-dir", type=Path,
+                        help="Also write <accession>_report.csv for every sample here")
+    parser.add_argument("--store", type=Path,
+                        help="EDA store directory to write the 'validation' table to (see src/eda_store.py)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Samples validated concurrently")
+    parser.add_argument("--max-workers", type=int, default=4, help="Threads for blocking file reads")
+    args = parser.parse_args(argv)
+
+    accessions = (
+        read_manifest(args.manifest, args.use_type) if args.manifest else list(dict.fromkeys(args.accessions))
+    )
+    if not accessions:
+        parser.error("no accessions to validate")
+
+    validator = SampleValidator(args.config, batch_size=args.batch_size, max_workers=args.max_workers)
+    results = anyio.run(validator.validate_sample_batch, accessions)
+    report = validator.generate_validation_report(results)
 
-    # Run validation
-    import asyncio
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.output, index=False)
+    if args.per_sample_dir is not None:
+        args.per_sample_dir.mkdir(parents=True, exist_ok=True)
+        for i, accession in enumerate(report["Accession"]):
+            report.iloc[[i]].to_csv(args.per_sample_dir / f"{accession}_report.csv", index=False)
+    if args.store is not None:
+        # Columnar copy, partitioned by Status, for the monitor and model training
+        write_table(report, args.store, "validation")
 
-    results = asyncio.run(validator.validate_sample_batch([accession]))
 
-    # Generate report
-    report = validator.generate_validation_report(results)
-    report.to_csv(output_report, index=False)
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,27 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import logging
+import sys
 import time
-
+from typing import Optional
+
+# Make the project root importable when run as a script from workflow/scripts
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.abundance_matrix import AbundanceMatrix
+from src.eda_store import read_table
+
+# Validation columns used for training: the sample, its label and extra features
+VALIDATION_COLUMNS = [
+    "Accession",
+    "Status",
+    "metadata_completeness",
+    "fungal_signal",
+    "read_pairs",
+    "host_contamination",
+]
 
 def setup_logging():
     """Set up logging configuration."""
@@ -40,13 +59,21 @@ def load_cluster_data(cluster_file: str) -> pd.DataFrame:
 
 
 def load_validation_data(validation_files: list) -> pd.DataFrame:
-    """Load validation data from multiple CSV files."""
+    """Load validation data from CSV files or EDA store tables.
+
+    A directory is read as the ``validation`` table of the EDA store
+    (``results/eda/store/validation``), loading only the training columns.
+    """
     logger = logging.getLogger(__name__)
 
     validation_data = []
     for file_path in validation_files:
         logger.info(f"Loading validation data from {file_path}")
-        df = pd.read_csv(file_path)
+        path = Path(file_path)
+        if path.is_dir():
+            df = read_table(path.parent, path.name, columns=VALIDATION_COLUMNS)
+        else:
+            df = pd.read_csv(file_path)
         validation_data.append(df)
 
     combined_df = pd.concat(validation_data, ignore_index=True)
@@ -55,8 +82,25 @@ def load_validation_data(validation_files: list) -> pd.DataFrame:
     return combined_df
 
 
-def prepare_features(cluster_df: pd.DataFrame, validation_df: pd.DataFrame) -> tuple:
-    """Prepare feature matrix from cluster data."""
+def load_abundance_features(abundance_file: str, min_samples: int = 2) -> pd.DataFrame:
+    """Relative abundances of taxa seen in at least ``min_samples`` samples, one column per taxid."""
+    logger = logging.getLogger(__name__)
+
+    abundance = AbundanceMatrix.load(abundance_file)
+    features = abundance.to_dataframe(relative=True, min_samples=min_samples)
+    features.columns = [f"taxid_{taxid}" for taxid in features.columns]
+    logger.info(
+        f"Loaded abundances of {features.shape[1]} taxa for {features.shape[0]} samples"
+    )
+    return features
+
+
+def prepare_features(
+    cluster_df: pd.DataFrame,
+    validation_df: pd.DataFrame,
+    abundance_df: Optional[pd.DataFrame] = None,
+) -> tuple:
+    """Prepare feature matrix from cluster data and, optionally, taxon abundances."""
     logger = logging.getLogger(__name__)
 
     # Create sample-level cluster features
@@ -105,6 +149,12 @@ def prepare_features(cluster_df: pd.DataFrame, validation_df: pd.DataFrame) -> t
         if feature in y_data.columns:
             X[feature] = y_data[feature]
 
+    if abundance_df is not None:
+        # Samples without Kraken2 output get zero abundance
+        X = X.join(abundance_df, how="left").fillna(
+            {column: 0.0 for column in abundance_df.columns}
+        )
+
     logger.info(f"Final feature matrix shape: {X.shape}")
     logger.info(f"Class distribution: {y.value_counts().to_dict()}")
 
@@ -196,7 +246,14 @@ def main():
         "--clusters", required=True, help="Input CSV file with cluster assignments"
     )
     parser.add_argument(
-        "--validation-data", nargs="+", required=True, help="Validation CSV files"
+        "--validation-data",
+        nargs="+",
+        required=True,
+        help="Validation CSV files or EDA store validation table directories",
+    )
+    parser.add_argument(
+        "--abundance",
+        help="Abundance matrix (.npz from src/abundance_matrix.py) to add taxon features from",
     )
     parser.add_argument(
         "--output", required=True, help="Output pickle file for trained model"
@@ -222,7 +279,10 @@ def main():
         validation_df = load_validation_data(args.validation_data)
 
         # Prepare features
-        X, y = prepare_features(cluster_df, validation_df)
+        abundance_df = (
+            load_abundance_features(args.abundance) if args.abundance else None
+        )
+        X, y = prepare_features(cluster_df, validation_df, abundance_df)
 
         # Train model
         model_results = train_model(X, y, args.test_size, args.random_state)